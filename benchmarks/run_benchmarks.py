@@ -0,0 +1,393 @@
+#!/usr/bin/python3
+#
+# Copyright (c) 2026 Mike FABIAN <mfabian@redhat.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+'''
+Benchmarks for the scripts maintaining the table sources.
+
+Runs improve_cangjie5.py, improve_quick5.py, improve_jyutping.py and
+remove_cjk_compatibility_ideographs.py on the tables shipped in this
+repository and on copies scaled up synthetically:
+
+    python3 benchmarks/run_benchmarks.py -o results.json
+
+Every run starts the script in a fresh process with --stats-json,
+the time of the phases is taken from the measurements the script
+writes itself (see tabletool/instrument.py), the peak RSS is the one
+of that process alone. The table printed groups the phases into
+read (all phases whose name starts with “read”), sort, write and
+transform (all other phases, like the passes of the scripts or the
+“filter” phase of remove_cjk_compatibility_ideographs.py).
+
+As there is no Unihan_Readings.txt in the repository, a kCantonese
+file for improve_jyutping.py is generated from jyutping.txt.
+
+To detect regressions, save a baseline on one machine:
+
+    python3 benchmarks/run_benchmarks.py --save-baseline
+
+and later compare against it on the same machine:
+
+    python3 benchmarks/run_benchmarks.py --baseline benchmarks/baseline.json
+
+This fails if a run takes longer than the baseline plus the tolerance.
+'''
+
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import NamedTuple
+from typing import Tuple
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+
+TABLES_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', 'tables')
+sys.path.insert(0, TABLES_DIR)
+import tabletool # pylint: disable=wrong-import-position
+from tabletool import jyutping # pylint: disable=wrong-import-position
+
+DEFAULT_BASELINE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+class Case(NamedTuple):
+    '''A script and the table it is run on'''
+    name: str
+    # Relative to the tables directory:
+    script: str
+    table: str
+    headless: bool = False
+    # More command line arguments for the script, “{workdir}” is
+    # replaced by the directory of the temporary files:
+    arguments: Tuple[str, ...] = ()
+
+# The classification of the characters as simplified or traditional
+# is measured, but the Taiwan usage lookup must never go to the
+# network or write its cache into the source tree:
+OFFLINE = ('--offline',
+           '--usage-cache', os.path.join('{workdir}', 'taiwan_usage.sqlite'))
+
+CASES = (
+    Case('improve_cangjie5', 'cangjie/improve_cangjie5.py',
+         'cangjie/cangjie5.txt', arguments=OFFLINE),
+    Case('improve_quick5', 'quick/improve_quick5.py',
+         'quick/quick5.txt', arguments=OFFLINE),
+    Case('improve_jyutping', 'cantonese/improve_jyutping.py',
+         'cantonese/jyutping.txt',
+         arguments=(
+             '-u', os.path.join('{workdir}', 'Unihan_Readings.txt'),
+             '-f', os.path.join(TABLES_DIR, 'cantonese', 'cantonese.txt'))),
+    Case('remove_cjk_compatibility_ideographs',
+         'wubi-haifeng/remove_cjk_compatibility_ideographs.py',
+         'wubi-haifeng/wubi-haifeng86.UTF-8', headless=True),
+)
+
+def parse_args() -> Any:
+    '''Parse the command line arguments'''
+    import argparse
+    parser = argparse.ArgumentParser(
+        description='Benchmark the scripts maintaining the table sources')
+    parser.add_argument('-o', '--outputfilename',
+                        nargs='?',
+                        type=str,
+                        default='',
+                        help='file to write the results to as JSON')
+    parser.add_argument('-c', '--cases',
+                        nargs='?',
+                        type=str,
+                        default=','.join(case.name for case in CASES),
+                        help=('comma separated list of cases to run, '
+                              'default is %(default)s'))
+    parser.add_argument('-s', '--scales',
+                        nargs='?',
+                        type=str,
+                        default='1,10',
+                        help=('comma separated list of factors to scale '
+                              'the tables by, default is %(default)s'))
+    parser.add_argument('-r', '--repeat',
+                        nargs='?',
+                        type=int,
+                        default=3,
+                        help=('how often to run each case, the fastest '
+                              'run counts, default is %(default)s'))
+    parser.add_argument('-b', '--baseline',
+                        nargs='?',
+                        type=str,
+                        default='',
+                        help='compare with the results in this file')
+    parser.add_argument('--save-baseline',
+                        nargs='?',
+                        type=str,
+                        const=DEFAULT_BASELINE,
+                        default='',
+                        help=('save the results as the new baseline, '
+                              'default is %(const)s'))
+    parser.add_argument('-t', '--tolerance',
+                        nargs='?',
+                        type=float,
+                        default=0.25,
+                        help=('fail if a run is slower than the baseline '
+                              'by more than this fraction, '
+                              'default is %(default)s'))
+    parser.add_argument('-d', '--debug',
+                        action='store_true',
+                        help='print debugging output')
+    return parser.parse_args()
+
+def scale_table(case: Case, outputfilename: str, factor: int) -> None:
+    '''
+    Write a copy of a table with factor times as many rows.
+
+    The copies of the rows get the number of the copy appended to
+    their codes, with the same number of digits for all copies, so
+    they do not become duplicates of the original rows or of each
+    other.
+
+    :param case: The case whose table is scaled
+    :param outputfilename: The file to write
+    :param factor: How many copies of each row to write
+    '''
+    inputfilename = os.path.join(TABLES_DIR, case.table)
+    if case.headless:
+        with open(inputfilename, 'r', encoding='utf-8') as inputfile:
+            lines = inputfile.readlines()
+        with open(outputfilename, 'w', encoding='utf-8') as outputfile:
+            for _copy in range(factor):
+                outputfile.writelines(lines)
+        return
+    (head, rows, tail) = tabletool.read_table(inputfilename)
+    width = len(str(factor - 1))
+    with tabletool.TableWriter(outputfilename) as writer:
+        writer.write_lines(head)
+        writer.write_rows(rows)
+        for copy in range(1, factor):
+            writer.write_rows(
+                tabletool.Row(f'{row.code}{copy:0{width}}', row.phrase,
+                              row.weight, row.comment)
+                for row in rows)
+        writer.write_lines(tail)
+
+def write_unihan_readings(tablefilename: str, outputfilename: str) -> None:
+    '''
+    Write kCantonese lines for all single characters in a Jyutping
+    table whose code is a valid syllable.
+
+    :param tablefilename: The Jyutping table to read
+    :param outputfilename: The file to write
+    '''
+    converter = jyutping.JyutpingConverter()
+    readings: Dict[str, List[str]] = {}
+    with tabletool.TableReader(tablefilename) as reader:
+        for row in reader:
+            if len(row.phrase) != 1:
+                continue
+            try:
+                converter.to_cantonese(row.code)
+            except jyutping.SyllableError:
+                continue
+            readings.setdefault(row.phrase, []).append(f'{row.code}1')
+    with open(outputfilename, 'w', encoding='utf-8') as outputfile:
+        for (char, syllables) in sorted(readings.items()):
+            outputfile.write(
+                f'U+{ord(char):04X}\tkCantonese\t{" ".join(syllables)}\n')
+
+def run_case(case: Case, inputfilename: str, workdir: str) -> Dict[str, Any]:
+    '''
+    Run the script of a case once in a new process and return the
+    measurements.
+
+    :param case: The case to run
+    :param inputfilename: The table to run it on
+    :param workdir: Directory for the output and temporary files
+    '''
+    outputfilename = os.path.join(workdir, f'{case.name}.out')
+    statsfilename = os.path.join(workdir, f'{case.name}.json')
+    logfilename = os.path.join(workdir, f'{case.name}.log')
+    command = ([sys.executable, os.path.join(TABLES_DIR, case.script),
+                '-i', inputfilename,
+                '-o', outputfilename,
+                '--stats-json', statsfilename]
+               + [argument.format(workdir=workdir)
+                  for argument in case.arguments])
+    with open(logfilename, 'w', encoding='utf-8') as logfile:
+        process = subprocess.Popen( # pylint: disable=consider-using-with
+            command, cwd=workdir,
+            stdout=logfile, stderr=subprocess.STDOUT)
+        # os.wait4() returns the resource usage of this process alone:
+        (_pid, status, usage) = os.wait4(process.pid, 0)
+        process.returncode = os.waitstatus_to_exitcode(status)
+    if process.returncode:
+        with open(logfilename, 'r', encoding='utf-8') as logfile:
+            raise RuntimeError(f'{case.name} failed:\n{logfile.read()}')
+    with open(statsfilename, 'r', encoding='utf-8') as statsfile:
+        measurements = json.load(statsfile)
+    return {
+        'wall_seconds': measurements['total_seconds'],
+        'phases': measurements['phases'],
+        'counters': measurements['counters'],
+        # Kilobytes on Linux:
+        'peak_rss_kib': usage.ru_maxrss,
+    }
+
+def run_benchmarks(case_names: List[str],
+                   scales: List[int],
+                   repeat: int) -> List[Dict[str, Any]]:
+    '''
+    Run the cases, each in a separate process, and return the results.
+
+    :param case_names: The names of the cases to run
+    :param scales: The factors to scale the tables by
+    :param repeat: How often to run each case, the fastest run counts
+    '''
+    cases = {case.name: case for case in CASES}
+    results: List[Dict[str, Any]] = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for name in case_names:
+            case = cases[name]
+            for scale in scales:
+                if case.name == 'improve_jyutping':
+                    write_unihan_readings(
+                        os.path.join(TABLES_DIR, case.table),
+                        os.path.join(workdir, 'Unihan_Readings.txt'))
+                inputfilename = os.path.join(TABLES_DIR, case.table)
+                if scale != 1:
+                    inputfilename = os.path.join(
+                        workdir, f'{scale}x-{os.path.basename(case.table)}')
+                    scale_table(case, inputfilename, scale)
+                runs: List[Dict[str, Any]] = []
+                for _run in range(repeat):
+                    runs.append(run_case(case, inputfilename, workdir))
+                result = min(runs, key=lambda run: run['wall_seconds'])
+                result['peak_rss_kib'] = max(
+                    run['peak_rss_kib'] for run in runs)
+                result.update({
+                    'case': name,
+                    'table': case.table,
+                    'scale': scale,
+                    'rows': _count_lines(inputfilename),
+                })
+                logging.info('%s %sx: %.3f s', name, scale,
+                             result['wall_seconds'])
+                results.append(result)
+    return results
+
+def _count_lines(filename: str) -> int:
+    with open(filename, 'rb') as inputfile:
+        return sum(1 for _line in inputfile)
+
+def compare_with_baseline(results: List[Dict[str, Any]],
+                          baseline: List[Dict[str, Any]],
+                          tolerance: float) -> List[str]:
+    '''
+    Return descriptions of the runs slower than in the baseline.
+
+    :param results: The results of run_benchmarks()
+    :param baseline: Older results of run_benchmarks()
+    :param tolerance: The fraction by which a run may be slower
+    '''
+    old = {(result['case'], result['scale']): result for result in baseline}
+    regressions: List[str] = []
+    for result in results:
+        key = (result['case'], result['scale'])
+        if key not in old:
+            continue
+        limit = old[key]['wall_seconds'] * (1 + tolerance)
+        if result['wall_seconds'] > limit:
+            regressions.append(
+                f'{result["case"]} {result["scale"]}x: '
+                f'{result["wall_seconds"]:.3f} s, baseline '
+                f'{old[key]["wall_seconds"]:.3f} s, limit {limit:.3f} s')
+    return regressions
+
+def group_phases(phases: Dict[str, float]) -> Dict[str, float]:
+    '''
+    Add up the phases reported by a script into read, transform, sort
+    and write.
+
+    :param phases: Seconds by phase, as written with --stats-json
+    '''
+    groups = {'read': 0.0, 'transform': 0.0, 'sort': 0.0, 'write': 0.0}
+    for (name, seconds) in phases.items():
+        if name.startswith('read'):
+            groups['read'] += seconds
+        elif name in ('sort', 'write'):
+            groups[name] += seconds
+        else:
+            groups['transform'] += seconds
+    return groups
+
+def format_results(results: List[Dict[str, Any]]) -> str:
+    '''
+    Return a table of the results for the terminal
+
+    :param results: The results of run_benchmarks()
+    '''
+    group_names = ('read', 'transform', 'sort', 'write')
+    lines = [f'{"case":<36} {"scale":>5} {"rows":>8} {"wall":>8} '
+             + ' '.join(f'{group:>9}' for group in group_names)
+             + f' {"peak RSS":>10}']
+    for result in results:
+        groups = group_phases(result['phases'])
+        lines.append(
+            f'{result["case"]:<36} {result["scale"]:>4}x {result["rows"]:8} '
+            f'{result["wall_seconds"]:8.3f} '
+            + ' '.join(f'{groups[group]:9.3f}' for group in group_names)
+            + f' {result["peak_rss_kib"] // 1024:7} MiB')
+    return '\n'.join(lines)
+
+def main() -> None:
+    '''Main program'''
+    args = parse_args()
+    log_level = logging.WARNING
+    if args.debug:
+        log_level = logging.DEBUG
+    logging.basicConfig(format="%(levelname)s: %(message)s", level=log_level)
+    case_names = [name for name in args.cases.split(',') if name]
+    unknown = [name for name in case_names
+               if name not in {case.name for case in CASES}]
+    if unknown:
+        logging.error('Unknown cases: %s', ', '.join(unknown))
+        sys.exit(1)
+    scales = [int(scale) for scale in args.scales.split(',') if scale]
+    results = run_benchmarks(case_names, scales, args.repeat)
+    print(format_results(results))
+    document = {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'results': results,
+    }
+    if args.outputfilename:
+        with open(args.outputfilename, 'w', encoding='utf-8') as outputfile:
+            json.dump(document, outputfile, indent=2)
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as outputfile:
+            json.dump(document, outputfile, indent=2)
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as inputfile:
+            baseline = json.load(inputfile)['results']
+        regressions = compare_with_baseline(
+            results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f'SLOWER: {regression}')
+        if regressions:
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -24,107 +24,23 @@ Anthony Wong <yp@anthonywong.net> as a starting point.
 '''
 
 from typing import Any
-from typing import List
 from typing import Dict
+from typing import List
+from typing import Optional
 from typing import Tuple
+import os
 import re
-import unicodedata
-import urllib.request
+import sys
 import logging
 
-MAPPING_TABLE: Dict[str, str] = {
-    # Special cases
-    'm': 'm',
-    'ng': 'ng',
-    'zou': 'jo', # for 做，早
-    'la': 'la', # for 喇
-}
-INITIALS: Dict[str, str] = {
-    # jyutping => cantonese
-    'b': 'b',
-    'p': 'p',
-    'm': 'm',
-    'f': 'f',
-    'd': 'd',
-    't': 't',
-    'n': 'n',
-    'l': 'l',
-    'g': 'g',
-    'k': 'k',
-    'ng': 'ng',
-    'h': 'h',
-    'gw': 'gw',
-    'kw': 'kw',
-    'w': 'w',
-    'z': 'j',
-    'c': 'ch',
-    's': 's',
-    'j': 'y',
-}
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import tabletool # pylint: disable=wrong-import-position
+from tabletool import instrument # pylint: disable=wrong-import-position
+from tabletool import jyutping # pylint: disable=wrong-import-position
+from tabletool import unihan # pylint: disable=wrong-import-position
 
-FINALS: Dict[str, str] = {
-    # jyutping => cantonese
-    'aa': 'a',
-    'aai': 'aai',
-    'aau': 'aau',
-    'aam': 'aam',
-    'aan': 'aan',
-    'aang': 'aang',
-    'aap': 'aap',
-    'aat': 'aat',
-    'aak': 'aak',
-    'ai': 'ai',
-    'au': 'au',
-    'am': 'am',
-    'an': 'an', # special case: 燜 uses 'men'
-    'ang': 'ang',
-    'ap': 'ap',
-    'at': 'at',
-    'ak': 'ak',
-    'e': 'e',
-    'ei': 'ei',
-    'eu': 'eu', # no such pronuncation in original cantonese romanization
-    'em': 'em',
-    'en': 'en',
-    'eng': 'eng',
-    'ep': 'ep',
-    'et': 'et',
-    'ek': 'ek',
-    'i': 'i',
-    'iu': 'iu',
-    'im': 'im',
-    'in': 'in',
-    'ing': 'ing',
-    'ip': 'ip',
-    'it': 'it',
-    'ik': 'ik',
-    'o': 'oh',
-    'oi': 'oi',
-    'ou': 'ou',  # cantonese romanization also use 'o'
-    'om': 'yam', # 媕, om
-    'on': 'on',
-    'ong': 'ong',
-    'ot': 'ot',
-    'ok': 'ok',
-    'u': 'oo',
-    'ui': 'ooi',
-    'un': 'oon',
-    'ung': 'ung',
-    'ut': 'oot',
-    'uk': 'uk',
-    'oe': 'oe', # seems no corresponding romanization in cantonese
-    'eoi': 'ui',
-    'eon': 'un',
-    'oeng': 'eung',
-    'eot': 'ut',
-    'oet': 'ut', # 㖀, loet
-    'oek': 'euk',
-    'yu': 'ue',
-    'yun': 'uen',
-    'yut': 'uet',
-    'm': 'am',   # 噷, hm
-    'ng': 'ang', # 哼, hng
-}
+JYUTPING_CONVERTER = jyutping.JyutpingConverter()
 
 def parse_args() -> Any:
     '''Parse the command line arguments'''
@@ -147,6 +63,7 @@ def parse_args() -> Any:
                         type=str,
                         default='Unihan_Readings.txt',
                         help=('file to use for the readings, '
+                              'can also be Unihan.zip, '
                               'default is %(default)s'))
     parser.add_argument('-f', '--frequencyfilename',
                         nargs='?',
@@ -154,203 +71,141 @@ def parse_args() -> Any:
                         default='cantonese.txt',
                         help=('file to use for the frequencies, '
                               'default is %(default)s'))
+    instrument.add_arguments(parser)
     parser.add_argument('-d', '--debug',
                         action='store_true',
                         help='print debugging output')
     return parser.parse_args()
 
-def convert_jp_to_cantonese(jp: str) -> str:
-    if not jp:
-        return ''
-    if jp in MAPPING_TABLE:
-        return MAPPING_TABLE[jp]
-    initial = ''
-    for key in INITIALS:
-        if not jp.startswith(key):
-            continue
-        if len(jp) == len(key):
-            MAPPING_TABLE[jp] = INITIALS[key]
-            return MAPPING_TABLE[jp]
-        if len(key) > len(initial):
-            initial = key
-    for final in FINALS:
-        if not jp == initial + final:
-            continue
-        if not initial:
-            MAPPING_TABLE[jp] = FINALS[final]
-        else:
-            MAPPING_TABLE[jp] = INITIALS[initial] + FINALS[final]
-        return MAPPING_TABLE[jp]
-    logging.error('Impossible!')
-    exit(1)
-
-def create_freq_table(inputfilename: str) -> Dict[Tuple[str, str], str]:
+def create_freq_table(inputfilename: str) -> Dict[Tuple[str, str], int]:
     '''
     Read the frequencies from the frequency file (default: cantonese.txt)
     '''
-    head: List[str] = []
-    tail: List[str] = []
-    table: Dict[Tuple[str, str], str] = {}
-    reading_head = True
-    reading_table = True
-    reading_tail = True
-    with open(inputfilename, 'r') as inputfile:
-        logging.info("input file=%s", inputfile)
-        for line in inputfile:
-            if reading_head and not line.startswith('BEGIN_TABLE'):
-                head.append(line)
-                continue
-            if reading_head:
-                logging.info('Header read.')
-                head.append('BEGIN_TABLE\n')
-                reading_head = False
-                continue
-            if reading_table and not line.startswith('END_TABLE'):
-                (input,
-                 chinese_character,
-                 weight) = line.strip().split('\t')[:3]
-                table[(input, chinese_character)] = weight
-                continue
-            if reading_table:
-                logging.info('Table read.')
-                reading_table = False
-            tail.append(line)
+    table: Dict[Tuple[str, str], int] = {}
+    with tabletool.TableReader(inputfilename) as reader:
+        for row in reader:
+            table[(row.code, row.phrase)] = row.weight
+    logging.info('Table read.')
     return table
 
+# Tonal markers using letters instead of digits according to:
+# https://github.com/rime/rime-cantonese/blob/main/README-en.md#tonal-markers
+TONE_LETTERS = str.maketrans({
+    # High level, e.g. siv → 詩; High level checked, e.g. sikv → 色
+    '1': 'v',
+    # Medium rising, e.g. six → 史
+    '2': 'x',
+    # Medium level, e.g. siq→ 試; Medium level checked, e.g. sekq → 錫
+    '3': 'q',
+    # Low falling, e.g. sivv → 時
+    '4': 'vv',
+    # Low rising, e.g. sixx → 市
+    '5': 'xx',
+    # Low level, e.g. siqq→ 事; Low level checked, e.g. sikqq → 食
+    '6': 'qq',
+})
+
+# A Jyutping reading with the tone digit:
+READING_PATTERN = re.compile(r'[a-zA-Z1-6]+')
+
 def create_all_pinyin_table(
         inputfilename: str,
-        freq_table: Dict[Tuple[str, str], str]
-) -> Dict[Tuple[str, str], Dict[str, str]]:
-    table: Dict[Tuple[str, str], Dict[str, str]] = {}
-    pattern = re.compile(
-        r'^U\+(?P<codepoint>[0-9A-Z]+)\s+kCantonese\s+(?P<pinyin>[a-zA-Z1-6]+)$')
-    with open(inputfilename, 'r') as inputfile:
-        logging.info("input file=%s", inputfile)
-        for line in inputfile:
-            match = pattern.match(line)
-            if not match:
-                continue
-            codepoint = match.group('codepoint')
-            pinyin = match.group('pinyin')
-            # Tonal markers using letters instead of digits according to:
-            # https://github.com/rime/rime-cantonese/blob/main/README-en.md#tonal-markers
-            trans_table = {
-                # High level, e.g. siv → 詩; High level checked, e.g. sikv → 色
-                ord('1'): 'v',
-                # Medium rising, e.g. six → 史
-                ord('2'): 'x',
-                # Medium level, e.g. siq→ 試; Medium level checked, e.g. sekq → 錫
-                ord('3'): 'q',
-                # Low falling, e.g. sivv → 時
-                ord('4'): 'vv',
-                # Low rising, e.g. sixx → 市
-                ord('5'): 'xx',
-                # Low level, e.g. siqq→ 事; Low level checked, e.g. sikqq → 食
-                ord('6'): 'qq',
-            }
-            pinyin_letters = pinyin.translate(trans_table)
-            pinyin_toneless = pinyin[:-1]
-            cantonese = convert_jp_to_cantonese(pinyin_toneless)
-            char = chr(int(codepoint, 16))
-            frequency = '0'
-            if (cantonese, char) in freq_table:
-                frequency = freq_table[(cantonese, char)]
-            table[(pinyin_toneless, char)] = {
-                'pinyin': pinyin,
-                'pinyin_letters': pinyin_letters,
-                'cantonese': cantonese,
-                'frequency': frequency,
-            }
+        freq_table: Dict[Tuple[str, str], int]
+) -> Dict[Tuple[str, str], Dict[str, Any]]:
+    '''
+    Read the kCantonese readings from the Unihan file.
+
+    Returns a dictionary with the keys (reading, character), a
+    character with several readings has several entries.
+
+    inputfilename may also be Unihan.zip.
+
+    Raises tabletool.jyutping.SyllableError if a reading is not
+    valid Jyutping.
+    '''
+    readings: List[Tuple[str, str]] = []
+    for (char, pinyin) in unihan.iter_readings(inputfilename, 'kCantonese'):
+        if not READING_PATTERN.fullmatch(pinyin):
+            logging.warning('Ignoring reading %s of %s', pinyin, char)
+            continue
+        readings.append((char, pinyin))
+    # Convert the whole column at once:
+    cantonese_column = JYUTPING_CONVERTER.to_cantonese_many(
+        pinyin[:-1] for (_char, pinyin) in readings)
+    table: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    for ((char, pinyin), cantonese) in zip(readings, cantonese_column):
+        table[(pinyin, char)] = {
+            'pinyin_toneless': pinyin[:-1],
+            'pinyin_letters': pinyin.translate(TONE_LETTERS),
+            'cantonese': cantonese,
+            'frequency': freq_table.get((cantonese, char), 0),
+        }
     return table
 
 def improve_jyutping(
         inputfilename: str,
         outputfilename: str,
-        all_pinyin: Dict[Tuple[str, str], Dict[str, str]] = {}) -> None:
+        all_pinyin: Dict[Tuple[str, str], Dict[str, Any]] = {},
+        stats: Optional[instrument.Stats] = None) -> None:
     '''
     Read the jyutping.txt file and write an improved version
+
+    :param stats: Collects the time of the phases and the counters
     '''
-    head: List[str] = []
-    tail: List[str] = []
-    table: Dict[Tuple[str, str], str] = {}
-    reading_head = True
-    reading_table = True
-    reading_tail = True
-    with open(inputfilename, 'r') as inputfile:
-        logging.info("input file=%s", inputfile)
-        for line in inputfile:
-            if reading_head and not line.startswith('BEGIN_TABLE'):
-                head.append(line)
-                continue
-            if reading_head:
-                logging.info('Header read.')
-                head.append('BEGIN_TABLE\n')
-                reading_head = False
-                continue
-            if reading_table and not line.startswith('END_TABLE'):
-                stripped_line = line.strip().split('\t')
-                if len(stripped_line) < 4:
-                    stripped_line.append('')
-                (input,
-                 chinese_character,
-                 weight,
-                 comment) = stripped_line
-                table[(input, chinese_character)] = {
-                    'weight': int(weight),
-                    'comment': comment,
-                    }
-                continue
-            if reading_table:
-                logging.info('Table read.')
-                reading_table = False
-            tail.append(line)
-    for (pinyin_toneless, chinese_character) in all_pinyin:
-        if (pinyin_toneless, chinese_character) in table:
-            frequency_orig = table[
-                (pinyin_toneless, chinese_character)]['weight']
-            frequency = all_pinyin[
-                (pinyin_toneless, chinese_character)]['frequency']
-            pinyin = all_pinyin[
-                (pinyin_toneless, chinese_character)]['pinyin']
-            pinyin_letters =  all_pinyin[
-                (pinyin_toneless, chinese_character)]['pinyin_letters']
-            if (int(frequency_orig) == 0 and int(frequency) > 0):
-                logging.info(
-                    'Adding frequency from cantonese.txt %s %s %s -> %s',
-                    pinyin_toneless, chinese_character, frequency_orig, frequency)
-                table[(pinyin_toneless, chinese_character)][
-                    'weight'] = frequency
-            if (pinyin_toneless != pinyin_letters
-                and pinyin_letters.startswith(pinyin_toneless)
-                and (pinyin_letters, chinese_character) not in table):
-                logging.info(
-                    'Adding tone %s %s -> %s -> %s',
-                    pinyin_toneless, chinese_character, pinyin, pinyin_letters)
-                table[(pinyin_letters, chinese_character)]['weight'] = (
-                    table[(pinyin_toneless, chinese_character)]['weight'])
-                # Keep entry with the toneless pinyin to make typing
-                # without pinyin still get exact matches, i.e. do not
-                # delete the toneless entry:
-                # del table[(pinyin_toneless, chinese_character)]
-    with open(outputfilename, 'w') as outputfile:
-        logging.info("output file=%s", outputfile)
-        for line in head:
-            outputfile.write('%s' % line)
-        for ((input, chinese_character), value) in sorted(table.items(),
-                                                   key=lambda x: (
-                                                       x[0][0],   # input
-                                                       #x[0][1],   # Chinese character
-                                                       -x[1]['weight'], # weight
-                                                   )):
-            if value['comment']:
-                outputfile.write(
-                    f'{input}\t{chinese_character}\t'
-                    f'{value["weight"]}\t{value["comment"]}\n')
-            else:
-                outputfile.write(
-                    f'{input}\t{chinese_character}\t{value["weight"]}\n')
-        for line in tail:
-            outputfile.write('%s' % line)
+    if stats is None:
+        stats = instrument.Stats()
+    table: Dict[Tuple[str, str], tabletool.Row] = {}
+    with stats.phase('read'), \
+         tabletool.TableReader(inputfilename) as reader:
+        for row in reader:
+            table[(row.code, row.phrase)] = row
+        head = reader.head
+        tail = reader.tail
+    stats.count('rows in', len(table))
+    logging.info('Table read.')
+    with stats.phase('transform'):
+        for ((pinyin, chinese_character), reading) in all_pinyin.items():
+            pinyin_toneless = reading['pinyin_toneless']
+            if (pinyin_toneless, chinese_character) in table:
+                frequency_orig = table[
+                    (pinyin_toneless, chinese_character)].weight
+                frequency = reading['frequency']
+                pinyin_letters = reading['pinyin_letters']
+                if (frequency_orig == 0 and frequency > 0):
+                    logging.debug(
+                        'Adding frequency from cantonese.txt %s %s %s -> %s',
+                        pinyin_toneless, chinese_character, frequency_orig, frequency)
+                    stats.count('frequencies added')
+                    table[(pinyin_toneless, chinese_character)].weight = frequency
+                if (pinyin_toneless != pinyin_letters
+                    and pinyin_letters.startswith(pinyin_toneless)
+                    and (pinyin_letters, chinese_character) not in table):
+                    logging.debug(
+                        'Adding tone %s %s -> %s -> %s',
+                        pinyin_toneless, chinese_character, pinyin, pinyin_letters)
+                    stats.count('tones added')
+                    table[(pinyin_letters, chinese_character)] = tabletool.Row(
+                        pinyin_letters, chinese_character,
+                        table[(pinyin_toneless, chinese_character)].weight)
+                    # Keep entry with the toneless pinyin to make typing
+                    # without pinyin still get exact matches, i.e. do not
+                    # delete the toneless entry:
+                    # del table[(pinyin_toneless, chinese_character)]
+    logging.info('%s frequencies added, %s tones added.',
+                 stats.counters.get('frequencies added', 0),
+                 stats.counters.get('tones added', 0))
+    with stats.phase('sort'):
+        rows = sorted(table.values(),
+                      key=lambda row: (
+                          row.code,
+                          #row.phrase, # Chinese character
+                          -row.weight,
+                      ))
+    with stats.phase('write'), \
+         tabletool.TableWriter(outputfilename) as writer:
+        writer.write_lines(head)
+        stats.count('rows out', writer.write_rows(rows))
+        writer.write_lines(tail)
 
 def main() -> None:
     '''Main program'''
@@ -359,11 +214,20 @@ def main() -> None:
     if args.debug:
         log_level = logging.DEBUG
     logging.basicConfig(format="%(levelname)s: %(message)s", level=log_level)
-    freq_table = create_freq_table(args.frequencyfilename)
-    all_pinyin = create_all_pinyin_table(args.unihanreadingsfilename, freq_table)
-    improve_jyutping(args.inputfilename,
-                     args.outputfilename,
-                     all_pinyin)
+    with instrument.session_from_args(args) as stats:
+        with stats.phase('read frequencies'):
+            freq_table = create_freq_table(args.frequencyfilename)
+        try:
+            with stats.phase('read readings'):
+                all_pinyin = create_all_pinyin_table(
+                    args.unihanreadingsfilename, freq_table)
+        except jyutping.SyllableError as error:
+            logging.error('%s', error)
+            sys.exit(1)
+        improve_jyutping(args.inputfilename,
+                         args.outputfilename,
+                         all_pinyin,
+                         stats)
 
 if __name__ == '__main__':
     main()
@@ -27,18 +27,24 @@ with x. If such a line exists, change the priority from 1000 to
 
 from typing import Any
 from typing import List
-from typing import Dict
-import re
+from typing import Optional
+from typing import Tuple
+import os
+import sys
 import unicodedata
-import urllib.request
 import logging
 
-IMPORT_CHINESE_VARIANTS_SUCCESSFUL = False
-try:
-    import chinese_variants
-    IMPORT_CHINESE_VARIANTS_SUCCESSFUL = True
-except (ImportError,):
-    IMPORT_CHINESE_VARIANTS_SUCCESSFUL = False
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import tabletool # pylint: disable=wrong-import-position
+from tabletool import compatibility # pylint: disable=wrong-import-position
+from tabletool import instrument # pylint: disable=wrong-import-position
+from tabletool import taiwan_usage # pylint: disable=wrong-import-position
+from tabletool import variants # pylint: disable=wrong-import-position
+
+# How to order characters with the same code and weight, see
+# tabletool/ordering.py:
+TIE_BREAK = 'unicode'
 
 def parse_args() -> Any:
     '''Parse the command line arguments'''
@@ -58,74 +64,73 @@ def parse_args() -> Any:
                         type=str,
                         default='quick5.txt.new',
                         help='output file, default is %(default)s')
+    parser.add_argument('--variants',
+                        nargs='?',
+                        type=str,
+                        default=variants.DEFAULT_VARIANTS,
+                        help=('classification written by “python3 -m '
+                              'tabletool compile-variants”, or '
+                              'Unihan_Variants.txt or Unihan.zip, used to '
+                              'count the rows classified as simplified '
+                              'only, default is %(default)s'))
+    parser.add_argument('--no-variants',
+                        dest='variants',
+                        action='store_const',
+                        const='',
+                        help=('do not classify the characters as '
+                              'simplified or traditional'))
+    taiwan_usage.add_arguments(parser)
+    instrument.add_arguments(parser)
     parser.add_argument('-d', '--debug',
                         action='store_true',
                         help='print debugging output')
     return parser.parse_args()
 
-def big5_code(phrase: str) -> bytes:
-    '''
-    Encode a string in Big5 or, if that is not possible,
-    return something higher than any Big5 code.
-
-    :param phrase: String to be encoded in Big5 encoding
-    '''
-    try:
-        big5 = phrase.encode('Big5')
-    except UnicodeEncodeError:
-        big5 = b'\xff\xff' # higher than any Big5 code
-    return big5
-
-def improve_quick5(inputfilename: str, outputfilename: str) -> None:
+def improve_quick5(
+        inputfilename: str,
+        outputfilename: str,
+        usage_oracle: Optional[taiwan_usage.UsageOracle] = None,
+        stats: Optional[instrument.Stats] = None,
+        classifier: Optional[variants.VariantClassifier] = None) -> None:
     '''
     Read the quick5.txt file and write an improved version
+
+    :param inputfilename: The table to read
+    :param outputfilename: The file to write the improved table to
+    :param usage_oracle: Used to check whether characters classified
+                         as simplified only are used in Taiwan
+    :param stats: Collects the time of the phases and the counters
+    :param classifier: Classifies the characters as simplified or
+                       traditional, the characters classified as
+                       simplified only are checked for usage in Taiwan
+                       if usage_oracle is given as well
     '''
-    head: List[str] = []
-    tail: List[str] = []
-    table: Dict[Tuple[str, str], int] = {}
-    reading_head = True
-    reading_table = True
-    reading_tail = True
-    with open(inputfilename, 'r') as inputfile:
-        logging.info("input file=%s", inputfile)
-        for line in inputfile:
-            if reading_head and not line.startswith('BEGIN_TABLE'):
-                head.append(line)
-                continue
-            if reading_head:
-                logging.info('Header read.')
-                head.append('BEGIN_TABLE\n')
-                reading_head = False
-                continue
-            if reading_table and not line.startswith('END_TABLE'):
-                stripped_line = line.strip().split('\t')
-                if len(stripped_line) < 4:
-                    stripped_line.append('')
-                (input,
-                 chinese_character,
-                 weight,
-                 comment) = stripped_line
-                if (input, chinese_character) in table:
-                    first_weight = table[(input, chinese_character)]['weight']
-                    logging.warning(
-                        'duplicate %s %s first weight=%s second weight=%s',
-                        input, chinese_character,
-                        first_weight, weight)
-                    table[(input, chinese_character)]['weight'] = max(
-                        int(weight), int(first_weight))
-                    continue
-                table[(input, chinese_character)] = {
-                    'weight': int(weight),
-                    'comment':  comment,
-                    }
-                continue
-            if reading_table:
-                logging.info('Table read.')
-                reading_table = False
-            tail.append(line)
-    for (input, chinese_character) in table:
-        unicode_name = unicodedata.name(chinese_character, '')
-        if unicode_name.startswith('CJK COMPATIBILITY IDEOGRAPH'):
+    if stats is None:
+        stats = instrument.Stats()
+    with stats.phase('read'):
+        table = tabletool.ColumnTable.read(inputfilename)
+    stats.count('rows in', len(table))
+    with stats.phase('merge-dupes'):
+        stats.count('rows merged',
+                    tabletool.merge_duplicates(table, keep_max_weight=True))
+    logging.info('Table read.')
+    simplified_only: List[Tuple[str, str]] = []
+    if classifier:
+        with stats.phase('classify'):
+            simplified_only = [
+                (input, chinese_character)
+                for (input, chinese_character, category)
+                in zip(table.codes, table.phrases,
+                       classifier.categories(table.phrases))
+                if category == variants.SIMPLIFIED]
+        stats.count('simplified only', len(simplified_only))
+        logging.info('%s rows classified as simplified only.',
+                     len(simplified_only))
+    for (i, (input, chinese_character)) in enumerate(
+            zip(table.codes, table.phrases)):
+        if (chinese_character
+                in compatibility.CJK_COMPATIBILITY_IDEOGRAPHS):
+            unicode_name = unicodedata.name(chinese_character, '')
             unicode_decomposition = unicodedata.decomposition(
                 chinese_character)
             unicode_decomposition_char = ''
@@ -135,61 +140,37 @@ def improve_quick5(inputfilename: str, outputfilename: str) -> None:
             logging.info('%s\t%s\t%s %s %s %s',
                          input,
                          chinese_character,
-                         table[(input, chinese_character)]['weight'],
+                         table.weights[i],
                          unicode_name,
                          unicode_decomposition,
                          unicode_decomposition_char)
-        if IMPORT_CHINESE_VARIANTS_SUCCESSFUL:
-            number_of_problems_with_chinese_variants: int = 0
-            category = chinese_variants.detect_chinese_category(
-                chinese_character)
-            if category == 1:
-                used_in_taiwan = False
-                utf8_for_url = ''
-                for byte in chinese_character.encode('utf-8'):
-                    utf8_for_url += f'%{byte:X}'
-                url = (f'https://dict.revised.moe.edu.tw/'
-                       f'search.jsp?md=1&word={utf8_for_url}#searchL')
-                with urllib.request.urlopen(url) as f:
-                    page = f.read().decode('utf-8')
-                    if page and '查無資料' not in page:
-                        used_in_taiwan = True
-                if used_in_taiwan:
-                    number_of_problems_with_chinese_variants += 1
-                    logging.info(
-                        'Classified as simplified only: %s\t%s\tused_in_taiwan=%s',
-                        input, chinese_character, repr(used_in_taiwan))
-        if input.startswith('x'):
-            valid_input_chars_without_x = 'abcdefghijklmnopqrstuvwyz'
-            for input1 in valid_input_chars_without_x:
-                if (input1, chinese_character) in table:
-                    table[(input1, chinese_character)]['weight'] = 900
-                for input2 in valid_input_chars_without_x:
-                    if (input1 + input2, chinese_character) in table:
-                        table[(input1 + input2, chinese_character)]['weight'] = 900
-    if IMPORT_CHINESE_VARIANTS_SUCCESSFUL:
+    with stats.phase('demote-x-short'):
+        stats.count('rows demoted', tabletool.demote_redundant_codes(
+            table,
+            tabletool.short_code_predicate(
+                valid_input_chars='abcdefghijklmnopqrstuvwyz', # without x
+                max_length=2)))
+    if classifier and usage_oracle:
+        number_of_problems_with_chinese_variants: int = 0
+        with stats.phase('usage lookup'):
+            used_in_taiwan = usage_oracle.lookup_many(
+                chinese_character for (_input, chinese_character)
+                in simplified_only)
+        for (input, chinese_character) in simplified_only:
+            if used_in_taiwan[chinese_character]:
+                number_of_problems_with_chinese_variants += 1
+                logging.info(
+                    'Classified as simplified only: %s\t%s\tused_in_taiwan=%s',
+                    input, chinese_character,
+                    repr(used_in_taiwan[chinese_character]))
         logging.info(
             'number_of_problems_with_chinese_variants=%s',
             number_of_problems_with_chinese_variants)
-    with open(outputfilename, 'w') as outputfile:
-        logging.info("output file=%s", outputfile)
-        for line in head:
-            outputfile.write('%s' % line)
-        for ((input, chinese_character), value) in sorted(table.items(),
-                                                   key=lambda x: (
-                                                       x[0][0],
-                                                       -x[1]['weight'],
-                                                       ord(x[0][1]), # Unicode code point
-                                                   )):
-            if value['comment']:
-                outputfile.write('%s\t%s\t%s\t%s\n'
-                                 % (input, chinese_character, value['weight'],
-                                    value['comment']))
-            else:
-                outputfile.write('%s\t%s\t%s\n'
-                                 % (input, chinese_character, value['weight']))
-        for line in tail:
-            outputfile.write('%s' % line)
+    with stats.phase('sort'):
+        table.sort(tie_break=TIE_BREAK)
+    with stats.phase('write'):
+        table.write(outputfilename)
+    stats.count('rows out', len(table))
 
 def main() -> None:
     '''Main program'''
@@ -198,7 +179,17 @@ def main() -> None:
     if args.debug:
         log_level = logging.DEBUG
     logging.basicConfig(format="%(levelname)s: %(message)s", level=log_level)
-    improve_quick5(args.inputfilename, args.outputfilename)
+    classifier = None
+    usage_oracle = None
+    if args.variants:
+        classifier = variants.VariantClassifier.read(args.variants)
+    if classifier and args.check_taiwan_usage:
+        usage_oracle = taiwan_usage.oracle_from_args(args)
+    with instrument.session_from_args(args) as stats:
+        improve_quick5(args.inputfilename, args.outputfilename,
+                       usage_oracle, stats, classifier)
+    if usage_oracle:
+        usage_oracle.close()
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,56 @@
+#
+# Copyright (c) 2026 Mike FABIAN <mfabian@redhat.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+'''
+Shared helpers for the scripts maintaining the table sources.
+'''
+
+from .columns import ColumnTable
+from .passes import PASSES
+from .passes import demote_redundant_codes
+from .passes import drop_cjk_compatibility_ideographs
+from .passes import merge_duplicates
+from .passes import prefix_removed_predicate
+from .passes import run_passes
+from .passes import short_code_predicate
+from .tablefile import Row
+from .tablefile import TableFormatError
+from .tablefile import TableReader
+from .tablefile import TableWriter
+from .tablefile import parse_definitions
+from .tablefile import parse_row
+from .tablefile import read_table
+from .taiwan_usage import MoeDictUsageOracle
+from .taiwan_usage import UsageOracle
+
+__all__ = [
+    'ColumnTable',
+    'MoeDictUsageOracle',
+    'PASSES',
+    'Row',
+    'TableFormatError',
+    'TableReader',
+    'TableWriter',
+    'UsageOracle',
+    'demote_redundant_codes',
+    'drop_cjk_compatibility_ideographs',
+    'merge_duplicates',
+    'parse_definitions',
+    'parse_row',
+    'prefix_removed_predicate',
+    'read_table',
+    'run_passes',
+    'short_code_predicate',
+]
@@ -0,0 +1,1005 @@
+#
+# Copyright (c) 2026 Mike FABIAN <mfabian@redhat.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+'''
+Command line interface to the table tools:
+
+    python3 -m tabletool <command> [options]
+
+Run “python3 -m tabletool <command> --help” for the options of
+each command.
+'''
+
+from typing import Any
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Union
+import json
+import logging
+import os
+import shlex
+import subprocess
+import sys
+import tempfile
+import time
+
+from . import instrument
+from .build import build_tables
+from .build import find_table_sources
+from .build import format_report
+from .check import CHECKS
+from .check import MAX_WEIGHT
+from .check import check_tables
+from .check import find_table_files
+from .check import format_problem
+from .columns import ColumnTable
+from .compiled import CompiledTable
+from .compiled import is_compiled
+from .compiled import write_compiled
+from .compose import CHUNK_ROWS
+from .compose import compose_table
+from .compose import read_manifest
+from .corpus import CHUNK_SIZE
+from .corpus import count_corpus
+from .corpus import scale_counts
+from .corpus import write_counts
+from .database import compare_databases
+from .database import patch_database
+from .database import write_database
+from .frequency import generate_freq
+from .frequency import read_corpus
+from .ordering import TIE_BREAKS
+from .passes import PASSES
+from .passes import run_passes
+from .reverse import ReverseIndex
+from .reverse import benchmark as benchmark_reverse_index
+from .reverse import random_chars
+from .reverse import read_tables
+from .reverse import write_reverse_index
+from .simulate import codes_from_text
+from .simulate import simulate
+from .tablefile import TableReader
+from .tablefile import read_table
+from .tablestats import tables_stats
+from .variants import BOTH
+from .variants import DEFAULT_VARIANTS
+from .variants import MIXED
+from .variants import SIMPLIFIED
+from .variants import TRADITIONAL
+from .variants import VariantClassifier
+from .variants import language_filter
+from .variants import read_unihan_variants
+from .variants import simplified_only_rows
+from .variants import write_variants
+from .wildcard import WildcardIndex
+from .wildcard import benchmark
+from .wildcard import random_patterns
+
+def _rewrite(args: Any) -> int:
+    '''Read a table once, run passes over it, sort and write it once'''
+    names = [name.strip() for name in args.passes.split(',') if name.strip()]
+    unknown = [name for name in names if name not in PASSES]
+    if unknown:
+        logging.error('Unknown passes: %s, available are: %s',
+                      ', '.join(unknown), ', '.join(sorted(PASSES)))
+        return 1
+    stats = args.stats
+    with stats.phase('read'):
+        table = ColumnTable.read(args.inputfilename)
+    stats.count('rows in', len(table))
+    results = run_passes(table, names)
+    for result in results:
+        # A pass may run several times, add up its times like
+        # stats.phase() does:
+        stats.phases[result.name] = (stats.phases.get(result.name, 0.0)
+                                     + result.seconds)
+        stats.count(f'rows changed by {result.name}', result.rows_changed)
+    with stats.phase('sort'):
+        table.sort(tie_break=args.tie_break)
+    with stats.phase('write'):
+        table.write(args.outputfilename)
+    stats.count('rows out', len(table))
+    print(f'{"read":<16} {stats.phases["read"]:8.3f} s')
+    for result in results:
+        print(f'{result.name:<16} {result.seconds:8.3f} s '
+              f'{result.rows_changed:8} rows changed')
+    print(f'{"sort":<16} {stats.phases["sort"]:8.3f} s')
+    print(f'{"write":<16} {stats.phases["write"]:8.3f} s {len(table):8} rows')
+    return 0
+
+def _freq(args: Any) -> int:
+    '''Add weights to headless sources and write a complete table source'''
+    corpus = None
+    if args.corpus:
+        corpus = read_corpus(args.corpus)
+    generate_freq(args.inputfilenames,
+                  args.outputfilename,
+                  headfilename=args.head,
+                  tailfilename=args.tail,
+                  start=args.start,
+                  corpus=corpus,
+                  default=args.default_weight)
+    return 0
+
+def _compose(args: Any) -> int:
+    '''Write a table composed of the sources listed in a manifest'''
+    start = time.perf_counter()
+    manifest = read_manifest(args.manifest)
+    count = compose_table(manifest,
+                          args.outputfilename,
+                          head=args.head,
+                          tail=args.tail,
+                          chunk_rows=args.chunk_rows)
+    print(f'{count} rows of {len(manifest.sources)} sources written to '
+          f'{args.outputfilename} in {time.perf_counter() - start:.3f} s')
+    return 0
+
+def _corpus_freq(args: Any) -> int:
+    '''Count the phrases of a table in a corpus and use them as weights'''
+    if not args.outputfilename and not args.counts:
+        logging.error('Nothing to do, give -o or --counts')
+        return 1
+    start = time.perf_counter()
+    table = ColumnTable.read(args.inputfilename, all_sections=True)
+    counts = count_corpus(args.corpus,
+                          set(table.phrases),
+                          jobs=args.jobs,
+                          chunk_size=args.chunk_size * 1024 * 1024)
+    print(f'{len(counts)} of {len(set(table.phrases))} phrases found '
+          f'{sum(counts.values())} times '
+          f'in {time.perf_counter() - start:.3f} s')
+    if args.counts:
+        write_counts(args.counts, counts)
+    if args.outputfilename:
+        weights = scale_counts(counts, args.scale, args.max_weight)
+        for (index, phrase) in enumerate(table.phrases):
+            table.weights[index] = weights.get(phrase, args.default_weight)
+        table.write(args.outputfilename)
+    return 0
+
+def _build(args: Any) -> int:
+    '''Build the .db files of all tables in parallel'''
+    start = time.perf_counter()
+    tables = find_table_sources(os.path.abspath(args.sourcedir),
+                                os.path.abspath(args.builddir))
+    if args.tables:
+        tables = [table for table in tables
+                  if table.name in args.tables or table.target in args.tables]
+    results = build_tables(tables,
+                           os.path.abspath(args.builddir),
+                           createdb=args.createdb,
+                           jobs=args.jobs,
+                           force=args.force)
+    print(format_report(results, time.perf_counter() - start))
+    if any(result.status == 'failed' for result in results):
+        return 1
+    return 0
+
+def _build_db(args: Any) -> int:
+    '''Write the database of a table directly'''
+    start = time.perf_counter()
+    with TableReader(args.source, all_sections=True) as reader:
+        # reader.tail is only available after all rows have been read:
+        def tail() -> Iterator[str]:
+            yield from reader.tail
+        try:
+            count = write_database(args.name, reader.head, reader, tail())
+        except ValueError as error:
+            logging.error('%s', error)
+            return 1
+    print(f'{count} phrases written to {args.name} '
+          f'in {time.perf_counter() - start:.3f} s')
+    if not args.compare:
+        return 0
+    with tempfile.TemporaryDirectory() as tmpdir:
+        dbfilename = os.path.join(tmpdir, os.path.basename(args.name))
+        start = time.perf_counter()
+        process = subprocess.run(
+            shlex.split(args.createdb)
+            + ['-n', dbfilename, '-s', args.source],
+            capture_output=True, text=True, check=False)
+        if process.returncode:
+            logging.error('%s failed: %s', args.createdb, process.stderr)
+            return 1
+        print(f'{args.createdb} took {time.perf_counter() - start:.3f} s')
+        differences = compare_databases(args.name, dbfilename)
+    for difference in differences:
+        print(difference)
+    if differences:
+        print(f'{args.name} differs from the database '
+              f'written by {args.createdb}')
+        return 1
+    print(f'{args.name} has the same ime, phrases and pinyin tables as '
+          f'the database written by {args.createdb}')
+    return 0
+
+def _patch_db(args: Any) -> int:
+    '''Apply the changes of a table source to an existing database'''
+    start = time.perf_counter()
+    old_rows = None
+    if args.old:
+        (_head, old_rows, _tail) = read_table(args.old, all_sections=True)
+    with TableReader(args.source, all_sections=True) as reader:
+        # reader.tail is only available after all rows have been read:
+        def tail() -> Iterator[str]:
+            yield from reader.tail
+        result = patch_database(args.name, reader.head, reader, tail(),
+                                old_rows=old_rows,
+                                serial_number=args.serial_number)
+    print(f'{args.name} patched in {time.perf_counter() - start:.3f} s: '
+          f'{result.inserted} inserted, {result.deleted} deleted, '
+          f'{result.updated} updated')
+    return 0
+
+def _reverse_index(args: Any) -> int:
+    '''Write the reverse index from characters to codes'''
+    start = time.perf_counter()
+    filenames = args.tables or find_table_files(os.path.abspath(args.sourcedir))
+    tables = read_tables(filenames, args.sourcedir)
+    entries = write_reverse_index(args.outputfilename, tables)
+    print(f'{entries} codes of {len(tables)} tables written to '
+          f'{args.outputfilename} in {time.perf_counter() - start:.3f} s')
+    return 0
+
+def _codes(args: Any) -> int:
+    '''Look up the codes of characters in the reverse index'''
+    with ReverseIndex(args.index) as index:
+        if args.benchmark:
+            tables = read_tables(
+                [os.path.join(args.sourcedir, 'tables', name)
+                 for name in index.tables],
+                args.sourcedir)
+            report = benchmark_reverse_index(
+                index, tables, random_chars(tables, args.benchmark, args.seed))
+            print(f'{report["lookups"]} lookups: '
+                  f'index p50 {report["index_us"]["p50"]:.1f} µs '
+                  f'max {report["index_us"]["max"]:.1f} µs, '
+                  f'scan p50 {report["scan_us"]["p50"]:.1f} µs '
+                  f'max {report["scan_us"]["max"]:.1f} µs')
+            return 0
+        status = 0
+        for text in args.text:
+            for (char, entries) in index.lookup_text(text):
+                if not entries:
+                    print(f'{char}\t(no codes)')
+                    status = 1
+                for entry in entries:
+                    if args.table and entry.table not in args.table:
+                        continue
+                    print(f'{char}\t{entry.table}\t{entry.code}\t'
+                          f'{entry.weight}')
+    return status
+
+def _read_lines(filename: str) -> List[str]:
+    with open(filename, 'r', encoding='utf-8') as inputfile:
+        return [line.rstrip('\n') for line in inputfile]
+
+def _simulate(args: Any) -> int:
+    '''Replay typing on tables and report the candidate lookups'''
+    reports: Dict[str, Any] = {}
+    print(f'{"table":<24} {"lookups":>8} {"p50 µs":>8} {"p99 µs":>8} '
+          f'{"p50 cand":>8} {"p99 cand":>8} {"max cand":>8}  worst code')
+    for filename in args.tables:
+        table: Union[ColumnTable, CompiledTable]
+        if is_compiled(filename):
+            table = CompiledTable(filename)
+        else:
+            table = ColumnTable.read(filename, all_sections=True)
+        sequences: Optional[List[str]] = None
+        if args.keys:
+            sequences = [line.strip() for line in _read_lines(args.keys)
+                         if line.strip()]
+        elif args.text:
+            sequences = list(codes_from_text(table, _read_lines(args.text)))
+        report = simulate(table, sequences, args.match, args.limit,
+                          args.worst)
+        reports[filename] = report
+        worst = report['worst_codes'][0] if report['worst_codes'] else {}
+        print(f'{os.path.basename(filename):<24} {report["lookups"]:8} '
+              f'{report["latency_us"]["p50"]:8.1f} '
+              f'{report["latency_us"]["p99"]:8.1f} '
+              f'{report["candidates"]["p50"]:8} '
+              f'{report["candidates"]["p99"]:8} '
+              f'{report["candidates"]["max"]:8}  '
+              f'{worst.get("code", "")}')
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as outputfile:
+            json.dump(reports, outputfile, ensure_ascii=False, indent=2)
+    return 0
+
+def _compile(args: Any) -> int:
+    '''Write a table in the compiled format'''
+    start = time.perf_counter()
+    table = ColumnTable.read(args.inputfilename, all_sections=True)
+    write_compiled(args.outputfilename, table)
+    print(f'{len(table)} rows written to {args.outputfilename} '
+          f'in {time.perf_counter() - start:.3f} s')
+    return 0
+
+def _check(args: Any) -> int:
+    '''Validate table sources in parallel'''
+    start = time.perf_counter()
+    filenames = args.tables or find_table_files(os.path.abspath(args.sourcedir))
+    results = check_tables(filenames,
+                           jobs=args.jobs,
+                           min_weight=args.min_weight,
+                           max_weight=args.max_weight)
+    counts = {'error': 0, 'warning': 0}
+    for problems in results.values():
+        for problem in problems:
+            counts[problem.severity] += 1
+    if args.json:
+        report = {
+            'files': {filename: [problem._asdict() for problem in problems]
+                      for (filename, problems) in results.items()},
+            'errors': counts['error'],
+            'warnings': counts['warning'],
+            'seconds': round(time.perf_counter() - start, 3),
+        }
+        if args.json == '-':
+            json.dump(report, sys.stdout, ensure_ascii=False, indent=2)
+            print()
+        else:
+            with open(args.json, 'w', encoding='utf-8') as outputfile:
+                json.dump(report, outputfile, ensure_ascii=False, indent=2)
+    if args.json != '-':
+        for problems in results.values():
+            for problem in problems:
+                print(format_problem(problem))
+        print(f'{len(results)} files checked in '
+              f'{time.perf_counter() - start:.3f} s: '
+              f'{counts["error"]} errors, {counts["warning"]} warnings')
+    if counts['error'] or (args.strict and counts['warning']):
+        return 1
+    return 0
+
+def _wildcard(args: Any) -> int:
+    '''Look up wildcard patterns or benchmark the wildcard index'''
+    reports: Dict[str, Any] = {}
+    for filename in args.tables:
+        table = ColumnTable.read(filename, all_sections=True, strict=False)
+        start = time.perf_counter()
+        index = WildcardIndex.from_table(table)
+        build_seconds = time.perf_counter() - start
+        if args.pattern:
+            for pattern in args.pattern:
+                rows = index.match(pattern)
+                print(f'{filename}: {pattern}: {len(rows)} rows')
+                for row in rows[:args.limit or None]:
+                    print(f'{table.codes[row]}\t{table.phrases[row]}\t'
+                          f'{table.weights[row]}')
+            continue
+        report = benchmark(
+            index, random_patterns(index, args.benchmark, args.seed))
+        report['build_seconds'] = round(build_seconds, 3)
+        reports[filename] = report
+        print(f'{os.path.basename(filename):<24} '
+              f'build {build_seconds:6.3f} s  '
+              f'index p50 {report["index_us"]["p50"]:8.1f} µs  '
+              f'scan p50 {report["scan_us"]["p50"]:8.1f} µs  '
+              f'matches p50 {report["matches"]["p50"]:6} '
+              f'max {report["matches"]["max"]:6}')
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as outputfile:
+            json.dump(reports, outputfile, ensure_ascii=False, indent=2)
+    return 0
+
+def _stats(args: Any) -> int:
+    '''Report the size and the ambiguity of tables'''
+    start = time.perf_counter()
+    filenames = args.tables or find_table_files(os.path.abspath(args.sourcedir))
+    reports = tables_stats(filenames, jobs=args.jobs, worst=args.worst)
+    if args.json:
+        if args.json == '-':
+            json.dump(reports, sys.stdout, ensure_ascii=False, indent=2)
+            print()
+        else:
+            with open(args.json, 'w', encoding='utf-8') as outputfile:
+                json.dump(reports, outputfile, ensure_ascii=False, indent=2)
+    if args.json != '-':
+        print(f'{"table":<24} {"rows":>8} {"codes":>8} {"p50":>5} '
+              f'{"p99":>5} {"max":>5} {"redund.":>8} {"prefix":>8}  '
+              f'worst code')
+        for (filename, report) in reports.items():
+            candidates = report['candidates_per_code']
+            worst = report['worst_codes'][0] if report['worst_codes'] else {}
+            print(f'{os.path.basename(filename):<24} {report["rows"]:8} '
+                  f'{report["codes"]:8} {candidates["p50"]:5} '
+                  f'{candidates["p99"]:5} {candidates["max"]:5} '
+                  f'{report["redundant_rows"]:8} '
+                  f'{report["prefix_redundant_rows"]:8}  '
+                  f'{worst.get("code", "")}')
+        print(f'{len(reports)} tables measured in '
+              f'{time.perf_counter() - start:.3f} s')
+    return 0
+
+def _compile_variants(args: Any) -> int:
+    '''Compile the simplified/traditional classification from Unihan'''
+    start = time.perf_counter()
+    (simplified_only, traditional_only) = read_unihan_variants(args.unihan)
+    write_variants(args.outputfilename, simplified_only, traditional_only)
+    print(f'{len(simplified_only)} simplified only and '
+          f'{len(traditional_only)} traditional only characters written '
+          f'to {args.outputfilename} in '
+          f'{time.perf_counter() - start:.3f} s')
+    return 0
+
+def _variants(args: Any) -> int:
+    '''List the simplified only rows of traditional only tables'''
+    start = time.perf_counter()
+    classifier = VariantClassifier.read(args.variants)
+    if args.text:
+        names = {SIMPLIFIED: 'simplified', TRADITIONAL: 'traditional',
+                 BOTH: 'both', MIXED: 'mixed'}
+        for (text, category) in zip(args.text,
+                                    classifier.categories(args.text)):
+            print(f'{text}\t{names[category]}')
+        return 0
+    filenames = args.tables or [
+        filename
+        for filename in find_table_files(os.path.abspath(args.sourcedir))
+        if language_filter(filename) == 'cm1']
+    report = {filename: simplified_only_rows(filename, classifier)
+              for filename in filenames}
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as outputfile:
+            json.dump({filename: [{'code': code, 'phrase': phrase}
+                                  for (code, phrase) in rows]
+                       for (filename, rows) in report.items()},
+                      outputfile, ensure_ascii=False, indent=2)
+    for (filename, rows) in report.items():
+        for (code, phrase) in rows:
+            print(f'{filename}: {code}\t{phrase}')
+    for (filename, rows) in report.items():
+        print(f'{filename}: {len(rows)} simplified only rows')
+    print(f'{len(report)} tables checked in '
+          f'{time.perf_counter() - start:.3f} s')
+    return 0
+
+def parse_args() -> Any:
+    '''Parse the command line arguments'''
+    import argparse
+    parser = argparse.ArgumentParser(
+        prog='tabletool',
+        description='Tools to maintain the table sources')
+    parser.add_argument('-d', '--debug',
+                        action='store_true',
+                        help='print debugging output')
+    instrument.add_arguments(parser)
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    rewrite = subparsers.add_parser(
+        'rewrite',
+        help='run several passes over a table in one read/write cycle')
+    rewrite.add_argument('-i', '--inputfilename',
+                         type=str,
+                         required=True,
+                         help='input file')
+    rewrite.add_argument('-o', '--outputfilename',
+                         type=str,
+                         required=True,
+                         help='output file')
+    rewrite.add_argument('-p', '--passes',
+                         type=str,
+                         required=True,
+                         help=('comma separated list of passes to run in '
+                               'this order, available are: '
+                               + ', '.join(sorted(PASSES))))
+    rewrite.add_argument('--tie-break',
+                         choices=TIE_BREAKS,
+                         default='none',
+                         help=('how to order rows with the same code and '
+                               'weight: by the order of the phrases in '
+                               'Unicode, Big5 or GB18030, default is '
+                               '%(default)s (keep the order of the input)'))
+    rewrite.set_defaults(function=_rewrite)
+
+    freq = subparsers.add_parser(
+        'freq',
+        help=('add weights to sources with only code and phrase columns '
+              'and write a complete table source'))
+    freq.add_argument('inputfilenames',
+                      nargs='+',
+                      metavar='inputfilename',
+                      help='sources to read one after the other')
+    freq.add_argument('-o', '--outputfilename',
+                      type=str,
+                      required=True,
+                      help='output file')
+    freq.add_argument('--head',
+                      type=str,
+                      default='',
+                      help='file to write in front of the rows')
+    freq.add_argument('--tail',
+                      type=str,
+                      default='',
+                      help='file to write after the rows')
+    freq.add_argument('--start',
+                      type=int,
+                      default=1000,
+                      help=('weight of the first row of each code, the '
+                            'following rows with the same code get one '
+                            'less each, default is %(default)s'))
+    freq.add_argument('--corpus',
+                      type=str,
+                      default='',
+                      help=('file with lines “phrase<TAB>frequency”, if '
+                            'given, use these frequencies as the weights '
+                            'instead of counting down'))
+    freq.add_argument('--default-weight',
+                      type=int,
+                      default=0,
+                      help=('weight of phrases not in the corpus, '
+                            'default is %(default)s'))
+    freq.set_defaults(function=_freq)
+
+    compose = subparsers.add_parser(
+        'compose',
+        help=('write a table composed of a base source and extension '
+              'sources listed in a manifest, sorted by code'))
+    compose.add_argument('manifest',
+                         help='the manifest describing the table')
+    compose.add_argument('-o', '--outputfilename',
+                         type=str,
+                         required=True,
+                         help='output file')
+    compose.add_argument('--head',
+                         type=str,
+                         default=None,
+                         help='head file to use instead of HEAD')
+    compose.add_argument('--tail',
+                         type=str,
+                         default=None,
+                         help='tail file to use instead of TAIL')
+    compose.add_argument('--chunk-rows',
+                         type=int,
+                         default=CHUNK_ROWS,
+                         help=('number of rows sorted in memory at a time, '
+                               'default is %(default)s'))
+    compose.set_defaults(function=_compose)
+
+    corpus_freq = subparsers.add_parser(
+        'corpus-freq',
+        help=('count the phrases of a table in a plain text corpus '
+              'and use the counts as weights'))
+    corpus_freq.add_argument('-c', '--corpus',
+                             action='append',
+                             required=True,
+                             help=('plain text corpus in UTF-8, can be '
+                                   'given several times'))
+    corpus_freq.add_argument('-i', '--inputfilename',
+                             type=str,
+                             required=True,
+                             help='table whose phrases are counted')
+    corpus_freq.add_argument('-o', '--outputfilename',
+                             type=str,
+                             default='',
+                             help=('write the table with the weights from '
+                                   'the corpus to this file'))
+    corpus_freq.add_argument('--counts',
+                             type=str,
+                             default='',
+                             help=('write the counts to this file, it can '
+                                   'be used with “freq --corpus”'))
+    corpus_freq.add_argument('--scale',
+                             choices=('count', 'log'),
+                             default='count',
+                             help=('“count” uses the counts as weights, '
+                                   '“log” maps their logarithms to '
+                                   '1…--max-weight, default is %(default)s'))
+    corpus_freq.add_argument('--max-weight',
+                             type=int,
+                             default=1000,
+                             help=('weight of the most frequent phrase '
+                                   'with “--scale log”, '
+                                   'default is %(default)s'))
+    corpus_freq.add_argument('--default-weight',
+                             type=int,
+                             default=0,
+                             help=('weight of phrases not in the corpus, '
+                                   'default is %(default)s'))
+    corpus_freq.add_argument('-j', '--jobs',
+                             type=int,
+                             default=None,
+                             help=('number of processes, default is the '
+                                   'number of CPUs'))
+    corpus_freq.add_argument('--chunk-size',
+                             type=int,
+                             default=CHUNK_SIZE // (1024 * 1024),
+                             help=('size of the pieces of the corpus one '
+                                   'process counts at a time in MiB, '
+                                   'default is %(default)s'))
+    corpus_freq.set_defaults(function=_corpus_freq)
+
+    build = subparsers.add_parser(
+        'build',
+        help='build the .db files of all tables in parallel')
+    build.add_argument('tables',
+                       nargs='*',
+                       metavar='table',
+                       help=('names of tables or of CONVERT_DB() targets '
+                             'to build, default is all tables'))
+    build.add_argument('-s', '--sourcedir',
+                       type=str,
+                       default=os.path.join(
+                           os.path.dirname(os.path.abspath(__file__)),
+                           '..', '..'),
+                       help='top source directory, default is %(default)s')
+    build.add_argument('-b', '--builddir',
+                       type=str,
+                       default='.',
+                       help='top build directory, default is %(default)s')
+    build.add_argument('-j', '--jobs',
+                       type=int,
+                       default=None,
+                       help=('number of tables to build at the same time, '
+                             'default is the number of CPUs'))
+    build.add_argument('--createdb',
+                       type=str,
+                       default='ibus-table-createdb',
+                       help=('command to create a .db file from a table '
+                             'source, default is %(default)s'))
+    build.add_argument('-f', '--force',
+                       action='store_true',
+                       help='build even tables which did not change')
+    build.set_defaults(function=_build)
+
+    build_db = subparsers.add_parser(
+        'build-db',
+        help=('write the database of a table directly, like '
+              'ibus-table-createdb, but not for tables with '
+              '“PINYIN_MODE = TRUE”'))
+    build_db.add_argument('-n', '--name',
+                          type=str,
+                          required=True,
+                          help='database file to write')
+    build_db.add_argument('-s', '--source',
+                          type=str,
+                          required=True,
+                          help='table source to read')
+    build_db.add_argument('--compare',
+                          action='store_true',
+                          help=('also build the database with '
+                                'ibus-table-createdb and compare the ime, '
+                                'phrases and pinyin tables row by row'))
+    build_db.add_argument('--createdb',
+                          type=str,
+                          default='ibus-table-createdb',
+                          help=('program to compare with, '
+                                'default is %(default)s'))
+    build_db.set_defaults(function=_build_db)
+
+    patch_db = subparsers.add_parser(
+        'patch-db',
+        help=('apply only the changes of a table source to an existing '
+              'database instead of writing it again'))
+    patch_db.add_argument('-n', '--name',
+                          type=str,
+                          required=True,
+                          help='database file to patch')
+    patch_db.add_argument('-s', '--source',
+                          type=str,
+                          required=True,
+                          help='new version of the table source')
+    patch_db.add_argument('--old',
+                          type=str,
+                          default='',
+                          help=('table source the database was written '
+                                'from, default is to compare with the '
+                                'phrases in the database'))
+    patch_db.add_argument('--serial-number',
+                          type=str,
+                          default='',
+                          help=('SERIAL_NUMBER to stamp into the database, '
+                                'default is the one from the new source'))
+    patch_db.set_defaults(function=_patch_db)
+
+    check = subparsers.add_parser(
+        'check',
+        help='validate table sources in parallel',
+        description='Checks: ' + '; '.join(
+            f'{name}: {description}'
+            for (name, description) in CHECKS.items()))
+    check.add_argument('tables',
+                       nargs='*',
+                       metavar='table',
+                       help=('table sources to check, default is all '
+                             '*.txt files below tables/'))
+    check.add_argument('-s', '--sourcedir',
+                       type=str,
+                       default=os.path.join(
+                           os.path.dirname(os.path.abspath(__file__)),
+                           '..', '..'),
+                       help='top source directory, default is %(default)s')
+    check.add_argument('-j', '--jobs',
+                       type=int,
+                       default=None,
+                       help=('number of files to check at the same time, '
+                             'default is the number of CPUs'))
+    check.add_argument('--min-weight',
+                       type=int,
+                       default=0,
+                       help='smallest weight allowed, default is %(default)s')
+    check.add_argument('--max-weight',
+                       type=int,
+                       default=MAX_WEIGHT,
+                       help='biggest weight allowed, default is %(default)s')
+    check.add_argument('--json',
+                       type=str,
+                       default='',
+                       help=('file to write the problems to as JSON, '
+                             '“-” writes them to stdout instead of the '
+                             'text report'))
+    check.add_argument('--strict',
+                       action='store_true',
+                       help='exit with an error for warnings as well')
+    check.set_defaults(function=_check)
+
+    stats = subparsers.add_parser(
+        'stats',
+        help=('report the number of candidates per code, the size and '
+              'the redundant rows of tables'))
+    stats.add_argument('tables',
+                       nargs='*',
+                       metavar='table',
+                       help=('table sources or compiled tables to '
+                             'measure, default is all *.txt files below '
+                             'tables/'))
+    stats.add_argument('-s', '--sourcedir',
+                       type=str,
+                       default=os.path.join(
+                           os.path.dirname(os.path.abspath(__file__)),
+                           '..', '..'),
+                       help='top source directory, default is %(default)s')
+    stats.add_argument('-j', '--jobs',
+                       type=int,
+                       default=None,
+                       help=('number of tables to measure at the same '
+                             'time, default is the number of CPUs'))
+    stats.add_argument('--worst',
+                       type=int,
+                       default=10,
+                       help=('number of codes with the most candidates '
+                             'to report, default is %(default)s'))
+    stats.add_argument('--json',
+                       type=str,
+                       default='',
+                       help=('write the reports as JSON to this file, '
+                             '“-” for standard output'))
+    stats.set_defaults(function=_stats)
+
+    compile_parser = subparsers.add_parser(
+        'compile',
+        help=('write a table in a binary format which can be opened '
+              'quickly with mmap'))
+    compile_parser.add_argument('-i', '--inputfilename',
+                                type=str,
+                                required=True,
+                                help='table source to read')
+    compile_parser.add_argument('-o', '--outputfilename',
+                                type=str,
+                                required=True,
+                                help='compiled table to write')
+    compile_parser.set_defaults(function=_compile)
+
+    simulate_parser = subparsers.add_parser(
+        'simulate',
+        help=('replay typing on tables and report the latency and size '
+              'of the candidate lookups'))
+    simulate_parser.add_argument('tables',
+                                 nargs='+',
+                                 metavar='table',
+                                 help=('table sources or compiled tables '
+                                       'to replay on'))
+    replay_input = simulate_parser.add_mutually_exclusive_group()
+    replay_input.add_argument('--keys',
+                              type=str,
+                              default='',
+                              help=('file with one key sequence per line, '
+                                    'default is to type every code of '
+                                    'the table once'))
+    replay_input.add_argument('--text',
+                              type=str,
+                              default='',
+                              help=('file with text which is converted '
+                                    'to codes with the table'))
+    simulate_parser.add_argument('--match',
+                                 choices=('auto', 'prefix', 'exact'),
+                                 default='auto',
+                                 help=('which rows are candidates, “auto” '
+                                       'uses AUTO_WILDCARD of the table, '
+                                       'default is %(default)s'))
+    simulate_parser.add_argument('--limit',
+                                 type=int,
+                                 default=0,
+                                 help=('fetch only this many of the best '
+                                       'candidates, default is all'))
+    simulate_parser.add_argument('--worst',
+                                 type=int,
+                                 default=10,
+                                 help=('number of codes with the most '
+                                       'candidates to report, '
+                                       'default is %(default)s'))
+    simulate_parser.add_argument('--json',
+                                 type=str,
+                                 default='',
+                                 help='file to write the reports to as JSON')
+    simulate_parser.set_defaults(function=_simulate)
+
+    wildcard = subparsers.add_parser(
+        'wildcard',
+        help=('look up codes with wildcards using a per position index, '
+              'or benchmark the index against a regular expression scan'))
+    wildcard.add_argument('tables',
+                          nargs='+',
+                          metavar='table',
+                          help='table sources')
+    wildcard.add_argument('-p', '--pattern',
+                          action='append',
+                          default=[],
+                          help=('pattern to look up, using the '
+                                'SINGLE_WILDCARD_CHAR and '
+                                'MULTI_WILDCARD_CHAR of the table '
+                                '(default “?” and “*”), can be given '
+                                'several times; without a pattern the '
+                                'index is benchmarked'))
+    wildcard.add_argument('--limit',
+                          type=int,
+                          default=20,
+                          help=('print only this many rows per pattern, '
+                                '0 for all, default is %(default)s'))
+    wildcard.add_argument('--benchmark',
+                          type=int,
+                          default=1000,
+                          help=('number of random patterns made from '
+                                'the codes of the table to benchmark '
+                                'with, default is %(default)s'))
+    wildcard.add_argument('--seed',
+                          type=int,
+                          default=0,
+                          help=('seed for the random patterns, '
+                                'default is %(default)s'))
+    wildcard.add_argument('--json',
+                          type=str,
+                          default='',
+                          help='file to write the benchmark to as JSON')
+    wildcard.set_defaults(function=_wildcard)
+
+    reverse_index = subparsers.add_parser(
+        'reverse-index',
+        help=('write an index from each character to its codes in all '
+              'tables, for the “codes” command'))
+    reverse_index.add_argument('tables',
+                               nargs='*',
+                               metavar='table',
+                               help=('table sources to index, default is '
+                                     'all below SOURCEDIR/tables'))
+    reverse_index.add_argument('-s', '--sourcedir',
+                               type=str,
+                               default=os.path.join(
+                                   os.path.dirname(os.path.abspath(__file__)),
+                                   '..', '..'),
+                               help=('top source directory, the names of '
+                                     'the tables are relative to its '
+                                     '“tables” directory, default is '
+                                     '%(default)s'))
+    reverse_index.add_argument('-o', '--outputfilename',
+                               type=str,
+                               required=True,
+                               help='reverse index to write')
+    reverse_index.set_defaults(function=_reverse_index)
+
+    codes = subparsers.add_parser(
+        'codes',
+        help='print the codes of characters in all tables')
+    codes.add_argument('text',
+                       nargs='*',
+                       help='the characters to look up')
+    codes.add_argument('-i', '--index',
+                       type=str,
+                       required=True,
+                       help='reverse index written by “reverse-index”')
+    codes.add_argument('-t', '--table',
+                       action='append',
+                       default=[],
+                       help=('print only the codes of this table, like '
+                             '“cangjie/cangjie5.txt”, can be given '
+                             'several times'))
+    codes.add_argument('--benchmark',
+                       type=int,
+                       default=0,
+                       help=('instead of looking up TEXT, look up this '
+                             'many random characters and compare with '
+                             'scanning the table sources'))
+    codes.add_argument('-s', '--sourcedir',
+                       type=str,
+                       default=os.path.join(
+                           os.path.dirname(os.path.abspath(__file__)),
+                           '..', '..'),
+                       help=('top source directory to read the tables '
+                             'from for --benchmark, default is '
+                             '%(default)s'))
+    codes.add_argument('--seed',
+                       type=int,
+                       default=0,
+                       help=('seed for the random characters, '
+                             'default is %(default)s'))
+    codes.set_defaults(function=_codes)
+
+    compile_variants = subparsers.add_parser(
+        'compile-variants',
+        help=('write the classification of characters as simplified or '
+              'traditional from Unihan to a small file'))
+    compile_variants.add_argument('-u', '--unihan',
+                                  type=str,
+                                  required=True,
+                                  help='Unihan_Variants.txt or Unihan.zip')
+    compile_variants.add_argument('-o', '--outputfilename',
+                                  type=str,
+                                  required=True,
+                                  help='compiled classification to write')
+    compile_variants.set_defaults(function=_compile_variants)
+
+    variants = subparsers.add_parser(
+        'variants',
+        help=('list the simplified only rows of the tables with '
+              '“LANGUAGE_FILTER = cm1”, which ibus-table hides'))
+    variants.add_argument('tables',
+                          nargs='*',
+                          metavar='table',
+                          help=('tables to check, default is all below '
+                                'tables/ with “LANGUAGE_FILTER = cm1”'))
+    variants.add_argument('-v', '--variants',
+                          type=str,
+                          default=DEFAULT_VARIANTS,
+                          help=('classification written by '
+                                '“compile-variants”, or '
+                                'Unihan_Variants.txt or Unihan.zip, '
+                                'default is %(default)s'))
+    variants.add_argument('-s', '--sourcedir',
+                          type=str,
+                          default=os.path.join(
+                              os.path.dirname(os.path.abspath(__file__)),
+                              '..', '..'),
+                          help='top source directory, default is %(default)s')
+    variants.add_argument('-t', '--text',
+                          action='append',
+                          default=[],
+                          help=('instead of checking tables, print the '
+                                'category of this text, can be given '
+                                'several times'))
+    variants.add_argument('--json',
+                          type=str,
+                          default='',
+                          help='file to write the rows found to as JSON')
+    variants.set_defaults(function=_variants)
+    return parser.parse_args()
+
+def main() -> None:
+    '''Main program'''
+    args = parse_args()
+    log_level = logging.INFO
+    if args.debug:
+        log_level = logging.DEBUG
+    logging.basicConfig(format="%(levelname)s: %(message)s", level=log_level)
+    with instrument.session_from_args(args) as stats:
+        args.stats = stats
+        status = args.function(args)
+    sys.exit(status)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,238 @@
+#
+# Copyright (c) 2026 Mike FABIAN <mfabian@redhat.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+'''
+Build the .db files of all tables in parallel.
+
+The table sources are found in the CONVERT_DB() calls of the
+tables/*/CMakeLists.txt files, so nothing has to be listed twice.
+The .db files are written to the same places in the build directory
+as the CMake build puts them:
+
+    python3 -m tabletool build -b /path/to/builddir
+
+The biggest tables are started first, so that they do not end up
+running alone at the end. A table is skipped if its .db file exists
+and neither the source nor the command changed since it was built,
+the hashes of the sources are remembered in the build directory.
+
+Sources generated during the CMake build, like array30.tab, are only
+found if they have been generated already.
+'''
+
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+import concurrent.futures
+import glob
+import hashlib
+import json
+import logging
+import os
+import re
+import shlex
+import subprocess
+import time
+
+LOGGER = logging.getLogger(__name__)
+
+# Name of the file in the build directory remembering the hashes of
+# the sources of the tables built:
+HASHES_FILENAME = 'table-hashes.json'
+
+class TableSource(NamedTuple):
+    '''A table source found in a CONVERT_DB() call'''
+    # The first argument of CONVERT_DB(), like “cangjie”:
+    target: str
+    # The table name, like “cangjie5”:
+    name: str
+    source: str
+    db: str
+
+class BuildResult(NamedTuple):
+    '''What happened to one table in build_tables()'''
+    table: TableSource
+    # “built”, “skipped”, “missing” or “failed”:
+    status: str
+    size: int
+    seconds: float
+    message: str = ''
+
+_SET_PATTERN = re.compile(r'SET\(\s*(\w+)\s+"?([^")\s]*)"?\s*\)')
+_CONVERT_DB_PATTERN = re.compile(r'CONVERT_DB\(([^)]*)\)')
+_VARIABLE_PATTERN = re.compile(r'\$\{(\w+)\}')
+
+def _expand(value: str, variables: Dict[str, str]) -> str:
+    for _depth in range(10):
+        expanded = _VARIABLE_PATTERN.sub(
+            lambda match: variables.get(match.group(1), match.group(0)),
+            value)
+        if expanded == value:
+            break
+        value = expanded
+    return value
+
+def find_table_sources(sourcedir: str, builddir: str) -> List[TableSource]:
+    '''
+    Find the table sources in the CONVERT_DB() calls of the
+    tables/*/CMakeLists.txt files.
+
+    Only the simple “SET(NAME value)” commands are understood when
+    expanding variables, which is all these files use.
+
+    :param sourcedir: The top source directory
+    :param builddir: The top build directory
+    '''
+    tables: List[TableSource] = []
+    for cmakelists in sorted(glob.glob(
+            os.path.join(sourcedir, 'tables', '*', 'CMakeLists.txt'))):
+        subdir = os.path.basename(os.path.dirname(cmakelists))
+        binary_dir = os.path.join(builddir, 'tables', subdir)
+        variables = {
+            'CMAKE_SOURCE_DIR': sourcedir,
+            'CMAKE_CURRENT_SOURCE_DIR': os.path.dirname(cmakelists),
+            'CMAKE_CURRENT_BINARY_DIR': binary_dir,
+        }
+        with open(cmakelists, 'r', encoding='utf-8') as cmakefile:
+            text = ''.join(line for line in cmakefile
+                           if not line.lstrip().startswith('#'))
+        for match in _SET_PATTERN.finditer(text):
+            variables[match.group(1)] = _expand(match.group(2), variables)
+        for match in _CONVERT_DB_PATTERN.finditer(text):
+            arguments = [_expand(argument.strip('"'), variables)
+                         for argument in match.group(1).split()]
+            for source in arguments[1:]:
+                name = os.path.splitext(os.path.basename(source))[0]
+                tables.append(TableSource(
+                    arguments[0], name, source,
+                    os.path.join(binary_dir, f'{name}.db')))
+    LOGGER.info('%s tables found', len(tables))
+    return tables
+
+def file_hash(filename: str) -> str:
+    '''
+    Return the SHA-256 of the contents of a file as a hex string.
+
+    :param filename: The file to hash
+    '''
+    digest = hashlib.sha256()
+    with open(filename, 'rb') as inputfile:
+        for block in iter(lambda: inputfile.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _build_one(table: TableSource, command: List[str]) -> BuildResult:
+    size = os.path.getsize(table.source)
+    os.makedirs(os.path.dirname(table.db), exist_ok=True)
+    # Always start from an empty database:
+    if os.path.exists(table.db):
+        os.remove(table.db)
+    start = time.perf_counter()
+    process = subprocess.run(command, capture_output=True, text=True,
+                             check=False)
+    seconds = time.perf_counter() - start
+    if process.returncode:
+        errors = process.stderr.strip().splitlines()
+        message = errors[-1] if errors else f'exit code {process.returncode}'
+        return BuildResult(table, 'failed', size, seconds, message)
+    return BuildResult(table, 'built', size, seconds)
+
+def build_tables(tables: Iterable[TableSource],
+                 builddir: str,
+                 createdb: str = 'ibus-table-createdb',
+                 jobs: Optional[int] = None,
+                 force: bool = False) -> List[BuildResult]:
+    '''
+    Build the .db files of several tables in parallel.
+
+    Returns one result per table, biggest table first.
+
+    :param tables: The tables to build, see find_table_sources()
+    :param builddir: The top build directory, where the hashes of the
+                     sources are remembered
+    :param createdb: The command to create a .db file, it is called
+                     like ibus-table-createdb with “-n <db> -s <source>”
+                     appended
+    :param jobs: The maximum number of tables to build at the same
+                 time, the default is the number of CPUs
+    :param force: If True, build even the tables which did not change
+    '''
+    hashes_filename = os.path.join(builddir, HASHES_FILENAME)
+    hashes: Dict[str, str] = {}
+    if os.path.exists(hashes_filename):
+        with open(hashes_filename, 'r', encoding='utf-8') as hashes_file:
+            hashes = json.load(hashes_file)
+    results: List[BuildResult] = []
+    pending: Dict[TableSource, str] = {}
+    for table in tables:
+        if not os.path.exists(table.source):
+            results.append(BuildResult(table, 'missing', 0, 0.0,
+                                       f'{table.source} not found'))
+            continue
+        # Changing the program building the table rebuilds it as well:
+        digest = f'{createdb}:{file_hash(table.source)}'
+        if (not force and hashes.get(table.db) == digest
+                and os.path.exists(table.db)):
+            results.append(BuildResult(table, 'skipped',
+                                       os.path.getsize(table.source), 0.0))
+            continue
+        pending[table] = digest
+    order = sorted(pending, key=lambda table: -os.path.getsize(table.source))
+    # The work is done in the createdb processes, threads are enough
+    # to start them and wait for them:
+    with concurrent.futures.ThreadPoolExecutor(
+            max_workers=jobs or os.cpu_count() or 1) as executor:
+        futures = [
+            executor.submit(_build_one, table,
+                            shlex.split(createdb)
+                            + ['-n', table.db, '-s', table.source])
+            for table in order]
+        for future in concurrent.futures.as_completed(futures):
+            result = future.result()
+            LOGGER.info('%s %s in %.3f s',
+                        result.table.name, result.status, result.seconds)
+            if result.status == 'built':
+                hashes[result.table.db] = pending[result.table]
+            else:
+                hashes.pop(result.table.db, None)
+            results.append(result)
+    os.makedirs(builddir, exist_ok=True)
+    with open(hashes_filename, 'w', encoding='utf-8') as hashes_file:
+        json.dump(hashes, hashes_file, indent=1, sort_keys=True)
+    results.sort(key=lambda result: -result.size)
+    return results
+
+def format_report(results: Iterable[BuildResult],
+                  wall_seconds: float) -> str:
+    '''
+    Return a table with the time used for each table.
+
+    :param results: The results of build_tables()
+    :param wall_seconds: The total wall clock time of the build
+    '''
+    lines = [f'{"table":<20} {"status":<8} {"size":>12} {"seconds":>9}']
+    cpu_seconds = 0.0
+    for result in results:
+        cpu_seconds += result.seconds
+        line = (f'{result.table.name:<20} {result.status:<8} '
+                f'{result.size:12} {result.seconds:9.3f}')
+        if result.message:
+            line += f'  {result.message}'
+        lines.append(line)
+    lines.append(f'{"total":<20} {"":<8} {"":>12} {cpu_seconds:9.3f}')
+    lines.append(f'{"wall clock":<20} {"":<8} {"":>12} {wall_seconds:9.3f}')
+    return '\n'.join(lines)
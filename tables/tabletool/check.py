@@ -0,0 +1,280 @@
+#
+# Copyright (c) 2026 Mike FABIAN <mfabian@redhat.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+'''
+Validate table sources before ibus-table-createdb sees them.
+
+Each file is read in one streaming pass, the rows are checked against
+the settings from the head (VALID_INPUT_CHARS, MAX_KEY_LENGTH) and
+against each other (duplicate code and phrase). Several files are
+checked in parallel in a process pool:
+
+    python3 -m tabletool check
+    python3 -m tabletool check --json - cangjie/cangjie5.txt
+
+Sources without a head, like the array30 sources, only get the checks
+of the individual rows.
+'''
+
+from typing import Dict
+from typing import FrozenSet
+from typing import Iterable
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+from typing import Tuple
+import concurrent.futures
+import glob
+import logging
+import os
+
+from .tablefile import parse_definitions
+
+LOGGER = logging.getLogger(__name__)
+
+# The checks, with a description for the help:
+CHECKS = {
+    'no-table': 'the file has a head but no BEGIN_TABLE',
+    'unterminated-table': 'a BEGIN_TABLE has no matching END_TABLE',
+    'missing-definition': 'a setting in REQUIRED_DEFINITIONS is missing',
+    'invalid-definition': 'MAX_KEY_LENGTH is not a positive number',
+    'malformed': 'a row has no code or no phrase',
+    'missing-weight': 'a row in a table with a head has no weight',
+    'extra-columns': 'a row has columns after the comment',
+    'invalid-weight': 'the weight is not a number',
+    'weight-range': 'the weight is outside of the allowed range',
+    'invalid-key': 'the code uses characters not in VALID_INPUT_CHARS',
+    'key-too-long': 'the code is longer than MAX_KEY_LENGTH',
+    'duplicate': 'the same code and phrase occur in an earlier row',
+}
+
+# Settings every table needs in its head:
+REQUIRED_DEFINITIONS = (
+    'NAME',
+    'UUID',
+    'SERIAL_NUMBER',
+    'LANGUAGES',
+    'MAX_KEY_LENGTH',
+    'VALID_INPUT_CHARS',
+)
+
+# The weights end up in an INTEGER column of SQLite (erbi-qs.txt uses
+# weights above 2**32):
+MAX_WEIGHT = 2**63 - 1
+
+class Problem(NamedTuple):
+    '''A problem found by check_table()'''
+    filename: str
+    # 0 if the problem is not about a single line:
+    lineno: int
+    # “error” if ibus-table-createdb would fail or produce a broken
+    # table, else “warning”:
+    severity: str
+    # One of the keys of CHECKS:
+    check: str
+    message: str
+
+def format_problem(problem: Problem) -> str:
+    '''
+    Return a problem as one line like compilers report them.
+
+    :param problem: The problem
+    '''
+    return (f'{problem.filename}:{problem.lineno}: {problem.severity}: '
+            f'{problem.message} [{problem.check}]')
+
+class _Checker:
+    '''The state of checking one file'''
+    def __init__(self,
+                 filename: str,
+                 min_weight: int,
+                 max_weight: int) -> None:
+        self.filename = filename
+        self.min_weight = min_weight
+        self.max_weight = max_weight
+        self.problems: List[Problem] = []
+        self.headless = False
+        self.valid_chars: Optional[FrozenSet[str]] = None
+        self.max_key_length = 0
+        # The first line of each (code, phrase):
+        self.seen: Dict[Tuple[str, str], int] = {}
+
+    def problem(self,
+                lineno: int,
+                severity: str,
+                check: str,
+                message: str) -> None:
+        '''Remember a problem'''
+        self.problems.append(
+            Problem(self.filename, lineno, severity, check, message))
+
+    def check_head(self, head: List[str]) -> None:
+        '''Check the settings and remember those needed for the rows'''
+        definitions = parse_definitions(head)
+        for key in REQUIRED_DEFINITIONS:
+            if key not in definitions:
+                self.problem(0, 'error', 'missing-definition',
+                             f'{key} is not defined')
+        if 'VALID_INPUT_CHARS' in definitions:
+            self.valid_chars = frozenset(definitions['VALID_INPUT_CHARS'])
+        if 'MAX_KEY_LENGTH' in definitions:
+            try:
+                self.max_key_length = int(definitions['MAX_KEY_LENGTH'])
+            except ValueError:
+                pass
+            if self.max_key_length <= 0:
+                self.problem(0, 'error', 'invalid-definition',
+                             f'MAX_KEY_LENGTH = '
+                             f'{definitions["MAX_KEY_LENGTH"]!r}')
+
+    def check_row(self, lineno: int, line: str) -> None:
+        '''Check one line of the table section'''
+        fields = line.rstrip('\r\n').split('\t')
+        if len(fields) < 2 or not fields[0] or not fields[1]:
+            self.problem(lineno, 'error', 'malformed',
+                         f'malformed row {line.rstrip()!r}')
+            return
+        (code, phrase) = fields[:2]
+        if len(fields) == 2:
+            if not self.headless:
+                self.problem(lineno, 'error', 'missing-weight',
+                             f'row {code!r} {phrase!r} has no weight')
+        else:
+            try:
+                weight = int(fields[2])
+            except ValueError:
+                self.problem(lineno, 'error', 'invalid-weight',
+                             f'invalid weight {fields[2]!r}')
+            else:
+                if not self.min_weight <= weight <= self.max_weight:
+                    self.problem(lineno, 'error', 'weight-range',
+                                 f'weight {weight} is not between '
+                                 f'{self.min_weight} and {self.max_weight}')
+        if len(fields) > 4:
+            self.problem(lineno, 'warning', 'extra-columns',
+                         f'{len(fields)} columns, at most 4 are used')
+        if (self.valid_chars is not None
+                and not self.valid_chars.issuperset(code)):
+            invalid = ''.join(sorted(set(code) - self.valid_chars))
+            self.problem(lineno, 'error', 'invalid-key',
+                         f'code {code!r} uses {invalid!r} which is '
+                         f'not in VALID_INPUT_CHARS')
+        if self.max_key_length and len(code) > self.max_key_length:
+            self.problem(lineno, 'error', 'key-too-long',
+                         f'code {code!r} is longer than MAX_KEY_LENGTH '
+                         f'= {self.max_key_length}')
+        first = self.seen.setdefault((code, phrase), lineno)
+        if first != lineno:
+            self.problem(lineno, 'warning', 'duplicate',
+                         f'{code!r} {phrase!r} already on line {first}')
+
+    def run(self) -> List[Problem]:
+        '''Check the file in one pass'''
+        head: List[str] = []
+        in_head = True
+        in_table = False
+        begin_lineno = 0
+        with open(self.filename, 'r', encoding='utf-8') as inputfile:
+            for (lineno, line) in enumerate(inputfile, start=1):
+                if line.startswith('###') or not line.strip():
+                    continue
+                marker = line.strip().upper()
+                if in_head:
+                    if not head and '\t' in line:
+                        # Only rows, like the array30 sources:
+                        self.headless = True
+                        in_head = False
+                        in_table = True
+                    else:
+                        head.append(line)
+                        if marker.startswith('BEGIN_TABLE'):
+                            self.check_head(head)
+                            in_head = False
+                            in_table = True
+                            begin_lineno = lineno
+                        continue
+                if in_table and marker.startswith('END_TABLE'):
+                    in_table = False
+                elif in_table:
+                    self.check_row(lineno, line)
+                elif marker.startswith('BEGIN_TABLE'):
+                    # erbi-qs.txt has several table sections:
+                    in_table = True
+                    begin_lineno = lineno
+        if in_head:
+            self.problem(0, 'error', 'no-table', 'no BEGIN_TABLE found')
+        elif in_table and not self.headless:
+            self.problem(begin_lineno, 'error', 'unterminated-table',
+                         'no END_TABLE after this BEGIN_TABLE')
+        return self.problems
+
+def check_table(filename: str,
+                min_weight: int = 0,
+                max_weight: int = MAX_WEIGHT) -> List[Problem]:
+    '''
+    Check a table source in one streaming pass.
+
+    Returns the problems found, in the order of the lines.
+
+    :param filename: The table source
+    :param min_weight: The smallest weight allowed
+    :param max_weight: The biggest weight allowed
+    '''
+    LOGGER.debug('Checking %s', filename)
+    problems = _Checker(filename, min_weight, max_weight).run()
+    problems.sort(key=lambda problem: problem.lineno)
+    return problems
+
+def find_table_files(sourcedir: str) -> List[str]:
+    '''
+    Find the table sources below the tables directory.
+
+    :param sourcedir: The top source directory
+    '''
+    return sorted(
+        filename
+        for filename in glob.glob(
+            os.path.join(sourcedir, 'tables', '**', '*.txt'), recursive=True)
+        if os.path.basename(filename) != 'CMakeLists.txt')
+
+def check_tables(filenames: Iterable[str],
+                 jobs: Optional[int] = None,
+                 min_weight: int = 0,
+                 max_weight: int = MAX_WEIGHT) -> Dict[str, List[Problem]]:
+    '''
+    Check several table sources in parallel.
+
+    Returns the problems found by file name, in the order of the
+    file names given.
+
+    :param filenames: The table sources
+    :param jobs: The number of processes, default is the number of CPUs
+    :param min_weight: See check_table()
+    :param max_weight: See check_table()
+    '''
+    filenames = list(filenames)
+    results: Dict[str, List[Problem]] = {}
+    with concurrent.futures.ProcessPoolExecutor(
+            max_workers=jobs) as executor:
+        # The biggest files first, so that they do not end up running
+        # alone at the end:
+        futures = {
+            filename: executor.submit(
+                check_table, filename, min_weight, max_weight)
+            for filename in sorted(
+                filenames, key=os.path.getsize, reverse=True)}
+        for filename in filenames:
+            results[filename] = futures[filename].result()
+    return results
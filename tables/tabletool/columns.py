@@ -0,0 +1,171 @@
+#
+# Copyright (c) 2026 Mike FABIAN <mfabian@redhat.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+'''
+In-memory columnar representation of a table.
+
+The rows are stored as parallel columns (codes, phrases, weights,
+comments) instead of one object per row. Passes can work on whole
+columns, deleting and reordering rows is done once for all columns.
+'''
+
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Sequence
+import array
+import logging
+
+from .ordering import tie_break_keys
+from .tablefile import Row
+from .tablefile import TableWriter
+from .tablefile import parse_definitions
+
+LOGGER = logging.getLogger(__name__)
+
+class ColumnTable:
+    '''
+    A table with head, tail and the rows stored column by column.
+    '''
+    def __init__(self,
+                 head: Optional[List[str]] = None,
+                 tail: Optional[List[str]] = None) -> None:
+        self.head: List[str] = head if head is not None else []
+        self.tail: List[str] = tail if tail is not None else []
+        self.codes: List[str] = []
+        self.phrases: List[str] = []
+        self.weights = array.array('q')
+        self.comments: List[str] = []
+        self._definitions: Optional[Dict[str, str]] = None
+
+    @classmethod
+    def read(cls, inputfilename: str, **kwargs: Any) -> 'ColumnTable':
+        '''
+        Read a table source or a compiled table.
+
+        The keyword arguments are passed to TableReader.
+
+        :param inputfilename: The table source to read
+        '''
+        # Imported here because compiled.py imports this module:
+        from .compiled import open_table
+        table = cls()
+        with open_table(inputfilename, **kwargs) as reader:
+            table.head = reader.head
+            table.extend(reader)
+            table.tail = reader.tail
+        LOGGER.info('%s rows read from %s', len(table), inputfilename)
+        return table
+
+    def write(self, outputfilename: str) -> None:
+        '''
+        Write the table source.
+
+        :param outputfilename: The file to write
+        '''
+        with TableWriter(outputfilename) as writer:
+            writer.write_lines(self.head)
+            writer.write_rows(self.rows())
+            writer.write_lines(self.tail)
+
+    @property
+    def definitions(self) -> Dict[str, str]:
+        '''The “KEY = VALUE” settings from the head'''
+        if self._definitions is None:
+            self._definitions = parse_definitions(self.head)
+        return self._definitions
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def append(self, row: Row) -> None:
+        '''Add a row at the end'''
+        self.codes.append(row.code)
+        self.phrases.append(row.phrase)
+        self.weights.append(row.weight)
+        self.comments.append(row.comment)
+
+    def extend(self, rows: Iterable[Row]) -> None:
+        '''Add rows at the end'''
+        for row in rows:
+            self.append(row)
+
+    def row(self, index: int) -> Row:
+        '''Return a copy of one row'''
+        return Row(self.codes[index], self.phrases[index],
+                   self.weights[index], self.comments[index])
+
+    def rows(self) -> Iterator[Row]:
+        '''Return copies of all rows, in order'''
+        for (code, phrase, weight, comment) in zip(
+                self.codes, self.phrases, self.weights, self.comments):
+            yield Row(code, phrase, weight, comment)
+
+    def keep(self, keep: Sequence[bool]) -> int:
+        '''
+        Keep only the rows for which keep is true.
+
+        Returns the number of rows deleted.
+
+        :param keep: One boolean per row
+        '''
+        before = len(self)
+        self.codes = [x for (x, k) in zip(self.codes, keep) if k]
+        self.phrases = [x for (x, k) in zip(self.phrases, keep) if k]
+        self.weights = array.array(
+            'q', [x for (x, k) in zip(self.weights, keep) if k])
+        self.comments = [x for (x, k) in zip(self.comments, keep) if k]
+        return before - len(self)
+
+    def reorder(self, order: Sequence[int]) -> None:
+        '''
+        Put the rows into a new order.
+
+        :param order: The indices of the old rows, in the new order
+        '''
+        codes = self.codes
+        phrases = self.phrases
+        weights = self.weights
+        comments = self.comments
+        self.codes = [codes[i] for i in order]
+        self.phrases = [phrases[i] for i in order]
+        self.weights = array.array('q', [weights[i] for i in order])
+        self.comments = [comments[i] for i in order]
+
+    def sort(self,
+             key: Optional[Callable[[int], Any]] = None,
+             tie_break: str = 'none') -> None:
+        '''
+        Sort the rows stably.
+
+        :param key: Function returning the sort key for a row index,
+                    the default sorts by code and descending weight
+        :param tie_break: How to order rows with the same code and
+                          weight when sorting with the default key, one
+                          of ordering.TIE_BREAKS
+        '''
+        if key is None:
+            negated_weights = [-weight for weight in self.weights]
+            if tie_break == 'none':
+                keys = list(zip(self.codes, negated_weights))
+            else:
+                keys = list(zip(self.codes, negated_weights,
+                                tie_break_keys(self.phrases, tie_break)))
+            key = keys.__getitem__
+        self.reorder(sorted(range(len(self)), key=key))
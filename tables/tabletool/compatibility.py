@@ -0,0 +1,97 @@
+#
+# Copyright (c) 2026 Mike FABIAN <mfabian@redhat.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+'''
+Fast checks for CJK COMPATIBILITY IDEOGRAPHs.
+
+The set of these characters is computed once from the two Unicode
+blocks containing them, so checking a string does not need a
+unicodedata.name() call per character.
+'''
+
+from typing import Dict
+from typing import FrozenSet
+from typing import List
+import re
+import unicodedata
+
+# The “CJK Compatibility Ideographs” and the “CJK Compatibility
+# Ideographs Supplement” blocks:
+CJK_COMPATIBILITY_BLOCKS = ((0xF900, 0xFAFF), (0x2F800, 0x2FA1F))
+
+def _compatibility_ideographs() -> FrozenSet[str]:
+    chars = set()
+    for (first, last) in CJK_COMPATIBILITY_BLOCKS:
+        for codepoint in range(first, last + 1):
+            char = chr(codepoint)
+            # Same check remove_cjk_compatibility_ideographs.py always
+            # used. Note that this includes a few characters like
+            # U+FA0E which are unified ideographs despite their name.
+            if unicodedata.name(char, '').startswith(
+                    'CJK COMPATIBILITY IDEOGRAPH'):
+                chars.add(char)
+    return frozenset(chars)
+
+CJK_COMPATIBILITY_IDEOGRAPHS: FrozenSet[str] = _compatibility_ideographs()
+
+def _character_class(chars: FrozenSet[str]) -> str:
+    # Use ranges of consecutive code points, a regular expression with
+    # a character class of a thousand single characters is very slow.
+    ranges: List[List[int]] = []
+    for codepoint in sorted(map(ord, chars)):
+        if ranges and ranges[-1][1] == codepoint - 1:
+            ranges[-1][1] = codepoint
+        else:
+            ranges.append([codepoint, codepoint])
+    return '[' + ''.join(
+        chr(first) if first == last else f'{chr(first)}-{chr(last)}'
+        for (first, last) in ranges) + ']'
+
+# Matches any CJK COMPATIBILITY IDEOGRAPH, searching a whole line
+# with this is much faster than looping over its characters in Python:
+CJK_COMPATIBILITY_IDEOGRAPH_PATTERN = re.compile(
+    _character_class(CJK_COMPATIBILITY_IDEOGRAPHS))
+
+def _canonical_forms() -> Dict[int, str]:
+    mapping: Dict[int, str] = {}
+    for char in CJK_COMPATIBILITY_IDEOGRAPHS:
+        decomposition = unicodedata.decomposition(char)
+        if decomposition:
+            mapping[ord(char)] = ''.join(
+                chr(int(codepoint, 16)) for codepoint in decomposition.split())
+    return mapping
+
+# Translation table for str.translate() mapping each CJK COMPATIBILITY
+# IDEOGRAPH which has a canonical decomposition to that decomposition:
+CANONICAL_FORMS: Dict[int, str] = _canonical_forms()
+
+def contains_compatibility_ideograph(text: str) -> bool:
+    '''
+    Check whether a string contains a CJK COMPATIBILITY IDEOGRAPH
+
+    :param text: The string to check
+    '''
+    return CJK_COMPATIBILITY_IDEOGRAPH_PATTERN.search(text) is not None
+
+def replace_compatibility_ideographs(text: str) -> str:
+    '''
+    Replace the CJK COMPATIBILITY IDEOGRAPHs in a string by their
+    canonical decompositions.
+
+    The few ones which do not have a decomposition are left alone.
+
+    :param text: The string to change
+    '''
+    return text.translate(CANONICAL_FORMS)
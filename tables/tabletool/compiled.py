@@ -0,0 +1,315 @@
+#
+# Copyright (c) 2026 Mike FABIAN <mfabian@redhat.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+'''
+Compact binary format for tables which can be used with mmap.
+
+A compiled table contains the rows sorted by code. Codes, phrases
+and comments are each stored as one blob of UTF-8 with an array of
+offsets into it, the weights as an array of 64 bit integers. An
+additional array remembers the order of the rows in the source.
+Head and tail are stored as text.
+
+Opening a compiled table only maps the file, a row is decoded only
+when it is accessed. As UTF-8 sorts like the code points, a prefix
+lookup is a binary search over the offsets of the codes.
+
+All numbers are little endian. The file starts with a header:
+
+    magic “IBTC”, version (uint32), number of rows (uint32), padding,
+    then offset and length (uint64 each) of each section in SECTIONS
+
+Each section starts at a multiple of 8 bytes.
+'''
+
+from typing import Any
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Sequence
+from typing import Tuple
+from typing import Union
+import array
+import bisect
+import heapq
+import logging
+import mmap
+import struct
+import sys
+
+from .columns import ColumnTable
+from .lookup import PrefixIndex
+from .tablefile import Row
+from .tablefile import TableReader
+from .tablefile import parse_definitions
+
+LOGGER = logging.getLogger(__name__)
+
+MAGIC = b'IBTC'
+VERSION = 1
+
+SECTIONS = (
+    'code_offsets', 'codes',
+    'phrase_offsets', 'phrases',
+    'comment_offsets', 'comments',
+    'weights',
+    # The positions of the rows in the sorted order, in source order:
+    'order',
+    'head',
+    'tail',
+)
+
+# Every how many codes one is kept decoded to speed up the search:
+_FENCE_STEP = 64
+
+# Sorts after every character which can occur in a code:
+_AFTER_ALL = chr(0x10FFFF)
+
+_HEADER = struct.Struct('<4sIII' + 'QQ' * len(SECTIONS))
+
+def is_compiled(filename: str) -> bool:
+    '''
+    Check whether a file is a compiled table.
+
+    :param filename: The file to check
+    '''
+    with open(filename, 'rb') as inputfile:
+        return inputfile.read(len(MAGIC)) == MAGIC
+
+def _blob(strings: Sequence[str]) -> List[bytes]:
+    offsets = array.array('I', [0])
+    parts: List[bytes] = []
+    position = 0
+    for string in strings:
+        encoded = string.encode('utf-8')
+        parts.append(encoded)
+        position += len(encoded)
+        offsets.append(position)
+    return [_little_endian(offsets), b''.join(parts)]
+
+def _little_endian(numbers: array.array) -> bytes: # type: ignore
+    if sys.byteorder == 'big':
+        numbers = array.array(numbers.typecode, numbers)
+        numbers.byteswap()
+    return numbers.tobytes()
+
+def write_compiled(outputfilename: str, table: ColumnTable) -> None:
+    '''
+    Write a table in the compiled format.
+
+    :param outputfilename: The file to write
+    :param table: The table
+    '''
+    codes = table.codes
+    order = sorted(range(len(table)), key=codes.__getitem__)
+    position_in_sorted = array.array('I', bytes(4 * len(order)))
+    for (position, row) in enumerate(order):
+        position_in_sorted[row] = position
+    sections = (
+        _blob([codes[i] for i in order])
+        + _blob([table.phrases[i] for i in order])
+        + _blob([table.comments[i] for i in order])
+        + [_little_endian(array.array(
+            'q', [table.weights[i] for i in order])),
+           _little_endian(position_in_sorted),
+           ''.join(table.head).encode('utf-8'),
+           ''.join(table.tail).encode('utf-8')])
+    locations: List[int] = []
+    position = _HEADER.size
+    for section in sections:
+        position += -position % 8
+        locations += [position, len(section)]
+        position += len(section)
+    with open(outputfilename, 'wb') as outputfile:
+        outputfile.write(_HEADER.pack(MAGIC, VERSION, len(table), 0,
+                                      *locations))
+        for (section, offset) in zip(sections, locations[::2]):
+            outputfile.write(b'\0' * (offset - outputfile.tell()))
+            outputfile.write(section)
+    LOGGER.info('%s rows written to %s', len(table), outputfilename)
+
+class _StringSequence(Sequence[str]):
+    '''Strings stored as a blob of UTF-8 and an array of offsets'''
+    def __init__(self, offsets: Sequence[int], blob: memoryview) -> None:
+        self.offsets = offsets
+        self._blob = blob
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: Any) -> Any:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('index out of range')
+        return str(self._blob[self.offsets[index]:self.offsets[index + 1]],
+                   'utf-8')
+
+class CompiledTable(PrefixIndex):
+    '''
+    A compiled table, mapped into memory.
+
+    It can be used like a TableReader (head, tail, definitions,
+    iterating gives the rows in the order of the source) and like a
+    PrefixIndex (codes, phrases and weights are sorted by code).
+
+        with CompiledTable('easy-big.tabc') as table:
+            candidates = table.candidates('ab')
+    '''
+    # pylint: disable=super-init-not-called
+    def __init__(self, inputfilename: str) -> None:
+        '''
+        :param inputfilename: The compiled table to open
+        '''
+        self.filename = inputfilename
+        self.malformed: List[Any] = []
+        with open(inputfilename, 'rb') as inputfile:
+            self._mmap = mmap.mmap(inputfile.fileno(), 0,
+                                   access=mmap.ACCESS_READ)
+        header = _HEADER.unpack_from(self._mmap)
+        (magic, version, self._count) = header[:3]
+        if magic != MAGIC or version != VERSION:
+            self._mmap.close()
+            raise ValueError(
+                f'{inputfilename} is not a compiled table of version '
+                f'{VERSION}')
+        self._views: List[memoryview] = []
+        self._sections: Dict[str, memoryview] = {}
+        for (number, name) in enumerate(SECTIONS):
+            (offset, length) = header[4 + 2 * number:6 + 2 * number]
+            view = memoryview(self._mmap)[offset:offset + length]
+            self._views.append(view)
+            self._sections[name] = view
+        self.codes = _StringSequence(
+            self._numbers('code_offsets', 'I'), self._sections['codes'])
+        self.phrases = _StringSequence(
+            self._numbers('phrase_offsets', 'I'), self._sections['phrases'])
+        self.comments = _StringSequence(
+            self._numbers('comment_offsets', 'I'), self._sections['comments'])
+        self.weights = self._numbers('weights', 'q')
+        self._order = self._numbers('order', 'I')
+        self.head: List[str] = str(
+            self._sections['head'], 'utf-8').splitlines(keepends=True)
+        self.tail: List[str] = str(
+            self._sections['tail'], 'utf-8').splitlines(keepends=True)
+        self._definitions: Union[Dict[str, str], None] = None
+        self._fence: List[str] = []
+        # If all codes are ASCII, their lengths are the differences of
+        # the offsets and the codes need not be decoded to sort by length:
+        self._ascii_codes = bytes(self._sections['codes']).isascii()
+        LOGGER.info('input file=%s (compiled, %s rows)',
+                    inputfilename, self._count)
+
+    def _numbers(self, section: str,
+                 typecode: str) -> Union[memoryview, array.array]: # type: ignore
+        view = self._sections[section].cast(typecode)
+        if sys.byteorder == 'big':
+            numbers = array.array(typecode, view)
+            numbers.byteswap()
+            return numbers
+        self._views.append(view)
+        return view
+
+    @property
+    def definitions(self) -> Dict[str, str]:
+        '''The “KEY = VALUE” settings from the head'''
+        if self._definitions is None:
+            self._definitions = parse_definitions(self.head)
+        return self._definitions
+
+    def __len__(self) -> int:
+        return self._count
+
+    def row(self, index: int) -> Row:
+        '''
+        Return a row in the sorted order
+
+        :param index: The position in the sorted order
+        '''
+        return Row(self.codes[index], self.phrases[index],
+                   self.weights[index], self.comments[index])
+
+    def _bisect(self, code: str, right: bool = False) -> int:
+        # Every _FENCE_STEP-th code is decoded once, a binary search
+        # over these narrows the search over the mapped codes to a few
+        # steps, each of which decodes a code.
+        if not self._fence:
+            self._fence = [self.codes[i]
+                           for i in range(0, self._count, _FENCE_STEP)]
+        search = bisect.bisect_right if right else bisect.bisect_left
+        block = search(self._fence, code)
+        return search(self.codes, code,
+                      max(0, (block - 1) * _FENCE_STEP),
+                      min(self._count, block * _FENCE_STEP))
+
+    def exact_range(self, code: str) -> Tuple[int, int]:
+        return (self._bisect(code), self._bisect(code, right=True))
+
+    def prefix_range(self, prefix: str) -> Tuple[int, int]:
+        return (self._bisect(prefix), self._bisect(prefix + _AFTER_ALL))
+
+    def candidates(self,
+                   code: str,
+                   prefix: bool = True,
+                   limit: int = 0) -> List[Tuple[str, str, int]]:
+        if not self._ascii_codes:
+            return super().candidates(code, prefix=prefix, limit=limit)
+        if prefix:
+            (start, end) = self.prefix_range(code)
+        else:
+            (start, end) = self.exact_range(code)
+        offsets = self.codes.offsets
+        weights = self.weights
+        def key(i: int) -> Tuple[int, int, int]:
+            return (offsets[i + 1] - offsets[i], -weights[i], i)
+        if limit:
+            rows = heapq.nsmallest(limit, range(start, end), key=key)
+        else:
+            rows = sorted(range(start, end), key=key)
+        return [(self.codes[i], self.phrases[i], weights[i]) for i in rows]
+
+    def __iter__(self) -> Iterator[Row]:
+        for index in self._order:
+            yield self.row(index)
+
+    def __enter__(self) -> 'CompiledTable':
+        return self
+
+    def __exit__(self, *_args: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        '''Unmap the file'''
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self._mmap.close()
+
+def open_table(inputfilename: str,
+               **kwargs: Any) -> Union[TableReader, CompiledTable]:
+    '''
+    Open a table source or a compiled table for reading.
+
+    Both have head, tail and definitions and give the rows in the
+    order of the source when iterated. The keyword arguments are
+    passed to TableReader, they do not matter for compiled tables.
+
+    :param inputfilename: The file to open
+    '''
+    if is_compiled(inputfilename):
+        return CompiledTable(inputfilename)
+    return TableReader(inputfilename, **kwargs)
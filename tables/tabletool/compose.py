@@ -0,0 +1,224 @@
+#
+# Copyright (c) 2026 Mike FABIAN <mfabian@redhat.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+'''
+Compose a table from a base source and extension sources described
+in a manifest, like array30-big which is array30 plus the Ext B and
+Ext C/D characters.
+
+A manifest has “KEY = VALUE” lines, lines starting with “#” are
+comments:
+
+    ### Array30 with the characters of CJK Ext B, C and D
+    BASE = array30_27489.txt
+    EXTENSION = array30_ExtB.txt
+    EXTENSION = array30_ExtCD_V2012A.txt
+    TAIL = array30.tail
+    WEIGHTS = countdown
+
+File names are relative to the directory of the manifest. The
+sources can be headless or complete table sources, only their rows
+are used. If the same code and phrase occur in several sources, the
+row of the source listed first wins (BASE before the EXTENSIONs in
+their order).
+
+WEIGHTS is “source” to keep the weights of the rows, or “countdown”
+to give the first row of each code the weight START (default 1000)
+and each following one less, like GENERATE_FREQ.
+
+The rows are written sorted by code and descending weight, whatever
+the order of the sources. Each source is sorted in chunks of at most
+chunk_rows rows which are written to temporary files, and the chunks
+of all sources are merged in one streaming k-way merge, so no source
+has to fit into memory. Rows with the same code keep the order of
+the sources.
+'''
+
+from typing import Dict
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+import heapq
+import itertools
+import logging
+import os
+import tempfile
+
+from .tablefile import Row
+from .tablefile import TableFormatError
+from .tablefile import TableReader
+from .tablefile import TableWriter
+from .tablefile import parse_row
+
+LOGGER = logging.getLogger(__name__)
+
+WEIGHT_POLICIES = ('source', 'countdown')
+
+# Number of rows sorted in memory at a time:
+CHUNK_ROWS = 200000
+
+class Manifest(NamedTuple):
+    '''A table composed of sources, see read_manifest()'''
+    # The base source first, then the extensions by precedence:
+    sources: List[str]
+    head: str = ''
+    tail: str = ''
+    weights: str = 'source'
+    start: int = 1000
+
+def read_manifest(inputfilename: str) -> Manifest:
+    '''
+    Read a manifest.
+
+    :param inputfilename: The manifest to read
+    :raises TableFormatError: if the manifest is not valid
+    '''
+    directory = os.path.dirname(os.path.abspath(inputfilename))
+    values: Dict[str, List[str]] = {}
+    with open(inputfilename, 'r', encoding='utf-8') as inputfile:
+        for (lineno, line) in enumerate(inputfile, start=1):
+            if line.startswith('#') or not line.strip():
+                continue
+            (key, equals, value) = line.partition('=')
+            key = key.strip().upper()
+            if not equals or key not in (
+                    'BASE', 'EXTENSION', 'HEAD', 'TAIL', 'WEIGHTS', 'START'):
+                raise TableFormatError(
+                    f'invalid line {line.rstrip()!r}', inputfilename, lineno)
+            values.setdefault(key, []).append(value.strip())
+    if len(values.get('BASE', [])) != 1:
+        raise TableFormatError('exactly one BASE is needed', inputfilename)
+    for key in ('HEAD', 'TAIL', 'WEIGHTS', 'START'):
+        if len(values.get(key, [])) > 1:
+            raise TableFormatError(f'{key} is given more than once',
+                                   inputfilename)
+    weights = values.get('WEIGHTS', ['source'])[0]
+    if weights not in WEIGHT_POLICIES:
+        raise TableFormatError(f'invalid WEIGHTS {weights!r}', inputfilename)
+    try:
+        start = int(values.get('START', ['1000'])[0])
+    except ValueError as error:
+        raise TableFormatError(
+            f'invalid START {values["START"][0]!r}', inputfilename) from error
+    def path(filename: str) -> str:
+        return os.path.join(directory, filename) if filename else ''
+    return Manifest(
+        sources=[path(filename)
+                 for filename in values['BASE'] + values.get('EXTENSION', [])],
+        head=path(values.get('HEAD', [''])[0]),
+        tail=path(values.get('TAIL', [''])[0]),
+        weights=weights,
+        start=start)
+
+def _read_rows(inputfilename: str) -> Iterator[Row]:
+    with open(inputfilename, 'r', encoding='utf-8') as inputfile:
+        # Sources without a head, like the array30 sources, start
+        # with a row:
+        headless = '\t' in inputfile.readline()
+    with TableReader(inputfilename, headless=headless,
+                     all_sections=True) as reader:
+        yield from reader
+
+def _read_run(filename: str) -> Iterator[Row]:
+    with open(filename, 'r', encoding='utf-8') as inputfile:
+        for line in inputfile:
+            yield parse_row(line)
+
+def _sorted_runs(inputfilename: str,
+                 chunk_rows: int,
+                 tmpdir: str) -> List[Iterable[Row]]:
+    # Sort the rows of a source by code in chunks, the order of the
+    # source is kept for rows with the same code. A source which fits
+    # into one chunk stays in memory.
+    runs: List[Iterable[Row]] = []
+    rows = _read_rows(inputfilename)
+    while True:
+        chunk = list(itertools.islice(rows, chunk_rows))
+        if not chunk:
+            break
+        chunk.sort(key=lambda row: row.code)
+        if not runs and len(chunk) < chunk_rows:
+            runs.append(chunk)
+            break
+        (handle, filename) = tempfile.mkstemp(dir=tmpdir, suffix='.run')
+        os.close(handle)
+        with TableWriter(filename) as writer:
+            writer.write_rows(chunk)
+        runs.append(_read_run(filename))
+    LOGGER.info('%s: %s sorted runs', inputfilename, len(runs))
+    return runs
+
+def _groups(rows: Iterable[Row],
+            weights: str,
+            start: int) -> Iterator[Row]:
+    # The rows of each code, without the phrases already seen for the
+    # code, sorted by descending weight:
+    for (_code, group) in itertools.groupby(rows, key=lambda row: row.code):
+        seen = set()
+        unique: List[Row] = []
+        for row in group:
+            if row.phrase not in seen:
+                seen.add(row.phrase)
+                unique.append(row)
+        if weights == 'countdown':
+            for (number, row) in enumerate(unique):
+                row.weight = start - number
+        else:
+            unique.sort(key=lambda row: -row.weight)
+        yield from unique
+
+def compose_table(manifest: Manifest,
+                  outputfilename: str,
+                  head: Optional[str] = None,
+                  tail: Optional[str] = None,
+                  chunk_rows: int = CHUNK_ROWS) -> int:
+    '''
+    Write the table described by a manifest.
+
+    Returns the number of rows written.
+
+    :param manifest: The manifest
+    :param outputfilename: The table source to write
+    :param head: If not None, the head file to use instead of the one
+                 of the manifest, for heads configured by CMake
+    :param tail: If not None, the tail file to use instead of the one
+                 of the manifest
+    :param chunk_rows: The number of rows sorted in memory at a time
+    '''
+    if head is None:
+        head = manifest.head
+    if tail is None:
+        tail = manifest.tail
+    with tempfile.TemporaryDirectory(prefix='tabletool-compose-') as tmpdir:
+        runs: List[Iterable[Row]] = []
+        for source in manifest.sources:
+            runs += _sorted_runs(source, chunk_rows, tmpdir)
+        # heapq.merge() keeps the order of the runs for rows with the
+        # same code, i.e. the order of the manifest and of the sources:
+        merged = heapq.merge(*runs, key=lambda row: row.code)
+        with TableWriter(outputfilename) as writer:
+            if head:
+                with open(head, 'r', encoding='utf-8') as headfile:
+                    writer.write_lines(headfile)
+            count = writer.write_rows(
+                _groups(merged, manifest.weights, manifest.start))
+            if tail:
+                with open(tail, 'r', encoding='utf-8') as tailfile:
+                    writer.write_lines(tailfile)
+    LOGGER.info('%s rows of %s sources written to %s',
+                count, len(manifest.sources), outputfilename)
+    return count
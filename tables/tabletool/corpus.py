@@ -0,0 +1,206 @@
+#
+# Copyright (c) 2026 Mike FABIAN <mfabian@redhat.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+'''
+Count how often the phrases of tables occur in a plain text corpus.
+
+The corpus files are split into chunks at line boundaries, the chunks
+are counted in a process pool and the counters of the chunks are
+added up at the end. Each worker reads its chunks itself, so only
+the offsets and the counters of the phrases found are sent between
+processes and corpora of several GB can be counted:
+
+    python3 -m tabletool corpus-freq -c corpus.txt \\
+        -i quick/quick5.txt -o quick5-new.txt
+
+Every occurrence of a phrase is counted, also where it overlaps with
+other phrases. The counts can be mapped onto the weight column of a
+table with frequency.corpus_weights().
+'''
+
+from typing import Counter
+from typing import Dict
+from typing import FrozenSet
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Set
+from typing import Tuple
+import collections
+import concurrent.futures
+import itertools
+import logging
+import math
+import os
+
+LOGGER = logging.getLogger(__name__)
+
+# Size of the chunks the corpus files are split into:
+CHUNK_SIZE = 16 * 1024 * 1024
+
+class PhraseSet:
+    '''
+    The phrases to count, prepared for matching them in text.
+    '''
+    def __init__(self, phrases: Iterable[str]) -> None:
+        '''
+        :param phrases: The phrases to count, single characters included
+        '''
+        self.phrases: FrozenSet[str] = frozenset(phrases)
+        # The beginnings of the phrases which are shorter than the
+        # phrase, only where the text starts like this a phrase has to
+        # be looked for:
+        prefixes: Set[str] = set()
+        for phrase in self.phrases:
+            for length in range(1, len(phrase)):
+                prefixes.add(phrase[:length])
+        self.prefixes: FrozenSet[str] = frozenset(prefixes)
+        self.max_length = max((len(phrase) for phrase in self.phrases),
+                              default=0)
+
+    def count(self, text: str) -> Counter[str]:
+        '''
+        Count the occurrences of the phrases in a text.
+
+        :param text: The text
+        '''
+        counts: Counter[str] = collections.Counter()
+        phrases = self.phrases
+        prefixes = self.prefixes
+        for (char, count) in collections.Counter(text).items():
+            if char in phrases:
+                counts[char] = count
+        # Instead of trying all lengths at each position, all positions
+        # still possible are tried for one length after the other, so
+        # that the work is done by the C implementations of map(),
+        # filter() and compress() and the set lookups:
+        starts = list(itertools.compress(
+            range(len(text)), map(prefixes.__contains__, text)))
+        # Padding so that all candidates have the full length, no
+        # phrase contains a NUL:
+        text += '\0' * self.max_length
+        for length in range(2, self.max_length + 1):
+            candidates = [text[start:start + length] for start in starts]
+            if not candidates:
+                break
+            counts.update(filter(phrases.__contains__, candidates))
+            starts = list(itertools.compress(
+                starts, map(prefixes.__contains__, candidates)))
+        return counts
+
+def corpus_chunks(filename: str,
+                  chunk_size: int = CHUNK_SIZE) -> List[Tuple[int, int]]:
+    '''
+    Split a file into chunks of about chunk_size bytes which end at
+    the end of a line.
+
+    Returns the chunks as (start, end) byte offsets.
+
+    :param filename: The file to split
+    :param chunk_size: The approximate size of the chunks
+    '''
+    size = os.path.getsize(filename)
+    chunks: List[Tuple[int, int]] = []
+    with open(filename, 'rb') as inputfile:
+        start = 0
+        while start < size:
+            inputfile.seek(min(start + chunk_size, size))
+            inputfile.readline()
+            end = min(inputfile.tell(), size)
+            chunks.append((start, end))
+            start = end
+    return chunks
+
+# The phrases to count in a worker process, set by _init_worker() so
+# that they are sent to each process only once:
+_WORKER_PHRASES: Optional[PhraseSet] = None
+
+def _init_worker(phrases: PhraseSet) -> None:
+    global _WORKER_PHRASES # pylint: disable=global-statement
+    _WORKER_PHRASES = phrases
+
+def _count_chunk(filename: str, start: int, end: int) -> Counter[str]:
+    assert _WORKER_PHRASES is not None
+    with open(filename, 'rb') as inputfile:
+        inputfile.seek(start)
+        text = inputfile.read(end - start).decode('utf-8', errors='replace')
+    return _WORKER_PHRASES.count(text)
+
+def count_corpus(filenames: Iterable[str],
+                 phrases: Iterable[str],
+                 jobs: Optional[int] = None,
+                 chunk_size: int = CHUNK_SIZE) -> Counter[str]:
+    '''
+    Count the occurrences of phrases in corpus files in parallel.
+
+    :param filenames: The corpus files, plain text in UTF-8
+    :param phrases: The phrases to count
+    :param jobs: The number of processes, default is the number of CPUs
+    :param chunk_size: The approximate size of the pieces of the files
+                       counted by one process at a time
+    '''
+    phrase_set = PhraseSet(phrases)
+    counts: Counter[str] = collections.Counter()
+    with concurrent.futures.ProcessPoolExecutor(
+            max_workers=jobs,
+            initializer=_init_worker,
+            initargs=(phrase_set,)) as executor:
+        futures = [
+            executor.submit(_count_chunk, filename, start, end)
+            for filename in filenames
+            for (start, end) in corpus_chunks(filename, chunk_size)]
+        LOGGER.info('Counting %s phrases in %s chunks',
+                    len(phrase_set.phrases), len(futures))
+        for future in concurrent.futures.as_completed(futures):
+            counts.update(future.result())
+    return counts
+
+def scale_counts(counts: Dict[str, int],
+                 scale: str = 'count',
+                 maximum: int = 1000) -> Dict[str, int]:
+    '''
+    Turn the counts into weights.
+
+    :param counts: The counts of the phrases
+    :param scale: “count” to use the counts as they are, “log” to map
+                  the logarithms of the counts to 1…maximum, which
+                  keeps the order but gives numbers like the weights
+                  of hand made tables
+    :param maximum: The weight of the most frequent phrase for “log”
+    '''
+    if scale == 'count':
+        return dict(counts)
+    if scale != 'log':
+        raise ValueError(f'unknown scale {scale!r}')
+    largest = max(counts.values(), default=0)
+    if largest <= 1:
+        return {phrase: 1 for phrase in counts if counts[phrase]}
+    return {phrase: max(1, round(maximum * math.log1p(count)
+                                 / math.log1p(largest)))
+            for (phrase, count) in counts.items() if count}
+
+def write_counts(outputfilename: str, counts: Dict[str, int]) -> None:
+    '''
+    Write counts as lines “phrase<TAB>count”, most frequent first, as
+    read by frequency.read_corpus().
+
+    :param outputfilename: The file to write
+    :param counts: The counts of the phrases
+    '''
+    with open(outputfilename, 'w', encoding='utf-8') as outputfile:
+        for (phrase, count) in sorted(counts.items(),
+                                      key=lambda item: (-item[1], item[0])):
+            outputfile.write(f'{phrase}\t{count}\n')
+    LOGGER.info('%s counts written to %s', len(counts), outputfilename)
@@ -0,0 +1,389 @@
+#
+# Copyright (c) 2026 Mike FABIAN <mfabian@redhat.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+'''
+Write the SQLite databases used by ibus-table directly.
+
+This creates the same tables as ibus-table-createdb, but from rows
+which have already been read, in a single transaction, and creates
+the indexes only after all rows are in.
+
+ibus-table-createdb fills the pinyin table of tables with
+“PINYIN_MODE = TRUE” from the pinyin data shipped with ibus-table,
+which is not available here, so write_database() refuses these
+tables instead of writing a database without pinyin.
+
+After small changes to a table source, an existing database can be
+patched instead of written again: the old and new rows are compared
+with a sorted merge on (code, phrase) and only the differences are
+applied, see patch_database().
+'''
+
+from typing import Any
+from typing import Counter
+from typing import Dict
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+from typing import Tuple
+import collections
+import logging
+import os
+import sqlite3
+
+from .tablefile import Row
+from .tablefile import parse_definitions
+
+LOGGER = logging.getLogger(__name__)
+
+# The schema of ibus-table, see tabsqlitedb.py in ibus-table:
+SCHEMA = '''
+CREATE TABLE ime (attr TEXT, val TEXT);
+CREATE TABLE phrases (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                      tabkeys TEXT, phrase TEXT,
+                      freq INTEGER, user_freq INTEGER,
+                      UNIQUE (tabkeys, phrase));
+CREATE TABLE goucima (zi TEXT PRIMARY KEY, goucima TEXT);
+CREATE TABLE pinyin (pinyin TEXT, zi TEXT, freq INTEGER);
+'''
+
+INDEXES = '''
+CREATE INDEX goucima_index_z ON goucima (zi);
+CREATE INDEX pinyin_index_i ON pinyin (pinyin);
+CREATE INDEX phrases_index_p ON phrases (tabkeys, id ASC);
+CREATE INDEX phrases_index_i ON phrases (phrase, id ASC);
+'''
+
+# Like ibus-table, rows with a code and phrase which are already in
+# the database are ignored, i.e. the first of duplicate rows wins:
+INSERT_PHRASE = ('INSERT OR IGNORE INTO phrases '
+                 '(tabkeys, phrase, freq, user_freq) VALUES (?, ?, ?, 0)')
+
+def _goucima(tail: Iterable[str]) -> Iterator[Tuple[str, str]]:
+    in_goucima = False
+    for line in tail:
+        marker = line.strip().upper()
+        if marker == 'BEGIN_GOUCI':
+            in_goucima = True
+            continue
+        if marker == 'END_GOUCI':
+            in_goucima = False
+            continue
+        if not in_goucima or line.startswith('###') or not line.strip():
+            continue
+        fields = line.rstrip('\n').split('\t')
+        if len(fields) >= 2:
+            yield (fields[0], fields[1])
+
+# The tables compared by compare_databases(), with the columns
+# compared and the order of the rows:
+COMPARED_TABLES = (
+    ('ime', 'attr, val', 'attr, val'),
+    ('phrases', 'tabkeys, phrase, freq', 'id'),
+    ('pinyin', 'pinyin, zi, freq', 'pinyin, zi, freq'),
+)
+
+def pinyin_mode(definitions: Dict[str, str]) -> bool:
+    '''
+    Check whether a table needs the pinyin table of the database.
+
+    :param definitions: The definitions of the table, as returned by
+                        parse_definitions()
+    '''
+    return definitions.get('PINYIN_MODE', '').strip().upper() == 'TRUE'
+
+def write_database(dbfilename: str,
+                   head: List[str],
+                   rows: Iterable[Row],
+                   tail: Iterable[str] = ()) -> int:
+    '''
+    Write a table database.
+
+    An existing file is replaced. Returns the number of phrases written.
+
+    Tables with “PINYIN_MODE = TRUE” are refused, because their pinyin
+    table can only be filled by ibus-table-createdb.
+
+    :param dbfilename: The database file to write
+    :param head: The head of the table source, the settings are
+                 written to the ime table
+    :param rows: The rows, written to the phrases table in this order.
+                 Of rows with the same code and phrase only the first
+                 is written, like ibus-table-createdb does.
+    :param tail: The tail of the table source, a BEGIN_GOUCI section
+                 in it is written to the goucima table. It is only
+                 iterated after all rows have been written.
+    :raises ValueError: if the table has “PINYIN_MODE = TRUE”
+    '''
+    definitions = parse_definitions(head)
+    if pinyin_mode(definitions):
+        raise ValueError(
+            f'{dbfilename}: PINYIN_MODE = TRUE needs the pinyin table, '
+            f'which only ibus-table-createdb can fill')
+    if os.path.exists(dbfilename):
+        os.remove(dbfilename)
+    connection = sqlite3.connect(dbfilename)
+    try:
+        # Nothing to protect while the file is created, if the build
+        # is interrupted the file is created again anyway:
+        connection.execute('PRAGMA journal_mode = OFF')
+        connection.execute('PRAGMA synchronous = OFF')
+        connection.executescript(SCHEMA)
+        with connection:
+            connection.executemany(
+                'INSERT INTO ime (attr, val) VALUES (?, ?)',
+                [(key.lower(), value)
+                 for (key, value) in definitions.items()])
+            cursor = connection.executemany(
+                INSERT_PHRASE,
+                ((row.code, row.phrase, row.weight) for row in rows))
+            count = cursor.rowcount
+            connection.executemany(
+                'INSERT OR REPLACE INTO goucima (zi, goucima) VALUES (?, ?)',
+                _goucima(tail))
+        connection.executescript(INDEXES)
+        connection.execute('PRAGMA journal_mode = DELETE')
+        connection.execute('PRAGMA synchronous = FULL')
+    finally:
+        connection.close()
+    LOGGER.info('%s phrases written to %s', count, dbfilename)
+    return count
+
+def read_phrases(dbfilename: str) -> Iterator[Tuple[str, str, int]]:
+    '''
+    Return the rows (tabkeys, phrase, freq) of the phrases table of a
+    database, in the order they were added.
+
+    :param dbfilename: The database file to read
+    '''
+    connection = sqlite3.connect(dbfilename)
+    try:
+        yield from connection.execute(
+            'SELECT tabkeys, phrase, freq FROM phrases ORDER BY id')
+    finally:
+        connection.close()
+
+def _read_table_rows(dbfilename: str,
+                     table: str,
+                     columns: str,
+                     order: str) -> Iterator[Tuple[Any, ...]]:
+    connection = sqlite3.connect(dbfilename)
+    try:
+        yield from connection.execute(
+            f'SELECT {columns} FROM {table} ORDER BY {order}')
+    finally:
+        connection.close()
+
+def compare_databases(dbfilename: str,
+                      other_dbfilename: str,
+                      max_differences: int = 10) -> List[str]:
+    '''
+    Compare the ime, phrases and pinyin tables of two databases row
+    by row.
+
+    Returns descriptions of the differences found, an empty list if
+    the tables are the same. The rows of the phrases table are
+    compared in the order they were added, the rows of the other
+    tables sorted.
+
+    :param dbfilename: The first database
+    :param other_dbfilename: The second database
+    :param max_differences: Stop after this many differences
+    '''
+    differences: List[str] = []
+    for (table, columns, order) in COMPARED_TABLES:
+        number = 0
+        missing = ('',) * len(columns.split(','))
+        rows = _read_table_rows(dbfilename, table, columns, order)
+        other_rows = _read_table_rows(other_dbfilename, table, columns, order)
+        while len(differences) < max_differences:
+            row = next(rows, None)
+            other_row = next(other_rows, None)
+            if row is None and other_row is None:
+                break
+            number += 1
+            if row != other_row:
+                differences.append(
+                    f'{table} row {number}: {tuple(row or missing)} '
+                    f'!= {tuple(other_row or missing)}')
+        rows.close()
+        other_rows.close()
+    return differences
+
+class PatchResult(NamedTuple):
+    '''What patch_database() changed'''
+    inserted: int
+    deleted: int
+    updated: int
+
+def unique_rows(rows: Iterable[Row]) -> Iterator[Row]:
+    '''
+    Return the rows without the ones whose code and phrase occurred
+    before, these are the rows which end up in the database.
+
+    :param rows: The rows of a table source
+    '''
+    seen = set()
+    for row in rows:
+        key = (row.code, row.phrase)
+        if key not in seen:
+            seen.add(key)
+            yield row
+
+def _sorted_keys(rows: Iterable[Row]) -> List[Tuple[str, str, int]]:
+    return sorted((row.code, row.phrase, row.weight) for row in rows)
+
+def _take_group(rows: List[Tuple[str, str, int]],
+                index: int) -> Tuple[List[int], int]:
+    # The weights of all rows with the same code and phrase as the
+    # row at index, and the index after them:
+    (code, phrase) = rows[index][:2]
+    weights: List[int] = []
+    while (index < len(rows)
+           and rows[index][0] == code and rows[index][1] == phrase):
+        weights.append(rows[index][2])
+        index += 1
+    return (weights, index)
+
+def diff_rows(old_rows: Iterable[Row],
+              new_rows: Iterable[Row]
+              ) -> Iterator[Tuple[str, str, Optional[int], Optional[int]]]:
+    '''
+    Compare two versions of the rows of a table.
+
+    Both are sorted by (code, phrase) and merged. Yields tuples
+    (code, phrase, old_weight, new_weight) for the differences:
+    old_weight is None for a row to insert, new_weight is None for
+    a row to delete, else the weight changed. Rows with the same code
+    and phrase occurring more than once are matched by weight.
+
+    :param old_rows: The rows as they are
+    :param new_rows: The rows as they should be
+    '''
+    old = _sorted_keys(old_rows)
+    new = _sorted_keys(new_rows)
+    (old_index, new_index) = (0, 0)
+    while old_index < len(old) or new_index < len(new):
+        if (new_index == len(new)
+                or (old_index < len(old)
+                    and old[old_index][:2] < new[new_index][:2])):
+            (code, phrase, weight) = old[old_index]
+            yield (code, phrase, weight, None)
+            old_index += 1
+        elif (old_index == len(old)
+              or new[new_index][:2] < old[old_index][:2]):
+            (code, phrase, weight) = new[new_index]
+            yield (code, phrase, None, weight)
+            new_index += 1
+        else:
+            (code, phrase) = old[old_index][:2]
+            (old_weights, old_index) = _take_group(old, old_index)
+            (new_weights, new_index) = _take_group(new, new_index)
+            if old_weights == new_weights:
+                continue
+            unchanged: Counter[int] = (collections.Counter(old_weights)
+                                       & collections.Counter(new_weights))
+            removed = sorted((collections.Counter(old_weights)
+                              - unchanged).elements())
+            added = sorted((collections.Counter(new_weights)
+                            - unchanged).elements())
+            for (old_weight, new_weight) in zip(removed, added):
+                yield (code, phrase, old_weight, new_weight)
+            for old_weight in removed[len(added):]:
+                yield (code, phrase, old_weight, None)
+            for new_weight in added[len(removed):]:
+                yield (code, phrase, None, new_weight)
+
+def patch_database(dbfilename: str,
+                   head: List[str],
+                   new_rows: Iterable[Row],
+                   tail: Iterable[str] = (),
+                   old_rows: Optional[Iterable[Row]] = None,
+                   serial_number: str = '') -> PatchResult:
+    '''
+    Patch a database written by write_database() or
+    ibus-table-createdb to contain the new version of a table.
+
+    Only the inserts, deletes and weight updates found by diff_rows()
+    are applied, all in one transaction. The settings in the ime table
+    and the goucima table are replaced from head and tail, which are
+    small. New rows are appended, so among rows with the same code
+    and weight they may come in a different order than after writing
+    the database again.
+
+    :param dbfilename: The database to patch
+    :param head: The head of the new table source
+    :param new_rows: The rows of the new table source
+    :param tail: The tail of the new table source, only iterated
+                 after all rows
+    :param old_rows: The rows of the table source the database was
+                     written from. If None, the rows are read from
+                     the database itself, which is slower but also
+                     correct if the database is not from that source.
+    :param serial_number: If not empty, the SERIAL_NUMBER to stamp
+                          into the database instead of the one from head
+    '''
+    if old_rows is None:
+        old_rows = [Row(code, phrase, weight)
+                    for (code, phrase, weight) in read_phrases(dbfilename)]
+    # Only the first of duplicate rows is in the database, so only
+    # that one may be compared:
+    differences = list(diff_rows(unique_rows(old_rows),
+                                 unique_rows(new_rows)))
+    definitions = parse_definitions(head)
+    if serial_number:
+        definitions['SERIAL_NUMBER'] = serial_number
+    (inserted, deleted, updated) = (0, 0, 0)
+    connection = sqlite3.connect(dbfilename)
+    try:
+        with connection:
+            for (code, phrase, old_weight, new_weight) in differences:
+                if old_weight is None:
+                    inserted += connection.execute(
+                        INSERT_PHRASE, (code, phrase, new_weight)).rowcount
+                elif new_weight is None:
+                    deleted += connection.execute(
+                        'DELETE FROM phrases WHERE id = '
+                        '(SELECT id FROM phrases WHERE tabkeys = ? '
+                        'AND phrase = ? AND freq = ? LIMIT 1)',
+                        (code, phrase, old_weight)).rowcount
+                else:
+                    updated += connection.execute(
+                        'UPDATE phrases SET freq = ? WHERE id = '
+                        '(SELECT id FROM phrases WHERE tabkeys = ? '
+                        'AND phrase = ? AND freq = ? LIMIT 1)',
+                        (new_weight, code, phrase, old_weight)).rowcount
+            connection.execute('DELETE FROM ime')
+            connection.executemany(
+                'INSERT INTO ime (attr, val) VALUES (?, ?)',
+                [(key.lower(), value)
+                 for (key, value) in definitions.items()])
+            connection.execute('DELETE FROM goucima')
+            connection.executemany(
+                'INSERT OR REPLACE INTO goucima (zi, goucima) VALUES (?, ?)',
+                _goucima(tail))
+    finally:
+        connection.close()
+    result = PatchResult(inserted, deleted, updated)
+    if inserted + deleted + updated != len(differences):
+        LOGGER.warning('%s: %s differences, but only %s rows changed, '
+                       'the database was not written from the old source',
+                       dbfilename, len(differences),
+                       inserted + deleted + updated)
+    LOGGER.info('%s patched: %s inserted, %s deleted, %s updated',
+                dbfilename, *result)
+    return result
@@ -0,0 +1,142 @@
+#
+# Copyright (c) 2026 Mike FABIAN <mfabian@redhat.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+'''
+Assign weights to raw table sources which have only code and phrase
+columns, like the array30 sources.
+'''
+
+from typing import Dict
+from typing import Iterable
+from typing import Iterator
+from typing import Optional
+import logging
+
+from .tablefile import Row
+from .tablefile import TableFormatError
+from .tablefile import TableReader
+from .tablefile import TableWriter
+
+LOGGER = logging.getLogger(__name__)
+
+def countdown_weights(rows: Iterable[Row], start: int = 1000) -> Iterator[Row]:
+    '''
+    Give the first row of each run of rows with the same code the
+    weight start, and each following row of the run one less.
+
+    This is what the GENERATE_FREQ awk macro in tables/CMakeLists.txt
+    used to do, it keeps the order of the source.
+
+    :param rows: The rows, in the order of the source
+    :param start: The weight of the first row of each code
+    '''
+    last_code = None
+    weight = start
+    for row in rows:
+        if row.code != last_code:
+            last_code = row.code
+            weight = start
+        else:
+            weight -= 1
+        row.weight = weight
+        yield row
+
+def corpus_weights(rows: Iterable[Row],
+                   corpus: Dict[str, int],
+                   default: int = 0) -> Iterator[Row]:
+    '''
+    Give each row the frequency of its phrase in a corpus.
+
+    :param rows: The rows
+    :param corpus: Maps phrases to their frequencies, see read_corpus()
+    :param default: The weight of phrases not in the corpus
+    '''
+    for row in rows:
+        row.weight = corpus.get(row.phrase, default)
+        yield row
+
+def read_corpus(inputfilename: str) -> Dict[str, int]:
+    '''
+    Read a frequency corpus with lines “phrase<TAB>frequency”.
+
+    Only the tab separates the columns, phrases may contain other
+    white space like U+3000 IDEOGRAPHIC SPACE or U+00A0 NO-BREAK SPACE.
+    Empty lines and lines starting with “#” without a tab are ignored.
+
+    :param inputfilename: The file to read
+    :raises TableFormatError: if a line cannot be parsed
+    '''
+    corpus: Dict[str, int] = {}
+    with open(inputfilename, 'r', encoding='utf-8') as inputfile:
+        for (lineno, line) in enumerate(inputfile, start=1):
+            line = line.rstrip('\r\n')
+            if not line or (line.startswith('#') and '\t' not in line):
+                continue
+            fields = line.split('\t')
+            try:
+                corpus[fields[0]] = int(fields[1])
+            except (IndexError, ValueError) as error:
+                raise TableFormatError(
+                    f'invalid line {line!r}, expected “phrase<TAB>frequency”',
+                    inputfilename, lineno) from error
+    LOGGER.info('%s frequencies read from %s', len(corpus), inputfilename)
+    return corpus
+
+def _read_rows(inputfilenames: Iterable[str]) -> Iterator[Row]:
+    for inputfilename in inputfilenames:
+        with TableReader(inputfilename, headless=True) as reader:
+            yield from reader
+
+def _read_lines(inputfilename: str) -> Iterator[str]:
+    if not inputfilename:
+        return
+    with open(inputfilename, 'r', encoding='utf-8') as inputfile:
+        yield from inputfile
+
+def generate_freq(inputfilenames: Iterable[str],
+                  outputfilename: str,
+                  headfilename: str = '',
+                  tailfilename: str = '',
+                  start: int = 1000,
+                  corpus: Optional[Dict[str, int]] = None,
+                  default: int = 0) -> int:
+    '''
+    Write a table source from a head file, the rows of several
+    headless sources with weights added, and a tail file, in one pass.
+
+    The sources are read one after the other as if they were
+    concatenated. Returns the number of rows written.
+
+    :param inputfilenames: The headless sources
+    :param outputfilename: The table source to write
+    :param headfilename: File to copy in front of the rows, if any
+    :param tailfilename: File to copy after the rows, if any
+    :param start: The weight of the first row of each code, if no
+                  corpus is used, see countdown_weights()
+    :param corpus: If not None, use the frequencies from this corpus,
+                   see corpus_weights()
+    :param default: The weight of phrases not in the corpus
+    '''
+    rows = _read_rows(inputfilenames)
+    if corpus is None:
+        rows = countdown_weights(rows, start)
+    else:
+        rows = corpus_weights(rows, corpus, default)
+    with TableWriter(outputfilename) as writer:
+        writer.write_lines(_read_lines(headfilename))
+        count = writer.write_rows(rows)
+        writer.write_lines(_read_lines(tailfilename))
+    LOGGER.info('%s rows written to %s', count, outputfilename)
+    return count
@@ -0,0 +1,254 @@
+#
+# Copyright (c) 2026 Mike FABIAN <mfabian@redhat.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+'''
+Measure where the table scripts spend their time.
+
+The scripts add the options with add_arguments() and run their work
+in a session:
+
+    with instrument.session_from_args(args) as stats:
+        with stats.phase('read'):
+            table = tabletool.ColumnTable.read(inputfilename)
+        stats.count('rows in', len(table))
+
+The time of each phase and the counters are logged at the end of
+the session when any of the options is given. --profile also runs cProfile,
+--tracemalloc records the peak memory and where it was allocated,
+--log-limit lets only the first messages of each kind through, which
+keeps scripts logging every changed row from spending their time on
+logging.
+'''
+
+from typing import Any
+from typing import ContextManager
+from typing import Counter
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Tuple
+import collections
+import contextlib
+import cProfile
+import io
+import json
+import logging
+import pstats
+import time
+import tracemalloc
+
+LOGGER = logging.getLogger(__name__)
+
+class Stats:
+    '''
+    The time spent in each phase and counters, like rows read,
+    written and changed by each rule.
+    '''
+    def __init__(self) -> None:
+        # Seconds by phase, in the order the phases were first entered:
+        self.phases: Dict[str, float] = {}
+        self.counters: Dict[str, int] = {}
+        # Filled by session():
+        self.total_seconds = 0.0
+        self.memory: Dict[str, Any] = {}
+        self.suppressed_messages: Dict[str, int] = {}
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        '''
+        Measure the time spent in a phase, phases entered several
+        times are added up.
+
+        :param name: The name of the phase, like “read” or “sort”
+        '''
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = (self.phases.get(name, 0.0)
+                                 + time.perf_counter() - start)
+
+    def count(self, name: str, number: int = 1) -> None:
+        '''
+        Add to a counter.
+
+        :param name: The name of the counter, like “rows changed by
+                     demote-x”
+        :param number: What to add
+        '''
+        self.counters[name] = self.counters.get(name, 0) + number
+
+    def to_dict(self) -> Dict[str, Any]:
+        '''Return the measurements as a dictionary which can be
+        written as JSON'''
+        return {
+            'total_seconds': round(self.total_seconds, 6),
+            'phases': {name: round(seconds, 6)
+                       for (name, seconds) in self.phases.items()},
+            'counters': dict(self.counters),
+            'memory': self.memory,
+            'suppressed_messages': dict(self.suppressed_messages),
+        }
+
+    def format(self) -> str:
+        '''Return the measurements as a human readable report'''
+        lines: List[str] = []
+        width = max([len(name) for name in self.phases]
+                    + [len(name) for name in self.counters]
+                    + [len('peak memory')])
+        for (name, seconds) in self.phases.items():
+            lines.append(f'{name:<{width}} {seconds:10.3f} s')
+        lines.append(f'{"total":<{width}} {self.total_seconds:10.3f} s')
+        for (name, number) in self.counters.items():
+            lines.append(f'{name:<{width}} {number:10}')
+        if self.memory:
+            lines.append(f'{"peak memory":<{width}} '
+                         f'{self.memory["peak_bytes"] / 1024 / 1024:10.1f} MiB')
+        for (message, number) in self.suppressed_messages.items():
+            lines.append(f'{number} more messages “{message}” suppressed')
+        return '\n'.join(lines)
+
+class RateLimitFilter(logging.Filter):
+    '''
+    A logging filter letting through only the first messages logged
+    with the same format string and counting the others.
+    '''
+    def __init__(self, limit: int) -> None:
+        '''
+        :param limit: How many messages of each format to let through
+        '''
+        super().__init__()
+        self.limit = limit
+        self._counts: Counter[Tuple[str, str]] = collections.Counter()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        key = (record.name, str(record.msg))
+        self._counts[key] += 1
+        return self._counts[key] <= self.limit
+
+    def suppressed(self) -> Dict[str, int]:
+        '''Return the number of messages suppressed by format string'''
+        return {message: count - self.limit
+                for ((_name, message), count) in self._counts.items()
+                if count > self.limit}
+
+def add_arguments(parser: Any) -> None:
+    '''
+    Add the options for session_from_args() to an argparse parser.
+
+    :param parser: The parser
+    '''
+    parser.add_argument('--profile',
+                        type=str,
+                        default='',
+                        help=('run with cProfile, write the profile to '
+                              'this file and print the phases and the '
+                              'most expensive functions'))
+    parser.add_argument('--stats-json',
+                        type=str,
+                        default='',
+                        help=('write the time of each phase and the '
+                              'counters to this file as JSON'))
+    parser.add_argument('--tracemalloc',
+                        action='store_true',
+                        help=('record the peak memory and the lines '
+                              'allocating the most memory'))
+    parser.add_argument('--log-limit',
+                        type=int,
+                        default=0,
+                        help=('log only this many messages of each kind, '
+                              'and how many more there were at the end, '
+                              'default is %(default)s (no limit)'))
+
+@contextlib.contextmanager
+def session(profile: str = '',
+            stats_json: str = '',
+            trace_memory: bool = False,
+            log_limit: int = 0) -> Iterator[Stats]:
+    '''
+    Collect measurements while the body runs and report them at the
+    end.
+
+    Call logging.basicConfig() before, the log limit is applied to the
+    handlers of the root logger.
+
+    :param profile: If not empty, run cProfile and write the profile
+                    to this file
+    :param stats_json: If not empty, write Stats.to_dict() to this file
+    :param trace_memory: If True, run tracemalloc
+    :param log_limit: If not 0, log only this many messages of each kind
+    '''
+    stats = Stats()
+    handlers = logging.getLogger().handlers
+    log_filter: Optional[RateLimitFilter] = None
+    if log_limit:
+        log_filter = RateLimitFilter(log_limit)
+        for handler in handlers:
+            handler.addFilter(log_filter)
+    profiler: Optional[cProfile.Profile] = None
+    if profile:
+        profiler = cProfile.Profile()
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    if profiler:
+        profiler.enable()
+    try:
+        yield stats
+    finally:
+        if profiler:
+            profiler.disable()
+        stats.total_seconds = time.perf_counter() - start
+        if trace_memory:
+            (current, peak) = tracemalloc.get_traced_memory()
+            top = tracemalloc.take_snapshot().statistics('lineno')[:10]
+            tracemalloc.stop()
+            stats.memory = {
+                'current_bytes': current,
+                'peak_bytes': peak,
+                'top': [{'line': str(statistic.traceback),
+                         'bytes': statistic.size,
+                         'blocks': statistic.count}
+                        for statistic in top],
+            }
+        if log_filter:
+            for handler in handlers:
+                handler.removeFilter(log_filter)
+            stats.suppressed_messages = log_filter.suppressed()
+        if profile or stats_json or trace_memory or log_limit:
+            LOGGER.info('Measurements:\n%s', stats.format())
+        if profiler:
+            profiler.dump_stats(profile)
+            output = io.StringIO()
+            pstats.Stats(profiler, stream=output).sort_stats(
+                'cumulative').print_stats(20)
+            LOGGER.info('Profile written to %s:\n%s',
+                        profile, output.getvalue())
+        if stats_json:
+            with open(stats_json, 'w', encoding='utf-8') as outputfile:
+                json.dump(stats.to_dict(), outputfile,
+                          ensure_ascii=False, indent=2)
+
+def session_from_args(args: Any) -> ContextManager[Stats]:
+    '''
+    Start a session with the options added by add_arguments().
+
+    :param args: The parsed command line arguments
+    '''
+    return session(profile=args.profile,
+                   stats_json=args.stats_json,
+                   trace_memory=args.tracemalloc,
+                   log_limit=args.log_limit)
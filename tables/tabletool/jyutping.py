@@ -0,0 +1,275 @@
+#
+# Copyright (c) 2026 Mike FABIAN <mfabian@redhat.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+'''
+Conversion between Jyutping and the Cantonese romanization used by
+cantonese.txt.
+
+The decoder is compiled once from the tables of initials and finals
+into a dictionary of all syllables, converting a syllable is a single
+lookup instead of a scan over all initials and finals.
+'''
+
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+class SyllableError(ValueError):
+    '''A syllable which is not valid in the source romanization'''
+    def __init__(self, syllable: str, direction: str) -> None:
+        super().__init__(f'Cannot convert {direction} syllable {syllable!r}')
+        self.syllable = syllable
+
+SPECIAL_SYLLABLES: Dict[str, str] = {
+    # jyutping => cantonese
+    'm': 'm',
+    'ng': 'ng',
+    'zou': 'jo', # for 做，早
+    'la': 'la', # for 喇
+}
+INITIALS: Dict[str, str] = {
+    # jyutping => cantonese
+    'b': 'b',
+    'p': 'p',
+    'm': 'm',
+    'f': 'f',
+    'd': 'd',
+    't': 't',
+    'n': 'n',
+    'l': 'l',
+    'g': 'g',
+    'k': 'k',
+    'ng': 'ng',
+    'h': 'h',
+    'gw': 'gw',
+    'kw': 'kw',
+    'w': 'w',
+    'z': 'j',
+    'c': 'ch',
+    's': 's',
+    'j': 'y',
+}
+
+FINALS: Dict[str, str] = {
+    # jyutping => cantonese
+    'aa': 'a',
+    'aai': 'aai',
+    'aau': 'aau',
+    'aam': 'aam',
+    'aan': 'aan',
+    'aang': 'aang',
+    'aap': 'aap',
+    'aat': 'aat',
+    'aak': 'aak',
+    'ai': 'ai',
+    'au': 'au',
+    'am': 'am',
+    'an': 'an', # special case: 燜 uses 'men'
+    'ang': 'ang',
+    'ap': 'ap',
+    'at': 'at',
+    'ak': 'ak',
+    'e': 'e',
+    'ei': 'ei',
+    'eu': 'eu', # no such pronuncation in original cantonese romanization
+    'em': 'em',
+    'en': 'en',
+    'eng': 'eng',
+    'ep': 'ep',
+    'et': 'et',
+    'ek': 'ek',
+    'i': 'i',
+    'iu': 'iu',
+    'im': 'im',
+    'in': 'in',
+    'ing': 'ing',
+    'ip': 'ip',
+    'it': 'it',
+    'ik': 'ik',
+    'o': 'oh',
+    'oi': 'oi',
+    'ou': 'ou',  # cantonese romanization also use 'o'
+    'om': 'yam', # 媕, om
+    'on': 'on',
+    'ong': 'ong',
+    'ot': 'ot',
+    'ok': 'ok',
+    'u': 'oo',
+    'ui': 'ooi',
+    'un': 'oon',
+    'ung': 'ung',
+    'ut': 'oot',
+    'uk': 'uk',
+    'oe': 'oe', # seems no corresponding romanization in cantonese
+    'eoi': 'ui',
+    'eon': 'un',
+    'oeng': 'eung',
+    'eot': 'ut',
+    'oet': 'ut', # 㖀, loet
+    'oek': 'euk',
+    'yu': 'ue',
+    'yun': 'uen',
+    'yut': 'uet',
+    'm': 'am',   # 噷, hm
+    'ng': 'ang', # 哼, hng
+}
+
+def _decode(syllable: str,
+            initials: Dict[str, str],
+            finals: Dict[str, str],
+            special: Dict[str, str]) -> Optional[str]:
+    # The rule of the old convert_jp_to_cantonese() from
+    # improve_jyutping.py: special cases first, then a syllable which
+    # is just an initial, otherwise the longest initial followed by a
+    # final.
+    if syllable in special:
+        return special[syllable]
+    if syllable in initials:
+        return initials[syllable]
+    initial = max((key for key in initials if syllable.startswith(key)),
+                  key=len, default='')
+    final = syllable[len(initial):]
+    if final not in finals:
+        return None
+    return initials.get(initial, '') + finals[final]
+
+class JyutpingConverter:
+    '''
+    Converts syllables between Jyutping and the Cantonese romanization.
+
+    Both directions are precomputed when the converter is created.
+    The reverse direction is ambiguous, several Jyutping syllables
+    may have the same Cantonese spelling.
+    '''
+    def __init__(self,
+                 initials: Optional[Dict[str, str]] = None,
+                 finals: Optional[Dict[str, str]] = None,
+                 special: Optional[Dict[str, str]] = None) -> None:
+        '''
+        :param initials: Jyutping initials mapped to Cantonese,
+                         default is INITIALS
+        :param finals: Jyutping finals mapped to Cantonese,
+                       default is FINALS
+        :param special: Jyutping syllables not following the rules,
+                        default is SPECIAL_SYLLABLES
+        '''
+        if initials is None:
+            initials = INITIALS
+        if finals is None:
+            finals = FINALS
+        if special is None:
+            special = SPECIAL_SYLLABLES
+        candidates = set(special) | set(initials)
+        for initial in [''] + list(initials):
+            for final in finals:
+                candidates.add(initial + final)
+        self._to_cantonese: Dict[str, str] = {'': ''}
+        for syllable in sorted(candidates):
+            cantonese = _decode(syllable, initials, finals, special)
+            if cantonese is not None:
+                self._to_cantonese[syllable] = cantonese
+        to_jyutping: Dict[str, List[str]] = {}
+        for (syllable, cantonese) in self._to_cantonese.items():
+            to_jyutping.setdefault(cantonese, []).append(syllable)
+        self._to_jyutping: Dict[str, Tuple[str, ...]] = {
+            cantonese: tuple(syllables)
+            for (cantonese, syllables) in to_jyutping.items()}
+
+    def __len__(self) -> int:
+        return len(self._to_cantonese)
+
+    def to_cantonese(self, syllable: str) -> str:
+        '''
+        Convert a toneless Jyutping syllable to Cantonese.
+
+        Raises SyllableError if the syllable is not valid Jyutping.
+
+        :param syllable: The Jyutping syllable without the tone digit
+        '''
+        try:
+            return self._to_cantonese[syllable]
+        except KeyError:
+            raise SyllableError(syllable, 'Jyutping') from None
+
+    def to_cantonese_many(self, syllables: Iterable[str]) -> List[str]:
+        '''
+        Convert a whole column of toneless Jyutping syllables to Cantonese.
+
+        Raises SyllableError for the first syllable which is not valid
+        Jyutping.
+
+        :param syllables: The Jyutping syllables without the tone digits
+        '''
+        to_cantonese = self._to_cantonese
+        try:
+            return [to_cantonese[syllable] for syllable in syllables]
+        except KeyError as error:
+            raise SyllableError(error.args[0], 'Jyutping') from None
+
+    def to_jyutping(self, syllable: str) -> Tuple[str, ...]:
+        '''
+        Return all Jyutping syllables with this Cantonese spelling,
+        sorted.
+
+        Raises SyllableError if there are none.
+
+        :param syllable: The syllable in Cantonese romanization
+        '''
+        try:
+            return self._to_jyutping[syllable]
+        except KeyError:
+            raise SyllableError(syllable, 'Cantonese') from None
+
+    def to_jyutping_many(
+            self, syllables: Iterable[str]) -> List[Tuple[str, ...]]:
+        '''
+        Convert a whole column of Cantonese syllables to Jyutping,
+        see to_jyutping().
+
+        :param syllables: The syllables in Cantonese romanization
+        '''
+        to_jyutping = self._to_jyutping
+        try:
+            return [to_jyutping[syllable] for syllable in syllables]
+        except KeyError as error:
+            raise SyllableError(error.args[0], 'Cantonese') from None
+
+_CONVERTER: Optional[JyutpingConverter] = None
+
+def _converter() -> JyutpingConverter:
+    global _CONVERTER # pylint: disable=global-statement
+    if _CONVERTER is None:
+        _CONVERTER = JyutpingConverter()
+    return _CONVERTER
+
+def jyutping_to_cantonese(syllable: str) -> str:
+    '''
+    Convert a toneless Jyutping syllable to Cantonese with the
+    default tables, see JyutpingConverter.to_cantonese().
+
+    :param syllable: The Jyutping syllable without the tone digit
+    '''
+    return _converter().to_cantonese(syllable)
+
+def cantonese_to_jyutping(syllable: str) -> Tuple[str, ...]:
+    '''
+    Return all Jyutping syllables with this Cantonese spelling with
+    the default tables, see JyutpingConverter.to_jyutping().
+
+    :param syllable: The syllable in Cantonese romanization
+    '''
+    return _converter().to_jyutping(syllable)
@@ -0,0 +1,115 @@
+#
+# Copyright (c) 2026 Mike FABIAN <mfabian@redhat.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+'''
+Look up candidates by code in a table sorted by code.
+
+The rows are kept in parallel arrays sorted by code, all rows whose
+code starts with a prefix are a contiguous range found with two
+binary searches.
+'''
+
+from typing import List
+from typing import Sequence
+from typing import Tuple
+import array
+import bisect
+import heapq
+
+from .columns import ColumnTable
+
+# Sorts after every character which can occur in a code:
+_AFTER_ALL = chr(0x10FFFF)
+
+class PrefixIndex:
+    '''
+    Rows sorted by code, for lookups of exact codes and of prefixes.
+    '''
+    def __init__(self,
+                 codes: Sequence[str],
+                 phrases: Sequence[str],
+                 weights: Sequence[int]) -> None:
+        '''
+        The rows are given as parallel sequences in any order.
+
+        :param codes: The codes of the rows
+        :param phrases: The phrases of the rows
+        :param weights: The weights of the rows
+        '''
+        order = sorted(range(len(codes)), key=codes.__getitem__)
+        self.codes: Sequence[str] = [codes[i] for i in order]
+        self.phrases: Sequence[str] = [phrases[i] for i in order]
+        self.weights: Sequence[int] = array.array(
+            'q', [weights[i] for i in order])
+
+    @classmethod
+    def from_table(cls, table: ColumnTable) -> 'PrefixIndex':
+        '''
+        Create the index for a table.
+
+        :param table: The table
+        '''
+        return cls(table.codes, table.phrases, table.weights)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def exact_range(self, code: str) -> Tuple[int, int]:
+        '''
+        Return the range of the rows with exactly this code.
+
+        :param code: The code to look up
+        '''
+        return (bisect.bisect_left(self.codes, code),
+                bisect.bisect_right(self.codes, code))
+
+    def prefix_range(self, prefix: str) -> Tuple[int, int]:
+        '''
+        Return the range of the rows whose code starts with prefix.
+
+        :param prefix: The prefix to look up
+        '''
+        return (bisect.bisect_left(self.codes, prefix),
+                bisect.bisect_left(self.codes, prefix + _AFTER_ALL))
+
+    def candidates(self,
+                   code: str,
+                   prefix: bool = True,
+                   limit: int = 0) -> List[Tuple[str, str, int]]:
+        '''
+        Return the candidates for a code as tuples
+        (code, phrase, weight), ordered like ibus-table shows them:
+        shorter codes first, then by descending weight.
+
+        :param code: The code typed so far
+        :param prefix: If True, return the rows whose code starts with
+                       code, else only the rows with exactly this code
+        :param limit: If not 0, return only this many of the first
+                      candidates
+        '''
+        if prefix:
+            (start, end) = self.prefix_range(code)
+        else:
+            (start, end) = self.exact_range(code)
+        codes = self.codes
+        weights = self.weights
+        phrases = self.phrases
+        def key(i: int) -> Tuple[int, int, int]:
+            return (len(codes[i]), -weights[i], i)
+        if limit:
+            rows = heapq.nsmallest(limit, range(start, end), key=key)
+        else:
+            rows = sorted(range(start, end), key=key)
+        return [(codes[i], phrases[i], weights[i]) for i in rows]
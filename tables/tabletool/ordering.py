@@ -0,0 +1,135 @@
+#
+# Copyright (c) 2026 Mike FABIAN <mfabian@redhat.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+'''
+Sort keys ordering phrases like an encoding orders them.
+
+Rows with the same code and weight are shown by ibus-table in the
+order of the table source. To make that order independent of how a
+script happened to collect the rows, the rows can be sorted by a
+tie-break policy:
+
+    “none”     keep the order of the input
+    “unicode”  order of the code points
+    “big5”     order of the Big5 codes, for tables used in Taiwan
+               and Hong Kong
+    “gb18030”  order of the GB18030 codes, for tables used in the
+               mainland
+
+Characters which cannot be encoded sort after all which can, in
+code point order.
+
+The key of a character is computed only once and kept in an array
+indexed by the code point. The key of a phrase is a single integer
+made from the keys of its characters, so sorting compares only
+integers.
+'''
+
+from typing import Dict
+from typing import Iterable
+from typing import List
+import array
+
+TIE_BREAKS = ('none', 'unicode', 'big5', 'gb18030')
+
+# Number of bits for the key of one character in the key of a phrase:
+_BITS = 40
+
+# Added to the code point of characters which cannot be encoded:
+_NOT_ENCODABLE = 1 << 32
+
+class EncodingOrder:
+    '''
+    Sort keys for the characters of one encoding.
+    '''
+    def __init__(self, encoding: str) -> None:
+        '''
+        :param encoding: “unicode” or the name of a Python codec like
+                         “big5” or “gb18030”
+        '''
+        self.encoding = encoding
+        # Key + 1 of each character, 0 if not computed yet:
+        self._keys = array.array('q')
+        if encoding != 'unicode':
+            self._keys = array.array('q', bytes(8 * (0x10FFFF + 1)))
+
+    def char_key(self, char: str) -> int:
+        '''
+        Return the sort key of a character, always greater than 0.
+
+        :param char: The character
+        '''
+        code_point = ord(char)
+        if self.encoding == 'unicode':
+            return code_point + 1
+        key = self._keys[code_point]
+        if key:
+            return key
+        try:
+            # Padded to 4 bytes, so that 2 byte and 4 byte codes
+            # compare like the bytes do:
+            key = int.from_bytes(
+                char.encode(self.encoding).ljust(4, b'\0'), 'big') + 1
+        except UnicodeEncodeError:
+            key = _NOT_ENCODABLE + code_point + 1
+        self._keys[code_point] = key
+        return key
+
+    def phrase_keys(self, phrases: Iterable[str]) -> List[int]:
+        '''
+        Return the sort keys of phrases.
+
+        A phrase sorts like the sequence of the keys of its characters,
+        a phrase sorts before the longer phrases it is the beginning of.
+
+        :param phrases: The phrases
+        '''
+        phrases = list(phrases)
+        if all(len(phrase) == 1 for phrase in phrases):
+            if self.encoding == 'unicode':
+                return list(map(ord, phrases))
+            return list(map(self.char_key, phrases))
+        max_length = max(len(phrase) for phrase in phrases)
+        char_key = self.char_key
+        keys: List[int] = []
+        for phrase in phrases:
+            key = 0
+            for char in phrase:
+                key = (key << _BITS) | char_key(char)
+            keys.append(key << (_BITS * (max_length - len(phrase))))
+        return keys
+
+_ORDERS: Dict[str, EncodingOrder] = {}
+
+def encoding_order(encoding: str) -> EncodingOrder:
+    '''
+    Return the EncodingOrder for an encoding, creating it only once.
+
+    :param encoding: See EncodingOrder
+    '''
+    if encoding not in _ORDERS:
+        _ORDERS[encoding] = EncodingOrder(encoding)
+    return _ORDERS[encoding]
+
+def tie_break_keys(phrases: Iterable[str], tie_break: str) -> List[int]:
+    '''
+    Return the keys to sort phrases by for a tie-break policy.
+
+    :param phrases: The phrases
+    :param tie_break: One of TIE_BREAKS except “none”
+    '''
+    if tie_break not in TIE_BREAKS or tie_break == 'none':
+        raise ValueError(f'invalid tie-break policy {tie_break!r}')
+    return encoding_order(tie_break).phrase_keys(phrases)
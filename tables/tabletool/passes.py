@@ -0,0 +1,251 @@
+#
+# Copyright (c) 2026 Mike FABIAN <mfabian@redhat.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+'''
+Passes rewriting the rows of a table.
+'''
+
+from typing import Callable
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import NamedTuple
+from typing import Tuple
+import logging
+import time
+
+from .columns import ColumnTable
+from .compatibility import CJK_COMPATIBILITY_IDEOGRAPH_PATTERN
+from .compatibility import replace_compatibility_ideographs
+
+LOGGER = logging.getLogger(__name__)
+
+def prefix_removed_predicate(
+        valid_input_chars: str,
+        max_key_length: int) -> Callable[[str, str], bool]:
+    '''
+    Return a predicate for demote_redundant_codes() which considers a
+    code redundant if it is the x-code without the leading x, or that
+    plus one more valid input character.
+
+    This is what improve_cangjie5.py uses, see
+    https://github.com/mike-fabian/ibus-table/issues/76
+
+    :param valid_input_chars: The characters which may be appended
+    :param max_key_length: Nothing is appended if the code without
+                           the x already has this length
+    '''
+    def is_redundant(x_code: str, code: str) -> bool:
+        short_code = x_code[1:]
+        if code == short_code:
+            return True
+        return (len(short_code) < max_key_length
+                and len(code) == len(x_code)
+                and code.startswith(short_code)
+                and code[-1] in valid_input_chars)
+    return is_redundant
+
+def short_code_predicate(
+        valid_input_chars: str,
+        max_length: int = 2) -> Callable[[str, str], bool]:
+    '''
+    Return a predicate for demote_redundant_codes() which considers
+    every code redundant which is not longer than max_length and
+    consists only of the valid input characters.
+
+    This is what improve_quick5.py uses, see
+    https://github.com/mike-fabian/ibus-table-chinese/issues/4
+
+    :param valid_input_chars: The characters a redundant code may use,
+                              usually all input characters except x
+    :param max_length: The maximum length of a redundant code
+    '''
+    valid = frozenset(valid_input_chars)
+    def is_redundant(_x_code: str, code: str) -> bool:
+        return len(code) <= max_length and valid.issuperset(code)
+    return is_redundant
+
+def demote_redundant_codes(table: ColumnTable,
+                           is_redundant: Callable[[str, str], bool],
+                           prefix: str = 'x',
+                           weight: int = 900) -> int:
+    '''
+    For every row whose code starts with prefix, set the weight of
+    all rows with the same phrase and a code for which
+    is_redundant(x_code, code) is true to weight.
+
+    Builds an index from phrase to rows once, only for the phrases
+    which have codes starting with prefix, so the cost depends on
+    the number of such rows and not on the size of the alphabet.
+
+    Returns the number of rows whose weight changed.
+
+    :param table: The table, changed in place
+    :param is_redundant: Predicate called with the code starting
+                         with prefix and another code of the same phrase
+    :param prefix: The prefix of the codes making other codes redundant
+    :param weight: The new weight of the redundant rows
+    '''
+    codes = table.codes
+    phrases = table.phrases
+    weights = table.weights
+    x_rows = [i for (i, code) in enumerate(codes) if code.startswith(prefix)]
+    index: Dict[str, List[int]] = {phrases[i]: [] for i in x_rows}
+    for (i, phrase) in enumerate(phrases):
+        if phrase in index:
+            index[phrase].append(i)
+    changed = 0
+    for x_row in x_rows:
+        x_code = codes[x_row]
+        for i in index[phrases[x_row]]:
+            if is_redundant(x_code, codes[i]):
+                if weights[i] != weight:
+                    changed += 1
+                weights[i] = weight
+    LOGGER.info('%s rows with prefix %r, %s rows demoted to %s',
+                len(x_rows), prefix, changed, weight)
+    return changed
+
+def merge_duplicates(table: ColumnTable, keep_max_weight: bool = True) -> int:
+    '''
+    Merge rows with the same code and phrase into the first one.
+
+    Returns the number of rows removed.
+
+    :param table: The table, changed in place
+    :param keep_max_weight: If True, the merged row gets the highest
+                            weight and keeps the first comment (like
+                            improve_quick5.py). If False, the last
+                            duplicate wins (like a dict update).
+    '''
+    first: Dict[Tuple[str, str], int] = {}
+    keep = [True] * len(table)
+    weights = table.weights
+    comments = table.comments
+    for (i, key) in enumerate(zip(table.codes, table.phrases)):
+        if key not in first:
+            first[key] = i
+            continue
+        j = first[key]
+        keep[i] = False
+        LOGGER.warning('duplicate %s %s first weight=%s second weight=%s',
+                       key[0], key[1], weights[j], weights[i])
+        if keep_max_weight:
+            weights[j] = max(weights[i], weights[j])
+        else:
+            weights[j] = weights[i]
+            comments[j] = comments[i]
+    if all(keep):
+        return 0
+    return table.keep(keep)
+
+def drop_cjk_compatibility_ideographs(table: ColumnTable) -> int:
+    '''
+    Remove all rows whose phrase contains a CJK COMPATIBILITY IDEOGRAPH,
+    like remove_cjk_compatibility_ideographs.py does.
+
+    Returns the number of rows removed.
+
+    :param table: The table, changed in place
+    '''
+    search = CJK_COMPATIBILITY_IDEOGRAPH_PATTERN.search
+    keep = [search(phrase) is None for phrase in table.phrases]
+    if all(keep):
+        return 0
+    return table.keep(keep)
+
+def replace_cjk_compatibility_ideographs(table: ColumnTable) -> int:
+    '''
+    Replace the CJK COMPATIBILITY IDEOGRAPHs in the phrases by their
+    canonical decompositions.
+
+    This may create duplicates, run merge_duplicates() afterwards.
+    Returns the number of rows changed.
+
+    :param table: The table, changed in place
+    '''
+    search = CJK_COMPATIBILITY_IDEOGRAPH_PATTERN.search
+    phrases = table.phrases
+    changed = 0
+    for (i, phrase) in enumerate(phrases):
+        if search(phrase) is not None:
+            replaced = replace_compatibility_ideographs(phrase)
+            if replaced != phrase:
+                phrases[i] = replaced
+                changed += 1
+    return changed
+
+def _input_letters(table: ColumnTable) -> str:
+    # Only the letters from VALID_INPUT_CHARS, the punctuation keys
+    # are not used to type Chinese characters.
+    valid_input_chars = table.definitions.get(
+        'VALID_INPUT_CHARS', 'abcdefghijklmnopqrstuvwxyz')
+    return ''.join(char for char in valid_input_chars if char.isalpha())
+
+def _demote_x(table: ColumnTable) -> int:
+    return demote_redundant_codes(
+        table,
+        prefix_removed_predicate(
+            _input_letters(table),
+            int(table.definitions.get('MAX_KEY_LENGTH', '5'))))
+
+def _demote_x_short(table: ColumnTable) -> int:
+    return demote_redundant_codes(
+        table,
+        short_code_predicate(_input_letters(table).replace('x', ''), 2))
+
+# The passes which can be used by name in a pipeline. Each one takes
+# a ColumnTable, changes it in place and returns the number of rows
+# changed, added or removed.
+PASSES: Dict[str, Callable[[ColumnTable], int]] = {
+    # The rule of improve_cangjie5.py:
+    'demote-x': _demote_x,
+    # The rule of improve_quick5.py:
+    'demote-x-short': _demote_x_short,
+    'drop-compat': drop_cjk_compatibility_ideographs,
+    'replace-compat': replace_cjk_compatibility_ideographs,
+    'merge-dupes': merge_duplicates,
+}
+
+class PassResult(NamedTuple):
+    '''Statistics about one pass run by run_passes()'''
+    name: str
+    seconds: float
+    rows_changed: int
+    rows_after: int
+
+def run_passes(table: ColumnTable, names: Iterable[str]) -> List[PassResult]:
+    '''
+    Run passes over a table one after the other.
+
+    Returns timing and the number of rows changed for each pass.
+
+    :param table: The table, changed in place
+    :param names: The names of the passes, see PASSES
+    '''
+    names = list(names)
+    unknown = [name for name in names if name not in PASSES]
+    if unknown:
+        raise ValueError(f'unknown passes: {", ".join(unknown)}')
+    results: List[PassResult] = []
+    for name in names:
+        start = time.perf_counter()
+        rows_changed = PASSES[name](table)
+        result = PassResult(name, time.perf_counter() - start,
+                            rows_changed, len(table))
+        LOGGER.info('%s: %.3f s, %s rows changed, %s rows',
+                    *result)
+        results.append(result)
+    return results
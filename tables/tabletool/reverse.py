@@ -0,0 +1,324 @@
+#
+# Copyright (c) 2026 Mike FABIAN <mfabian@redhat.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+'''
+Reverse index from characters to their codes in all tables.
+
+To answer “how is this character typed?”, for example for
+PINYIN_MODE or code hints, each table would have to be scanned. The
+reverse index is built once from all table sources:
+
+    python3 -m tabletool reverse-index -o codes.ibtr
+    python3 -m tabletool codes -i codes.ibtr 電腦
+
+Only rows whose phrase is a single character are indexed. The file
+is mapped with mmap like a compiled table. All numbers are little
+endian. The file starts with a header:
+
+    magic “IBTR”, version (uint32), number of entries (uint32),
+    padding, then offset and length (uint64 each) of each section in
+    SECTIONS
+
+The entries are sorted by character, then by table, then by
+descending weight. “offsets” has one entry per code point up to the
+biggest one indexed plus one, the entries of a character are those
+from offsets[ord(char)] to offsets[ord(char) + 1].
+'''
+
+from typing import Any
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import NamedTuple
+from typing import Sequence
+from typing import Tuple
+from typing import Union
+import array
+import logging
+import mmap
+import os
+import random
+import struct
+import sys
+import time
+
+from .columns import ColumnTable
+from .compiled import _StringSequence
+from .compiled import _blob
+from .compiled import _little_endian
+
+LOGGER = logging.getLogger(__name__)
+
+MAGIC = b'IBTR'
+VERSION = 1
+
+SECTIONS = (
+    # The names of the tables, one per line:
+    'tables',
+    'offsets',
+    'entry_tables',
+    'code_offsets', 'codes',
+    'weights',
+)
+
+_HEADER = struct.Struct('<4sIII' + 'QQ' * len(SECTIONS))
+
+class CodeEntry(NamedTuple):
+    '''A code of a character in one table'''
+    table: str
+    code: str
+    weight: int
+
+def read_tables(filenames: Iterable[str],
+                sourcedir: str) -> Dict[str, ColumnTable]:
+    '''
+    Read table sources, by their names relative to the tables
+    directory.
+
+    :param filenames: The table sources
+    :param sourcedir: The top source directory, the names of the
+                      tables are relative to its “tables” directory
+    '''
+    tables: Dict[str, ColumnTable] = {}
+    for filename in filenames:
+        name = os.path.relpath(os.path.abspath(filename),
+                               os.path.join(os.path.abspath(sourcedir),
+                                            'tables'))
+        with open(filename, 'r', encoding='utf-8') as inputfile:
+            # Sources without a head, like the array30 sources, start
+            # with a row:
+            headless = '\t' in inputfile.readline()
+        tables[name] = ColumnTable.read(filename,
+                                        headless=headless,
+                                        all_sections=True,
+                                        strict=False)
+    return tables
+
+def _entry_key(entry: Tuple[str, int, str, int]) -> Tuple[str, int, int, str]:
+    (char, table, code, weight) = entry
+    return (char, table, -weight, code)
+
+def scan_codes(tables: Dict[str, ColumnTable], char: str) -> List[CodeEntry]:
+    '''
+    Find the codes of a character by scanning all tables, the
+    reference for ReverseIndex.lookup().
+
+    :param tables: The tables, by name
+    :param char: The character
+    '''
+    entries: List[Tuple[str, int, str, int]] = []
+    for (number, table) in enumerate(tables.values()):
+        for (code, phrase, weight) in zip(
+                table.codes, table.phrases, table.weights):
+            if phrase == char:
+                entries.append((char, number, code, weight))
+    entries.sort(key=_entry_key)
+    names = list(tables)
+    return [CodeEntry(names[table], code, weight)
+            for (_char, table, code, weight) in entries]
+
+def write_reverse_index(outputfilename: str,
+                        tables: Dict[str, ColumnTable]) -> int:
+    '''
+    Write the reverse index of tables.
+
+    Returns the number of entries written.
+
+    :param outputfilename: The file to write
+    :param tables: The tables, by name
+    '''
+    entries: List[Tuple[str, int, str, int]] = []
+    for (number, table) in enumerate(tables.values()):
+        for (code, phrase, weight) in zip(
+                table.codes, table.phrases, table.weights):
+            if len(phrase) == 1:
+                entries.append((phrase, number, code, weight))
+    entries.sort(key=_entry_key)
+    max_code_point = ord(entries[-1][0]) if entries else -1
+    # Count the entries of each character, then sum up:
+    offsets = array.array('I', bytes(4 * (max_code_point + 2)))
+    for entry in entries:
+        offsets[ord(entry[0]) + 1] += 1
+    for code_point in range(1, len(offsets)):
+        offsets[code_point] += offsets[code_point - 1]
+    sections = (
+        [''.join(f'{name}\n' for name in tables).encode('utf-8'),
+         _little_endian(offsets),
+         _little_endian(array.array('H', [entry[1] for entry in entries]))]
+        + _blob([entry[2] for entry in entries])
+        + [_little_endian(array.array('q', [entry[3] for entry in entries]))])
+    locations: List[int] = []
+    position = _HEADER.size
+    for section in sections:
+        position += -position % 8
+        locations += [position, len(section)]
+        position += len(section)
+    with open(outputfilename, 'wb') as outputfile:
+        outputfile.write(_HEADER.pack(MAGIC, VERSION, len(entries), 0,
+                                      *locations))
+        for (section, offset) in zip(sections, locations[::2]):
+            outputfile.write(b'\0' * (offset - outputfile.tell()))
+            outputfile.write(section)
+    LOGGER.info('%s entries of %s tables written to %s',
+                len(entries), len(tables), outputfilename)
+    return len(entries)
+
+class ReverseIndex:
+    '''
+    A reverse index, mapped into memory.
+
+        with ReverseIndex('codes.ibtr') as index:
+            for entry in index.lookup('電'):
+                print(entry.table, entry.code)
+    '''
+    def __init__(self, inputfilename: str) -> None:
+        '''
+        :param inputfilename: The reverse index to open
+        '''
+        self.filename = inputfilename
+        with open(inputfilename, 'rb') as inputfile:
+            self._mmap = mmap.mmap(inputfile.fileno(), 0,
+                                   access=mmap.ACCESS_READ)
+        header = _HEADER.unpack_from(self._mmap)
+        (magic, version, self._count) = header[:3]
+        if magic != MAGIC or version != VERSION:
+            self._mmap.close()
+            raise ValueError(
+                f'{inputfilename} is not a reverse index of version '
+                f'{VERSION}')
+        self._views: List[memoryview] = []
+        self._sections: Dict[str, memoryview] = {}
+        for (number, name) in enumerate(SECTIONS):
+            (offset, length) = header[4 + 2 * number:6 + 2 * number]
+            view = memoryview(self._mmap)[offset:offset + length]
+            self._views.append(view)
+            self._sections[name] = view
+        self.tables: List[str] = str(
+            self._sections['tables'], 'utf-8').splitlines()
+        self._offsets = self._numbers('offsets', 'I')
+        self._entry_tables = self._numbers('entry_tables', 'H')
+        self._codes = _StringSequence(
+            self._numbers('code_offsets', 'I'), self._sections['codes'])
+        self._weights = self._numbers('weights', 'q')
+
+    def _numbers(self, section: str,
+                 typecode: str) -> Union[memoryview, array.array]: # type: ignore
+        view = self._sections[section].cast(typecode)
+        if sys.byteorder == 'big':
+            numbers = array.array(typecode, view)
+            numbers.byteswap()
+            return numbers
+        self._views.append(view)
+        return view
+
+    def __len__(self) -> int:
+        return self._count
+
+    def lookup(self, char: str) -> List[CodeEntry]:
+        '''
+        Return the codes of a character in all tables, by table and
+        then by descending weight.
+
+        :param char: The character
+        '''
+        code_point = ord(char)
+        if code_point + 1 >= len(self._offsets):
+            return []
+        tables = self.tables
+        entry_tables = self._entry_tables
+        codes = self._codes
+        weights = self._weights
+        return [CodeEntry(tables[entry_tables[i]], codes[i], weights[i])
+                for i in range(self._offsets[code_point],
+                               self._offsets[code_point + 1])]
+
+    def lookup_text(self, text: str) -> List[Tuple[str, List[CodeEntry]]]:
+        '''
+        Return the codes of each character of a text.
+
+        :param text: The text
+        '''
+        return [(char, self.lookup(char)) for char in text]
+
+    def __enter__(self) -> 'ReverseIndex':
+        return self
+
+    def __exit__(self, *_args: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        '''Unmap the file'''
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self._mmap.close()
+
+def benchmark(index: ReverseIndex,
+              tables: Dict[str, ColumnTable],
+              chars: Sequence[str]) -> Dict[str, Any]:
+    '''
+    Time ReverseIndex.lookup() against scan_codes() and check that
+    both find the same codes.
+
+    :param index: The index
+    :param tables: The tables the index was built from, by name
+    :param chars: The characters to look up
+    '''
+    index_seconds: List[float] = []
+    scan_seconds: List[float] = []
+    for char in chars:
+        start = time.perf_counter()
+        entries = index.lookup(char)
+        index_seconds.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        expected = scan_codes(tables, char)
+        scan_seconds.append(time.perf_counter() - start)
+        if entries != expected:
+            raise AssertionError(
+                f'{char!r}: {len(entries)} codes found with the index, '
+                f'{len(expected)} with a scan')
+    index_seconds.sort()
+    scan_seconds.sort()
+    middle = len(chars) // 2
+    return {
+        'lookups': len(chars),
+        'index_us': {
+            'p50': round(index_seconds[middle] * 1e6, 1) if chars else 0.0,
+            'max': round(index_seconds[-1] * 1e6, 1) if chars else 0.0,
+        },
+        'scan_us': {
+            'p50': round(scan_seconds[middle] * 1e6, 1) if chars else 0.0,
+            'max': round(scan_seconds[-1] * 1e6, 1) if chars else 0.0,
+        },
+    }
+
+def random_chars(tables: Dict[str, ColumnTable],
+                 number: int,
+                 seed: int = 0) -> List[str]:
+    '''
+    Pick characters from the tables to benchmark with.
+
+    :param tables: The tables, by name
+    :param number: How many characters to pick
+    :param seed: The seed of the random numbers
+    '''
+    chars = sorted({phrase
+                    for table in tables.values()
+                    for phrase in table.phrases
+                    if len(phrase) == 1})
+    if not chars:
+        return []
+    generator = random.Random(seed)
+    return [generator.choice(chars) for _number in range(number)]
@@ -0,0 +1,230 @@
+#
+# Copyright (c) 2026 Mike FABIAN <mfabian@redhat.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+'''
+Replay typing on a table offline and measure the candidate lookups.
+
+The input is replayed key by key, after each key the candidates for
+the keys typed so far are fetched from a PrefixIndex, like an input
+method would do it. For every lookup the time and the number of
+candidates are recorded.
+
+Tables with “AUTO_WILDCARD = TRUE” show all rows whose code starts
+with the keys typed, other tables only the rows with exactly that
+code. For tables with “AUTO_SPLIT = TRUE”, a key for which there
+are no candidates starts a new code.
+'''
+
+from typing import Any
+from typing import Dict
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Union
+import heapq
+import math
+import time
+
+from .columns import ColumnTable
+from .compiled import CompiledTable
+from .lookup import PrefixIndex
+
+# Tables can be replayed on in memory or compiled:
+AnyTable = Union[ColumnTable, CompiledTable]
+
+def percentile(values: List[int], fraction: float) -> int:
+    '''
+    Return the value below which the given fraction of the values
+    lies, using the nearest rank method.
+
+    :param values: The values, sorted ascending
+    :param fraction: Between 0 and 1
+    '''
+    if not values:
+        return 0
+    rank = max(1, math.ceil(fraction * len(values)))
+    return values[min(rank, len(values)) - 1]
+
+def codes_from_text(table: AnyTable,
+                    lines: Iterable[str]) -> Iterator[str]:
+    '''
+    Convert text to the codes which would be typed to enter it.
+
+    The longest phrase of the table matching at each position is
+    used, with its code of the highest weight. Characters not in the
+    table are skipped.
+
+    :param table: The table
+    :param lines: The text
+    '''
+    best: Dict[str, str] = {}
+    best_weight: Dict[str, int] = {}
+    for (code, phrase, weight) in zip(
+            table.codes, table.phrases, table.weights):
+        if (phrase not in best
+                or weight > best_weight[phrase]
+                or (weight == best_weight[phrase]
+                    and len(code) < len(best[phrase]))):
+            best[phrase] = code
+            best_weight[phrase] = weight
+    max_length = min(8, max((len(phrase) for phrase in best), default=1))
+    for line in lines:
+        position = 0
+        while position < len(line):
+            for length in range(max_length, 0, -1):
+                phrase = line[position:position + length]
+                if phrase in best:
+                    yield best[phrase]
+                    position += length
+                    break
+            else:
+                position += 1
+
+class Simulation:
+    '''
+    Replays keys on a table and collects the measurements.
+    '''
+    def __init__(self,
+                 table: AnyTable,
+                 match: str = 'auto',
+                 limit: int = 0) -> None:
+        '''
+        :param table: The table
+        :param match: “prefix”, “exact” or “auto” to use the setting of
+                      AUTO_WILDCARD from the table
+        :param limit: If not 0, fetch only this many of the best
+                      candidates, like an input method filling the
+                      first pages of the lookup table. The number of
+                      candidates is still counted completely.
+        '''
+        self.limit = limit
+        definitions = table.definitions
+        if match == 'auto':
+            match = ('prefix'
+                     if definitions.get('AUTO_WILDCARD', '').upper() == 'TRUE'
+                     else 'exact')
+        self.prefix = match == 'prefix'
+        self.auto_split = (
+            definitions.get('AUTO_SPLIT', '').upper() == 'TRUE')
+        # A compiled table is already sorted by code:
+        self.index = (table if isinstance(table, PrefixIndex)
+                      else PrefixIndex.from_table(table))
+        self.latencies_ns: List[int] = []
+        self.sizes: List[int] = []
+        # The size of the candidate list of each code looked up:
+        self._worst: Dict[str, int] = {}
+
+    def lookup(self, code: str) -> int:
+        '''
+        Fetch the candidates for a code and record the measurements.
+
+        Returns the number of candidates.
+
+        :param code: The keys typed so far
+        '''
+        start = time.perf_counter_ns()
+        self.index.candidates(code, prefix=self.prefix, limit=self.limit)
+        self.latencies_ns.append(time.perf_counter_ns() - start)
+        if self.prefix:
+            (first, last) = self.index.prefix_range(code)
+        else:
+            (first, last) = self.index.exact_range(code)
+        size = last - first
+        self.sizes.append(size)
+        if size > self._worst.get(code, -1):
+            self._worst[code] = size
+        return size
+
+    def lookup_prefixes(self, codes: Iterable[str]) -> None:
+        '''
+        Look up every distinct prefix of the codes once.
+
+        :param codes: The codes
+        '''
+        prefixes = set()
+        for code in codes:
+            for length in range(1, len(code) + 1):
+                prefixes.add(code[:length])
+        for prefix in sorted(prefixes):
+            self.lookup(prefix)
+
+    def replay(self, sequences: Iterable[str]) -> None:
+        '''
+        Replay key sequences, each one typed from an empty input.
+
+        :param sequences: The key sequences, usually one code each
+        '''
+        for sequence in sequences:
+            typed = ''
+            for key in sequence:
+                typed += key
+                if (not self.lookup(typed)
+                        and self.auto_split and len(typed) > 1):
+                    typed = key
+                    self.lookup(typed)
+
+    def report(self, worst: int = 10) -> Dict[str, Any]:
+        '''
+        Return the measurements as a dictionary.
+
+        :param worst: How many of the codes with the most candidates
+                      to list
+        '''
+        latencies = sorted(self.latencies_ns)
+        sizes = sorted(self.sizes)
+        return {
+            'rows': len(self.index),
+            'match': 'prefix' if self.prefix else 'exact',
+            'auto_split': self.auto_split,
+            'lookups': len(latencies),
+            'latency_us': {
+                'p50': percentile(latencies, 0.5) / 1000,
+                'p99': percentile(latencies, 0.99) / 1000,
+                'max': (latencies[-1] if latencies else 0) / 1000,
+            },
+            'candidates': {
+                'p50': percentile(sizes, 0.5),
+                'p99': percentile(sizes, 0.99),
+                'max': sizes[-1] if sizes else 0,
+            },
+            'worst_codes': [
+                {'code': code, 'candidates': size}
+                for (code, size) in heapq.nlargest(
+                    worst, self._worst.items(), key=lambda item: item[1])],
+        }
+
+def simulate(table: AnyTable,
+             sequences: Optional[Iterable[str]] = None,
+             match: str = 'auto',
+             limit: int = 0,
+             worst: int = 10) -> Dict[str, Any]:
+    '''
+    Replay key sequences on a table and return the report.
+
+    :param table: The table
+    :param sequences: The key sequences to replay, the default is to
+                      look up every distinct prefix of the codes of
+                      the table once
+    :param match: See Simulation
+    :param limit: See Simulation
+    :param worst: See Simulation.report()
+    '''
+    simulation = Simulation(table, match, limit)
+    if sequences is None:
+        simulation.lookup_prefixes(table.codes)
+    else:
+        simulation.replay(sequences)
+    return simulation.report(worst)
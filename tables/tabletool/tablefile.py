@@ -0,0 +1,348 @@
+#
+# Copyright (c) 2026 Mike FABIAN <mfabian@redhat.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+'''
+Streaming reader and writer for the table source format:
+
+    ### comments
+    BEGIN_DEFINITION
+    KEY = VALUE
+    ...
+    END_DEFINITION
+    BEGIN_TABLE
+    code<TAB>phrase<TAB>weight[<TAB>comment]
+    ...
+    END_TABLE
+    ...
+
+Everything up to and including the BEGIN_TABLE line is the “head”,
+everything from the END_TABLE line on is the “tail”. Head and tail
+are small and kept as lists of lines, the rows in between are
+produced one by one so that even the biggest tables can be processed
+with bounded memory.
+'''
+
+from typing import Any
+from typing import Dict
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import TextIO
+from typing import Tuple
+import logging
+
+LOGGER = logging.getLogger(__name__)
+
+class TableFormatError(ValueError):
+    '''Raised when a line in a table source cannot be parsed'''
+    def __init__(self, message: str, filename: str = '', lineno: int = 0):
+        self.message = message
+        self.filename = filename
+        self.lineno = lineno
+        if filename:
+            message = f'{filename}:{lineno}: {message}'
+        super().__init__(message)
+
+class Row:
+    '''
+    One row of a table.
+
+    Uses __slots__ because the big tables have well over 100000 rows
+    and a dict per row costs several times the memory.
+    '''
+    __slots__ = ('code', 'phrase', 'weight', 'comment')
+
+    def __init__(self,
+                 code: str,
+                 phrase: str,
+                 weight: int = 0,
+                 comment: str = '') -> None:
+        self.code = code
+        self.phrase = phrase
+        self.weight = weight
+        self.comment = comment
+
+    def __repr__(self) -> str:
+        return (f'Row({self.code!r}, {self.phrase!r}, '
+                f'{self.weight!r}, {self.comment!r})')
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, Row):
+            return NotImplemented
+        return (self.code == other.code
+                and self.phrase == other.phrase
+                and self.weight == other.weight
+                and self.comment == other.comment)
+
+    def format(self) -> str:
+        '''Return the row as a line of the table source'''
+        if self.comment:
+            return (f'{self.code}\t{self.phrase}\t'
+                    f'{self.weight}\t{self.comment}\n')
+        return f'{self.code}\t{self.phrase}\t{self.weight}\n'
+
+def parse_row(line: str) -> Row:
+    '''
+    Parse one line from the table section.
+
+    The weight column is optional (some raw sources like the array30
+    files do not have it) and defaults to 0. Everything after the
+    weight column is kept verbatim as the comment.
+
+    :param line: The line to parse, with or without the trailing newline
+    :raises TableFormatError: if the line is not a valid row
+    '''
+    fields = line.rstrip('\r\n').split('\t', 3)
+    if len(fields) < 2 or not fields[0] or not fields[1]:
+        raise TableFormatError(f'malformed row {line!r}')
+    weight = 0
+    if len(fields) > 2:
+        try:
+            weight = int(fields[2])
+        except ValueError as error:
+            raise TableFormatError(
+                f'invalid weight {fields[2]!r}') from error
+    comment = ''
+    if len(fields) > 3:
+        comment = fields[3]
+    return Row(fields[0], fields[1], weight, comment)
+
+def parse_definitions(lines: Iterable[str]) -> Dict[str, str]:
+    '''
+    Return the “KEY = VALUE” settings from the head of a table.
+
+    Only lines between BEGIN_DEFINITION and END_DEFINITION are
+    considered, the char prompts definitions are skipped.
+
+    :param lines: The lines of the head of a table
+    '''
+    definitions: Dict[str, str] = {}
+    in_definition = False
+    in_prompts = False
+    for line in lines:
+        stripped = line.strip()
+        if stripped.startswith('###') or not stripped:
+            continue
+        marker = stripped.upper()
+        if marker == 'BEGIN_DEFINITION':
+            in_definition = True
+            continue
+        if marker == 'END_DEFINITION':
+            in_definition = False
+            continue
+        if marker == 'BEGIN_CHAR_PROMPTS_DEFINITION':
+            in_prompts = True
+            continue
+        if marker == 'END_CHAR_PROMPTS_DEFINITION':
+            in_prompts = False
+            continue
+        if not in_definition or in_prompts or '=' not in stripped:
+            continue
+        key, value = stripped.split('=', 1)
+        definitions[key.strip().upper()] = value.strip()
+    return definitions
+
+def _is_begin_table(line: str) -> bool:
+    return line.upper().startswith('BEGIN_TABLE')
+
+def _is_end_table(line: str) -> bool:
+    # zhuyin.txt and array30.tail spell it “END_TABlE”, ibus-table
+    # does not care about the case, so neither do we.
+    return line.upper().startswith('END_TABLE')
+
+def _is_skipped(line: str) -> bool:
+    # ibus-table-createdb ignores blank lines and lines starting with
+    # “###” everywhere, even inside the table section.
+    return line.startswith('###') or not line.strip()
+
+class TableReader:
+    '''
+    Read a table source in one streaming pass.
+
+    The head is read when the reader is created, the rows are
+    produced by iterating over the reader, the tail is available
+    after the rows have been consumed:
+
+        with TableReader('cangjie5.txt') as reader:
+            for row in reader:
+                ...
+            tail = reader.tail
+
+    Comment lines and blank lines inside the table section are
+    skipped, just like ibus-table-createdb does.
+    '''
+    def __init__(self,
+                 inputfilename: str,
+                 headless: bool = False,
+                 all_sections: bool = False,
+                 strict: bool = True) -> None:
+        '''
+        :param inputfilename: The table source to read
+        :param headless: True if the file contains only rows, like
+                         wubi-haifeng86.UTF-8 or the array30 sources
+        :param all_sections: If True, return the rows from all
+                             BEGIN_TABLE…/END_TABLE… sections (erbi-qs.txt
+                             has several of them). Otherwise everything
+                             after the first END_TABLE is tail.
+        :param strict: If True, raise TableFormatError on malformed rows,
+                       else skip them and remember them in “malformed”
+        '''
+        self.filename = inputfilename
+        self.all_sections = all_sections
+        self.strict = strict
+        self.head: List[str] = []
+        self.malformed: List[Tuple[int, str]] = []
+        self.lineno = 0
+        self._tail: List[str] = []
+        self._definitions: Optional[Dict[str, str]] = None
+        self._consumed = False
+        self._file: TextIO = open(inputfilename, 'r', encoding='utf-8')
+        LOGGER.info('input file=%s', inputfilename)
+        if not headless:
+            self._read_head()
+
+    def _read_head(self) -> None:
+        for line in self._file:
+            self.lineno += 1
+            self.head.append(line)
+            if _is_begin_table(line):
+                LOGGER.debug('Header read.')
+                return
+        LOGGER.warning('%s: no BEGIN_TABLE found', self.filename)
+        self._consumed = True
+
+    def __enter__(self) -> 'TableReader':
+        return self
+
+    def __exit__(self, *_args: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        '''Close the input file'''
+        self._file.close()
+
+    def __iter__(self) -> Iterator[Row]:
+        if self._consumed:
+            return
+        self._consumed = True
+        in_table = True
+        for line in self._file:
+            self.lineno += 1
+            if not in_table:
+                if self.all_sections and _is_begin_table(line):
+                    in_table = True
+                self._tail.append(line)
+                continue
+            if _is_end_table(line):
+                LOGGER.debug('Table read.')
+                in_table = False
+                self._tail.append(line)
+                if not self.all_sections:
+                    self._tail.extend(self._file)
+                    return
+                continue
+            if _is_skipped(line):
+                continue
+            try:
+                yield parse_row(line)
+            except TableFormatError as error:
+                if self.strict:
+                    raise TableFormatError(
+                        error.message, self.filename, self.lineno) from error
+                LOGGER.debug('%s:%s: %s',
+                             self.filename, self.lineno, error.message)
+                self.malformed.append((self.lineno, line))
+
+    @property
+    def tail(self) -> List[str]:
+        '''
+        The lines after the table section.
+
+        Accessing this before all rows have been read skips the
+        remaining rows.
+        '''
+        if not self._consumed:
+            for _row in self:
+                pass
+        return self._tail
+
+    @property
+    def definitions(self) -> Dict[str, str]:
+        '''The “KEY = VALUE” settings from the head'''
+        if self._definitions is None:
+            self._definitions = parse_definitions(self.head)
+        return self._definitions
+
+def read_table(inputfilename: str,
+               **kwargs: Any) -> Tuple[List[str], List[Row], List[str]]:
+    '''
+    Read a complete table source into memory.
+
+    Returns a tuple (head, rows, tail). The keyword arguments are
+    passed to TableReader.
+
+    :param inputfilename: The table source to read
+    '''
+    with TableReader(inputfilename, **kwargs) as reader:
+        rows = list(reader)
+        LOGGER.info('%s rows read from %s', len(rows), inputfilename)
+        return (reader.head, rows, reader.tail)
+
+class TableWriter:
+    '''
+    Write a table source line by line.
+
+        with TableWriter('cangjie5.txt.new') as writer:
+            writer.write_lines(head)
+            writer.write_rows(rows)
+            writer.write_lines(tail)
+    '''
+    def __init__(self, outputfilename: str) -> None:
+        self.filename = outputfilename
+        self.rows_written = 0
+        self._file: TextIO = open(outputfilename, 'w', encoding='utf-8')
+        LOGGER.info('output file=%s', outputfilename)
+
+    def __enter__(self) -> 'TableWriter':
+        return self
+
+    def __exit__(self, *_args: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        '''Close the output file'''
+        self._file.close()
+
+    def write_lines(self, lines: Iterable[str]) -> None:
+        '''Write lines of the head or tail verbatim'''
+        self._file.writelines(lines)
+
+    def write_row(self, row: Row) -> None:
+        '''Write one row'''
+        self._file.write(row.format())
+        self.rows_written += 1
+
+    def write_rows(self, rows: Iterable[Row]) -> int:
+        '''
+        Write all rows from an iterable, returns the number of rows written.
+        '''
+        count = 0
+        write = self._file.write
+        for row in rows:
+            write(row.format())
+            count += 1
+        self.rows_written += count
+        return count
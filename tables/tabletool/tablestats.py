@@ -0,0 +1,168 @@
+#
+# Copyright (c) 2026 Mike FABIAN <mfabian@redhat.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+'''
+Measure the size and the ambiguity of tables.
+
+Each table is read in one streaming pass, several tables are read in
+parallel in a process pool:
+
+    python3 -m tabletool stats --json stats.json
+
+For each table the report contains:
+
+    a histogram of the number of candidates per code, with the
+    exact code typed (see the “simulate” command for the candidates
+    shown with AUTO_WILDCARD), and the codes with the most candidates
+
+    the size of codes and phrases in characters and UTF-8 bytes
+
+    the rows which are redundant because the same phrase has a
+    shorter code, and those where the shorter code is the beginning
+    of the longer one, like the toneless codes improve_jyutping.py
+    keeps next to the codes with tone
+
+The reports are meant to be kept as JSON to follow the growth of the
+tables over releases.
+'''
+
+from typing import Any
+from typing import Counter
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+import collections
+import concurrent.futures
+import heapq
+import logging
+import os
+
+from .compiled import is_compiled
+from .compiled import open_table
+from .simulate import percentile
+
+LOGGER = logging.getLogger(__name__)
+
+def _bucket(count: int) -> str:
+    # Powers of two: “1”, “2-3”, “4-7”, …
+    low = 1 << (count.bit_length() - 1)
+    high = 2 * low - 1
+    return str(low) if low == high else f'{low}-{high}'
+
+def table_stats(filename: str, worst: int = 10) -> Dict[str, Any]:
+    '''
+    Measure one table in a single pass over its rows.
+
+    :param filename: The table source or compiled table
+    :param worst: The number of codes with the most candidates to report
+    '''
+    LOGGER.debug('Measuring %s', filename)
+    candidates: Counter[str] = collections.Counter()
+    codes_by_phrase: Dict[str, List[str]] = {}
+    rows = 0
+    code_chars = code_bytes = phrase_chars = phrase_bytes = 0
+    headless = False
+    if not is_compiled(filename):
+        with open(filename, 'r', encoding='utf-8') as inputfile:
+            # Sources without a head, like the array30 sources, start
+            # with a row:
+            headless = '\t' in inputfile.readline()
+    with open_table(filename, headless=headless, all_sections=True,
+                    strict=False) as reader:
+        for row in reader:
+            rows += 1
+            candidates[row.code] += 1
+            codes_by_phrase.setdefault(row.phrase, []).append(row.code)
+            code_chars += len(row.code)
+            phrase_chars += len(row.phrase)
+            code_bytes += len(row.code.encode('utf-8'))
+            phrase_bytes += len(row.phrase.encode('utf-8'))
+        definitions = reader.definitions
+        malformed = len(reader.malformed)
+    redundant = prefix_redundant = 0
+    for codes in codes_by_phrase.values():
+        if len(codes) < 2:
+            continue
+        shortest = min(len(code) for code in codes)
+        for code in codes:
+            if len(code) == shortest:
+                continue
+            redundant += 1
+            if any(len(other) < len(code) and code.startswith(other)
+                   for other in codes):
+                prefix_redundant += 1
+    sizes = sorted(candidates.values())
+    histogram: Dict[str, int] = {}
+    for size in sizes:
+        bucket = _bucket(size)
+        histogram[bucket] = histogram.get(bucket, 0) + 1
+    return {
+        'name': definitions.get('NAME', ''),
+        'auto_wildcard': definitions.get(
+            'AUTO_WILDCARD', '').upper() == 'TRUE',
+        'rows': rows,
+        'malformed_rows': malformed,
+        'codes': len(candidates),
+        'phrases': len(codes_by_phrase),
+        'candidates_per_code': {
+            'mean': round(rows / len(candidates), 3) if candidates else 0.0,
+            'p50': percentile(sizes, 0.5),
+            'p90': percentile(sizes, 0.9),
+            'p99': percentile(sizes, 0.99),
+            'max': sizes[-1] if sizes else 0,
+            'histogram': histogram,
+        },
+        'worst_codes': [
+            {'code': code, 'candidates': count}
+            for (code, count) in heapq.nlargest(
+                worst, candidates.items(),
+                key=lambda item: (item[1], item[0]))],
+        'size': {
+            'code_chars': code_chars,
+            'code_bytes': code_bytes,
+            'phrase_chars': phrase_chars,
+            'phrase_bytes': phrase_bytes,
+            'distinct_code_bytes': sum(
+                len(code.encode('utf-8')) for code in candidates),
+        },
+        'redundant_rows': redundant,
+        'prefix_redundant_rows': prefix_redundant,
+    }
+
+def tables_stats(filenames: Iterable[str],
+                 jobs: Optional[int] = None,
+                 worst: int = 10) -> Dict[str, Dict[str, Any]]:
+    '''
+    Measure several tables in parallel.
+
+    Returns the reports by file name, in the order of the file names
+    given.
+
+    :param filenames: The table sources or compiled tables
+    :param jobs: The number of processes, default is the number of CPUs
+    :param worst: See table_stats()
+    '''
+    filenames = list(filenames)
+    with concurrent.futures.ProcessPoolExecutor(
+            max_workers=jobs) as executor:
+        # The biggest files first, so that they do not end up running
+        # alone at the end:
+        futures = {
+            filename: executor.submit(table_stats, filename, worst)
+            for filename in sorted(
+                filenames, key=os.path.getsize, reverse=True)}
+        return {filename: futures[filename].result()
+                for filename in filenames}
@@ -0,0 +1,270 @@
+#
+# Copyright (c) 2026 Mike FABIAN <mfabian@redhat.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+'''
+Check whether characters are used in Taiwan.
+
+improve_cangjie5.py and improve_quick5.py want to know whether
+characters classified as “simplified only” are nevertheless used in
+Taiwan. The answer comes from the dictionary of the Ministry of
+Education of Taiwan.
+
+The answers are kept in a persistent SQLite cache. The cache can be
+filled from a local snapshot file with lines “<character><TAB>0|1”,
+only characters missing from both are fetched from the web site,
+concurrently with a bounded number of threads. The URL can be
+changed, which makes it possible to test with a local stub server.
+'''
+
+from typing import Any
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Tuple
+import abc
+import concurrent.futures
+import http.client
+import logging
+import sqlite3
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+LOGGER = logging.getLogger(__name__)
+
+MOE_DICT_URL = 'https://dict.revised.moe.edu.tw/search.jsp'
+
+# Text on the result page if the dictionary has no entry:
+MOE_DICT_NOT_FOUND = '查無資料'
+
+class UsageOracle(abc.ABC):
+    '''
+    Base class for the sources answering whether a character is used
+    in Taiwan.
+    '''
+    @abc.abstractmethod
+    def lookup_many(self, chars: Iterable[str]) -> Dict[str, Optional[bool]]:
+        '''
+        Return a dictionary mapping each character to True or False,
+        or to None if the answer could not be found.
+
+        :param chars: The characters to look up
+        '''
+
+    def used_in_taiwan(self, char: str) -> Optional[bool]:
+        '''
+        Look up a single character.
+
+        :param char: The character to look up
+        '''
+        return self.lookup_many([char])[char]
+
+    def close(self) -> None:
+        '''Release the resources held by the oracle'''
+
+class MoeDictUsageOracle(UsageOracle):
+    '''
+    Looks up characters in a persistent cache and asks the
+    dictionary of the Ministry of Education only for cache misses.
+    '''
+    def __init__(self,
+                 cache_filename: str = 'taiwan_usage.sqlite',
+                 snapshot_filename: str = '',
+                 url: str = MOE_DICT_URL,
+                 offline: bool = False,
+                 max_workers: int = 8,
+                 timeout: float = 30.0,
+                 retries: int = 3) -> None:
+        '''
+        :param cache_filename: The SQLite file to keep the answers in,
+                               ':memory:' for a cache which is not kept
+        :param snapshot_filename: Optional file with lines
+                                  “<character><TAB>0|1” to fill the
+                                  cache from
+        :param url: The URL of the search page of the dictionary
+        :param offline: If True, never fetch anything, characters not
+                        in the cache are looked up as None
+        :param max_workers: Maximum number of concurrent requests
+        :param timeout: Timeout in seconds for each request
+        :param retries: How often to try each request
+        '''
+        self.url = url
+        self.offline = offline
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.retries = retries
+        self._connection = sqlite3.connect(cache_filename)
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS usage '
+            '(char TEXT PRIMARY KEY, used INTEGER NOT NULL)')
+        self._connection.commit()
+        if snapshot_filename:
+            self.load_snapshot(snapshot_filename)
+
+    def load_snapshot(self, snapshot_filename: str) -> int:
+        '''
+        Add the answers from a snapshot file to the cache.
+
+        Returns the number of characters read.
+
+        :param snapshot_filename: File with lines “<character><TAB>0|1”
+        '''
+        answers: List[Tuple[str, int]] = []
+        with open(snapshot_filename, 'r', encoding='utf-8') as snapshot:
+            for line in snapshot:
+                if line.startswith('#') or not line.strip():
+                    continue
+                char, used = line.rstrip('\n').split('\t')[:2]
+                answers.append((char, int(used)))
+        with self._connection:
+            self._connection.executemany(
+                'INSERT OR REPLACE INTO usage VALUES (?, ?)', answers)
+        LOGGER.info('%s answers loaded from %s',
+                    len(answers), snapshot_filename)
+        return len(answers)
+
+    def save_snapshot(self, snapshot_filename: str) -> None:
+        '''
+        Write all cached answers to a snapshot file.
+
+        :param snapshot_filename: The file to write
+        '''
+        with open(snapshot_filename, 'w', encoding='utf-8') as snapshot:
+            for (char, used) in self._connection.execute(
+                    'SELECT char, used FROM usage ORDER BY char'):
+                snapshot.write(f'{char}\t{used}\n')
+
+    def _cached(self, chars: List[str]) -> Dict[str, Optional[bool]]:
+        result: Dict[str, Optional[bool]] = {}
+        # Stay well below SQLITE_MAX_VARIABLE_NUMBER:
+        batch_size = 500
+        for start in range(0, len(chars), batch_size):
+            batch = chars[start:start + batch_size]
+            placeholders = ','.join('?' * len(batch))
+            for (char, used) in self._connection.execute(
+                    f'SELECT char, used FROM usage '
+                    f'WHERE char IN ({placeholders})', batch):
+                result[char] = bool(used)
+        return result
+
+    def fetch(self, char: str) -> Optional[bool]:
+        '''
+        Ask the dictionary web site whether a character is used in Taiwan.
+
+        Returns None if the site could not be reached or the answer
+        could not be read, so that one bad answer does not abort the
+        lookup of the other characters.
+
+        :param char: The character to look up
+        '''
+        url = f'{self.url}?md=1&word={urllib.parse.quote(char)}'
+        for attempt in range(1, self.retries + 1):
+            try:
+                with urllib.request.urlopen(
+                        url, timeout=self.timeout) as response:
+                    page = response.read().decode('utf-8')
+                return bool(page) and MOE_DICT_NOT_FOUND not in page
+            except UnicodeDecodeError as error:
+                LOGGER.warning('Invalid answer for %s: %s', url, error)
+                return None
+            except (urllib.error.URLError,
+                    http.client.HTTPException,
+                    OSError) as error:
+                LOGGER.warning('Fetching %s failed (attempt %s of %s): %s',
+                               url, attempt, self.retries, error)
+                if attempt < self.retries:
+                    time.sleep(2 ** (attempt - 1))
+        return None
+
+    def lookup_many(self, chars: Iterable[str]) -> Dict[str, Optional[bool]]:
+        unique_chars = list(dict.fromkeys(chars))
+        result = self._cached(unique_chars)
+        misses = [char for char in unique_chars if char not in result]
+        LOGGER.info('%s characters looked up, %s found in cache',
+                    len(unique_chars), len(unique_chars) - len(misses))
+        if not misses:
+            return result
+        if self.offline:
+            LOGGER.warning('Offline, %s characters not in cache', len(misses))
+            for char in misses:
+                result[char] = None
+            return result
+        with concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.max_workers) as executor:
+            fetched = dict(zip(misses, executor.map(self.fetch, misses)))
+        with self._connection:
+            self._connection.executemany(
+                'INSERT OR REPLACE INTO usage VALUES (?, ?)',
+                [(char, int(used)) for (char, used) in fetched.items()
+                 if used is not None])
+        result.update(fetched)
+        return result
+
+    def close(self) -> None:
+        self._connection.close()
+
+def add_arguments(parser: Any) -> None:
+    '''
+    Add the command line options to configure the lookup
+
+    :param parser: An argparse.ArgumentParser
+    '''
+    parser.add_argument('--check-taiwan-usage',
+                        action='store_true',
+                        help=('look up the characters classified as '
+                              'simplified only in the dictionary of the '
+                              'Ministry of Education, this needs network '
+                              'access unless --offline is given'))
+    parser.add_argument('--usage-cache',
+                        nargs='?',
+                        type=str,
+                        default='taiwan_usage.sqlite',
+                        help=('cache file for the Taiwan usage lookups, '
+                              'default is %(default)s'))
+    parser.add_argument('--usage-snapshot',
+                        nargs='?',
+                        type=str,
+                        default='',
+                        help=('file with lines “<character><TAB>0|1” '
+                              'to fill the cache from'))
+    parser.add_argument('--usage-url',
+                        nargs='?',
+                        type=str,
+                        default=MOE_DICT_URL,
+                        help=('URL of the dictionary search page, '
+                              'default is %(default)s'))
+    parser.add_argument('--usage-workers',
+                        nargs='?',
+                        type=int,
+                        default=8,
+                        help=('maximum number of concurrent requests, '
+                              'default is %(default)s'))
+    parser.add_argument('--offline',
+                        action='store_true',
+                        help='use only the cache and the snapshot')
+
+def oracle_from_args(args: Any) -> MoeDictUsageOracle:
+    '''
+    Create the oracle configured by the options added with add_arguments()
+
+    :param args: The parsed command line arguments
+    '''
+    return MoeDictUsageOracle(cache_filename=args.usage_cache,
+                              snapshot_filename=args.usage_snapshot,
+                              url=args.usage_url,
+                              offline=args.offline,
+                              max_workers=args.usage_workers)
@@ -0,0 +1,108 @@
+#
+# Copyright (c) 2026 Mike FABIAN <mfabian@redhat.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+'''
+Streaming reader for the Unihan database.
+
+The lines of the Unihan files look like:
+
+    U+4E00	kCantonese	jat1
+    U+4E0D	kCantonese	bat1 fau2
+
+The reader accepts either one of the extracted text files, like
+Unihan_Readings.txt, or Unihan.zip as downloaded from
+https://www.unicode.org/Public/UCD/latest/ucd/Unihan.zip
+without extracting it.
+
+Lines for other fields are skipped with a substring check, only the
+lines of the requested field are split.
+'''
+
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import TextIO
+from typing import Tuple
+import contextlib
+import io
+import logging
+import zipfile
+
+LOGGER = logging.getLogger(__name__)
+
+@contextlib.contextmanager
+def _open_text_files(
+        filename: str,
+        member: Optional[str] = None) -> Iterator[List[TextIO]]:
+    if not zipfile.is_zipfile(filename):
+        with open(filename, 'r', encoding='utf-8') as textfile:
+            yield [textfile]
+        return
+    with zipfile.ZipFile(filename) as archive:
+        if member is not None:
+            names = [member]
+        else:
+            names = [name for name in archive.namelist()
+                     if name.endswith('.txt')]
+        with contextlib.ExitStack() as stack:
+            yield [stack.enter_context(
+                io.TextIOWrapper(archive.open(name), encoding='utf-8'))
+                   for name in names]
+
+def iter_field(filename: str,
+               field: str,
+               member: Optional[str] = None) -> Iterator[Tuple[str, str]]:
+    '''
+    Iterate over all values of one Unihan field.
+
+    Yields tuples (character, value) in the order of the file, the
+    value is returned unchanged, it may contain several readings.
+
+    :param filename: A Unihan text file or Unihan.zip
+    :param field: The name of the field, for example “kCantonese”
+    :param member: If filename is a zip file, the file inside the zip
+                   file to read. The default is to read all text files
+                   in the zip file.
+    '''
+    LOGGER.info('input file=%s field=%s', filename, field)
+    needle = f'\t{field}\t'
+    count = 0
+    with _open_text_files(filename, member) as textfiles:
+        for textfile in textfiles:
+            for line in textfile:
+                if needle not in line or not line.startswith('U+'):
+                    continue
+                codepoint, _field, value = line.rstrip('\n').split('\t', 2)
+                count += 1
+                yield (chr(int(codepoint[2:], 16)), value)
+    LOGGER.info('%s values of %s read', count, field)
+
+def iter_readings(filename: str,
+                  field: str,
+                  member: Optional[str] = None) -> Iterator[Tuple[str, str]]:
+    '''
+    Iterate over all readings in one Unihan field.
+
+    Like iter_field(), but values with several readings separated by
+    spaces, like “bat1 fau2”, are split and yield one tuple
+    (character, reading) for each reading.
+
+    :param filename: A Unihan text file or Unihan.zip
+    :param field: The name of the field, for example “kCantonese”
+    :param member: See iter_field()
+    '''
+    for (char, value) in iter_field(filename, field, member):
+        for reading in value.split():
+            yield (char, reading)
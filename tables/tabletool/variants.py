@@ -0,0 +1,295 @@
+#
+# Copyright (c) 2026 Mike FABIAN <mfabian@redhat.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+'''
+Classify Chinese characters and phrases as simplified, traditional or
+both.
+
+The classification is made from the kSimplifiedVariant and
+kTraditionalVariant fields of Unihan_Variants.txt (or Unihan.zip):
+
+    a character with a traditional variant other than itself and no
+    simplified variant is only simplified, like 电
+
+    a character with a simplified variant other than itself and no
+    traditional variant is only traditional, like 電
+
+    all other characters, also those not in Unihan, are used in both
+
+The categories are the same numbers as those of
+chinese_variants.detect_chinese_category() from ibus-table, so that
+“category == SIMPLIFIED” still means “simplified only”. A phrase
+with simplified only and traditional only characters is MIXED.
+
+To avoid reading Unihan each time, the classification can be
+compiled into a small file with one bitset of the simplified only
+and one of the traditional only characters:
+
+    python3 -m tabletool compile-variants -u Unihan.zip -o variants.ibtv
+    python3 -m tabletool variants -v variants.ibtv
+
+The second command lists the simplified only characters in the tables
+with “LANGUAGE_FILTER = cm1”, which ibus-table hides because cm1
+means traditional Chinese only.
+
+The default classification DEFAULT_VARIANTS, tabletool/data/variants.ibtv,
+is compiled like this. As Unihan is not in the repository, its input
+were the character conversion tables of OpenCC,
+https://github.com/BYVoid/OpenCC (Apache License 2.0), as included in
+opencc-python-reimplemented 0.1.7, converted to the format of
+Unihan_Variants.txt:
+
+    “<simplified><TAB><traditional> …” in STCharacters.txt became
+    “U+<simplified><TAB>kTraditionalVariant<TAB>U+<traditional> …”
+
+    “<traditional><TAB><simplified> …” in TSCharacters.txt became
+    “U+<traditional><TAB>kSimplifiedVariant<TAB>U+<simplified> …”
+
+All numbers in the compiled file are little endian:
+
+    magic “IBTV”, version (uint32), first code point (uint32),
+    number of code points (uint32), then the bitset of the
+    simplified only and the bitset of the traditional only characters,
+    (number of code points + 7) // 8 bytes each
+'''
+
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Set
+from typing import Tuple
+import logging
+import os
+import struct
+
+from .compiled import is_compiled
+from .compiled import open_table
+from .unihan import iter_field
+from .wildcard import bitmap_rows
+
+LOGGER = logging.getLogger(__name__)
+
+MAGIC = b'IBTV'
+VERSION = 1
+
+# The categories, bits as in chinese_variants.detect_chinese_category():
+SIMPLIFIED = 1
+TRADITIONAL = 2
+BOTH = SIMPLIFIED | TRADITIONAL
+MIXED = 4
+
+_HEADER = struct.Struct('<4sIII')
+
+# The classification used when no other is given:
+DEFAULT_VARIANTS = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'data', 'variants.ibtv')
+
+def _variants(value: str) -> Set[str]:
+    # Like “U+767C U+9AEE”, newer Unihan versions may add sources
+    # after a “<”:
+    return {chr(int(token.split('<')[0][2:], 16))
+            for token in value.split()
+            if token.startswith('U+')}
+
+def read_unihan_variants(filename: str) -> Tuple[Set[str], Set[str]]:
+    '''
+    Read the simplified only and the traditional only characters from
+    Unihan.
+
+    Returns (simplified only, traditional only).
+
+    :param filename: Unihan_Variants.txt or Unihan.zip
+    '''
+    has_traditional: Dict[str, Set[str]] = {}
+    has_simplified: Dict[str, Set[str]] = {}
+    for (char, value) in iter_field(filename, 'kTraditionalVariant'):
+        has_traditional[char] = _variants(value)
+    for (char, value) in iter_field(filename, 'kSimplifiedVariant'):
+        has_simplified[char] = _variants(value)
+    simplified_only = {
+        char for (char, variants) in has_traditional.items()
+        if char not in variants and char not in has_simplified}
+    traditional_only = {
+        char for (char, variants) in has_simplified.items()
+        if char not in variants and char not in has_traditional}
+    LOGGER.info('%s simplified only and %s traditional only characters',
+                len(simplified_only), len(traditional_only))
+    return (simplified_only, traditional_only)
+
+def _bitset(chars: Iterable[str], first: int, count: int) -> bytes:
+    data = bytearray((count + 7) // 8)
+    for char in chars:
+        position = ord(char) - first
+        data[position >> 3] |= 1 << (position & 7)
+    return bytes(data)
+
+def write_variants(outputfilename: str,
+                   simplified_only: Set[str],
+                   traditional_only: Set[str]) -> None:
+    '''
+    Write the compiled classification.
+
+    :param outputfilename: The file to write
+    :param simplified_only: The simplified only characters
+    :param traditional_only: The traditional only characters
+    '''
+    code_points = [ord(char) for char in simplified_only | traditional_only]
+    first = min(code_points, default=0)
+    count = max(code_points, default=-1) + 1 - first
+    with open(outputfilename, 'wb') as outputfile:
+        outputfile.write(_HEADER.pack(MAGIC, VERSION, first, count))
+        outputfile.write(_bitset(simplified_only, first, count))
+        outputfile.write(_bitset(traditional_only, first, count))
+    LOGGER.info('%s code points from U+%04X written to %s',
+                count, first, outputfilename)
+
+def is_compiled_variants(filename: str) -> bool:
+    '''
+    Check whether a file is a compiled classification.
+
+    :param filename: The file to check
+    '''
+    with open(filename, 'rb') as inputfile:
+        return inputfile.read(len(MAGIC)) == MAGIC
+
+class VariantClassifier:
+    '''
+    Classifies characters and phrases as simplified, traditional,
+    both or mixed.
+
+        classifier = VariantClassifier.read('variants.ibtv')
+        classifier.category('电脑')   # SIMPLIFIED
+
+    The category of each code point up to the last one which is not
+    BOTH is kept in a bytes object, so classifying a character is a
+    single index operation.
+    '''
+    def __init__(self,
+                 simplified_only: Iterable[str] = (),
+                 traditional_only: Iterable[str] = ()) -> None:
+        '''
+        :param simplified_only: The simplified only characters
+        :param traditional_only: The traditional only characters
+        '''
+        simplified = list(simplified_only)
+        traditional = list(traditional_only)
+        size = max([ord(char) + 1 for char in simplified + traditional],
+                   default=0)
+        table = bytearray([BOTH]) * size
+        for char in simplified:
+            table[ord(char)] = SIMPLIFIED
+        for char in traditional:
+            table[ord(char)] = TRADITIONAL
+        self._table = bytes(table)
+
+    @classmethod
+    def read(cls, filename: str) -> 'VariantClassifier':
+        '''
+        Read a compiled classification, or Unihan if the file is not
+        compiled.
+
+        :param filename: A file written by write_variants(),
+                         Unihan_Variants.txt or Unihan.zip
+        '''
+        if not is_compiled_variants(filename):
+            return cls(*read_unihan_variants(filename))
+        with open(filename, 'rb') as inputfile:
+            data = inputfile.read()
+        (magic, version, first, count) = _HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(
+                f'{filename} is not a compiled classification of version '
+                f'{VERSION}')
+        length = (count + 7) // 8
+        chars: List[List[str]] = []
+        for start in (_HEADER.size, _HEADER.size + length):
+            bits = int.from_bytes(data[start:start + length], 'little')
+            chars.append([chr(first + position)
+                          for position in bitmap_rows(bits)])
+        LOGGER.info('%s simplified only and %s traditional only '
+                    'characters read from %s',
+                    len(chars[0]), len(chars[1]), filename)
+        return cls(chars[0], chars[1])
+
+    def char_category(self, char: str) -> int:
+        '''
+        Return the category of a character, BOTH if it is not known.
+
+        :param char: The character
+        '''
+        code_point = ord(char)
+        if code_point < len(self._table):
+            return self._table[code_point]
+        return BOTH
+
+    def category(self, phrase: str) -> int:
+        '''
+        Return the category of a phrase: the categories of its
+        characters combined, MIXED if it has simplified only and
+        traditional only characters.
+
+        :param phrase: The phrase
+        '''
+        category = BOTH
+        table = self._table
+        size = len(table)
+        for char in set(phrase):
+            code_point = ord(char)
+            if code_point < size:
+                category &= table[code_point]
+        return category or MIXED
+
+    def categories(self, phrases: Iterable[str]) -> List[int]:
+        '''
+        Return the categories of many phrases, like a column of a table.
+
+        :param phrases: The phrases
+        '''
+        table = self._table
+        size = len(table)
+        category = self.category
+        return [table[ord(phrase)] if len(phrase) == 1 and ord(phrase) < size
+                else category(phrase)
+                for phrase in phrases]
+
+def simplified_only_rows(filename: str,
+                         classifier: VariantClassifier
+                         ) -> List[Tuple[str, str]]:
+    '''
+    Return the (code, phrase) of the rows of a table whose phrase is
+    simplified only.
+
+    :param filename: The table source or compiled table
+    :param classifier: The classifier
+    '''
+    with open_table(filename, all_sections=True, strict=False) as reader:
+        rows = [(row.code, row.phrase) for row in reader]
+    return [row for (row, category) in zip(
+        rows, classifier.categories(phrase for (_code, phrase) in rows))
+            if category == SIMPLIFIED]
+
+def language_filter(filename: str) -> str:
+    '''
+    Return the LANGUAGE_FILTER of a table, '' if it has none.
+
+    :param filename: The table source or compiled table
+    '''
+    if not is_compiled(filename):
+        with open(filename, 'r', encoding='utf-8') as inputfile:
+            if '\t' in inputfile.readline():
+                # No head, like the array30 sources:
+                return ''
+    with open_table(filename, strict=False) as reader:
+        return reader.definitions.get('LANGUAGE_FILTER', '')
@@ -0,0 +1,312 @@
+#
+# Copyright (c) 2026 Mike FABIAN <mfabian@redhat.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+'''
+Find the rows whose code matches a pattern with wildcards.
+
+Tables can define a SINGLE_WILDCARD_CHAR matching exactly one key and
+a MULTI_WILDCARD_CHAR matching any number of keys. Without an index,
+a pattern like “a?c*” has to be compared with every code of the
+table.
+
+WildcardIndex keeps a bitmap for each key at each position, counted
+from the start and from the end of the code, and for each code
+length. A bitmap is a Python int with bit i set for row i, so
+intersecting them is a single “&” done in C:
+
+    index = WildcardIndex.from_table(table)
+    rows = index.match('a?c*')
+
+The keys before the first and after the last multi wildcard are
+answered by the bitmaps, keys between two multi wildcards are
+checked with a regular expression on the remaining rows only.
+'''
+
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Pattern
+from typing import Sequence
+from typing import Tuple
+import random
+import re
+import time
+
+from .columns import ColumnTable
+
+# Used if the table does not define wildcard characters:
+DEFAULT_SINGLE_WILDCARD_CHAR = '?'
+DEFAULT_MULTI_WILDCARD_CHAR = '*'
+
+# The set bits of each byte, to turn a bitmap into row numbers:
+_BITS_OF_BYTE: Tuple[Tuple[int, ...], ...] = tuple(
+    tuple(bit for bit in range(8) if byte & (1 << bit))
+    for byte in range(256))
+
+_NONZERO_BYTE = re.compile(b'[^\x00]')
+
+def _bitmap(rows: Sequence[int], size: int) -> int:
+    # Setting the bits in a bytearray and converting it once is much
+    # faster than “bitmap |= 1 << row” for each row.
+    data = bytearray((size + 7) // 8)
+    for row in rows:
+        data[row >> 3] |= 1 << (row & 7)
+    return int.from_bytes(data, 'little')
+
+def bitmap_rows(bitmap: int) -> List[int]:
+    '''
+    Return the numbers of the bits set in a bitmap, ascending.
+
+    :param bitmap: The bitmap
+    '''
+    data = bitmap.to_bytes((bitmap.bit_length() + 7) // 8, 'little')
+    rows: List[int] = []
+    for match in _NONZERO_BYTE.finditer(data):
+        base = match.start() * 8
+        rows.extend(base + bit for bit in _BITS_OF_BYTE[data[match.start()]])
+    return rows
+
+def pattern_regex(pattern: str,
+                  single: str = DEFAULT_SINGLE_WILDCARD_CHAR,
+                  multi: str = DEFAULT_MULTI_WILDCARD_CHAR) -> Pattern[str]:
+    '''
+    Translate a wildcard pattern to a regular expression matching
+    whole codes.
+
+    :param pattern: The pattern
+    :param single: The wildcard matching exactly one key
+    :param multi: The wildcard matching any number of keys
+    '''
+    parts: List[str] = []
+    for char in pattern:
+        if char == multi:
+            parts.append('.*')
+        elif char == single:
+            parts.append('.')
+        else:
+            parts.append(re.escape(char))
+    return re.compile(''.join(parts), re.DOTALL)
+
+def scan(codes: Sequence[str],
+         pattern: str,
+         single: str = DEFAULT_SINGLE_WILDCARD_CHAR,
+         multi: str = DEFAULT_MULTI_WILDCARD_CHAR) -> List[int]:
+    '''
+    Find the rows matching a pattern by comparing every code with a
+    regular expression, the reference for WildcardIndex.match().
+
+    :param codes: The codes of the rows
+    :param pattern: See pattern_regex()
+    :param single: See pattern_regex()
+    :param multi: See pattern_regex()
+    '''
+    fullmatch = pattern_regex(pattern, single, multi).fullmatch
+    return [row for (row, code) in enumerate(codes) if fullmatch(code)]
+
+class WildcardIndex:
+    '''
+    Bitmaps of the rows by key and position, to find the rows whose
+    code matches a wildcard pattern.
+    '''
+    def __init__(self,
+                 codes: Sequence[str],
+                 single: str = DEFAULT_SINGLE_WILDCARD_CHAR,
+                 multi: str = DEFAULT_MULTI_WILDCARD_CHAR) -> None:
+        '''
+        :param codes: The codes of the rows, the row numbers returned
+                      are positions in this sequence
+        :param single: The wildcard matching exactly one key
+        :param multi: The wildcard matching any number of keys
+        '''
+        self.codes = codes
+        self.single = single
+        self.multi = multi
+        size = len(codes)
+        from_start: Dict[Tuple[int, str], List[int]] = {}
+        from_end: Dict[Tuple[int, str], List[int]] = {}
+        by_length: Dict[int, List[int]] = {}
+        for (row, code) in enumerate(codes):
+            by_length.setdefault(len(code), []).append(row)
+            for (position, key) in enumerate(code):
+                from_start.setdefault((position, key), []).append(row)
+                from_end.setdefault((len(code) - 1 - position, key),
+                                    []).append(row)
+        self._from_start = {key: _bitmap(rows, size)
+                            for (key, rows) in from_start.items()}
+        self._from_end = {key: _bitmap(rows, size)
+                          for (key, rows) in from_end.items()}
+        self.max_length = max(by_length, default=0)
+        # Rows with codes of at least this length:
+        self._min_length: List[int] = [0] * (self.max_length + 2)
+        for length in range(self.max_length, -1, -1):
+            self._min_length[length] = (
+                self._min_length[length + 1]
+                | _bitmap(by_length.get(length, []), size))
+        self._exact_length = {length: _bitmap(rows, size)
+                              for (length, rows) in by_length.items()}
+
+    @classmethod
+    def from_table(cls, table: ColumnTable) -> 'WildcardIndex':
+        '''
+        Create the index for a table, using the wildcard characters it
+        defines.
+
+        :param table: The table
+        '''
+        definitions = table.definitions
+        return cls(table.codes,
+                   definitions.get('SINGLE_WILDCARD_CHAR')
+                   or DEFAULT_SINGLE_WILDCARD_CHAR,
+                   definitions.get('MULTI_WILDCARD_CHAR')
+                   or DEFAULT_MULTI_WILDCARD_CHAR)
+
+    def _keys(self,
+              keys: str,
+              bitmaps: Dict[Tuple[int, str], int],
+              bitmap: int) -> int:
+        # Intersect with the bitmaps of the keys at their positions,
+        # keys from the end are given reversed:
+        for (position, key) in enumerate(keys):
+            if not bitmap:
+                break
+            if key != self.single:
+                bitmap &= bitmaps.get((position, key), 0)
+        return bitmap
+
+    def match_bitmap(self, pattern: str) -> int:
+        '''
+        Return the bitmap of the rows matching a pattern.
+
+        :param pattern: The pattern, using the wildcard characters of
+                        the index
+        '''
+        parts = pattern.split(self.multi)
+        if len(parts) == 1:
+            bitmap = self._exact_length.get(len(pattern), 0)
+            return self._keys(pattern, self._from_start, bitmap)
+        (head, middle, tail) = (parts[0], parts[1:-1], parts[-1])
+        minimum = len(head) + len(tail) + sum(len(part) for part in middle)
+        if minimum > self.max_length:
+            return 0
+        bitmap = self._min_length[minimum]
+        bitmap = self._keys(head, self._from_start, bitmap)
+        bitmap = self._keys(tail[::-1], self._from_end, bitmap)
+        if bitmap and any(middle):
+            # Only the rows left are compared with the pattern:
+            fullmatch = pattern_regex(pattern, self.single,
+                                      self.multi).fullmatch
+            codes = self.codes
+            rows = [row for row in bitmap_rows(bitmap)
+                    if fullmatch(codes[row])]
+            bitmap = _bitmap(rows, len(codes))
+        return bitmap
+
+    def match(self, pattern: str, limit: Optional[int] = None) -> List[int]:
+        '''
+        Return the rows matching a pattern, in the order of the table.
+
+        :param pattern: The pattern, using the wildcard characters of
+                        the index
+        :param limit: If not None, return at most this many rows
+        '''
+        rows = bitmap_rows(self.match_bitmap(pattern))
+        if limit is not None:
+            return rows[:limit]
+        return rows
+
+    def count(self, pattern: str) -> int:
+        '''
+        Return the number of rows matching a pattern.
+
+        :param pattern: The pattern, using the wildcard characters of
+                        the index
+        '''
+        return bin(self.match_bitmap(pattern)).count('1')
+
+def random_patterns(index: WildcardIndex,
+                    number: int,
+                    seed: int = 0) -> List[str]:
+    '''
+    Make patterns like those typed by users, from the codes of the
+    table with some keys replaced by wildcards.
+
+    :param index: The index, its codes and wildcards are used
+    :param number: How many patterns to make
+    :param seed: The seed of the random numbers
+    '''
+    generator = random.Random(seed)
+    codes = [code for code in index.codes if code]
+    patterns: List[str] = []
+    for _number in range(number):
+        keys = list(generator.choice(codes))
+        for position in range(len(keys)):
+            if generator.random() < 0.3:
+                keys[position] = index.single
+        if generator.random() < 0.5:
+            # Cut the code and let a multi wildcard stand for the rest,
+            # like AUTO_WILDCARD does:
+            keys = keys[:generator.randint(1, len(keys))] + [index.multi]
+        if generator.random() < 0.2:
+            keys.insert(generator.randint(0, len(keys)), index.multi)
+        patterns.append(''.join(keys))
+    return patterns
+
+def _median(values: List[float]) -> float:
+    if not values:
+        return 0.0
+    return values[len(values) // 2]
+
+def benchmark(index: WildcardIndex,
+              patterns: Sequence[str]) -> Dict[str, Any]:
+    '''
+    Time WildcardIndex.match() against scan() and check that both
+    find the same rows.
+
+    :param index: The index
+    :param patterns: The patterns to look up
+    '''
+    index_seconds: List[float] = []
+    scan_seconds: List[float] = []
+    matches: List[int] = []
+    for pattern in patterns:
+        start = time.perf_counter()
+        rows = index.match(pattern)
+        index_seconds.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        expected = scan(index.codes, pattern, index.single, index.multi)
+        scan_seconds.append(time.perf_counter() - start)
+        if rows != expected:
+            raise AssertionError(
+                f'{pattern!r}: {len(rows)} rows found with the index, '
+                f'{len(expected)} with a scan')
+        matches.append(len(rows))
+    index_seconds.sort()
+    scan_seconds.sort()
+    return {
+        'patterns': len(patterns),
+        'index_us': {
+            'p50': round(_median(index_seconds) * 1e6, 1),
+            'max': round(index_seconds[-1] * 1e6, 1) if patterns else 0.0,
+        },
+        'scan_us': {
+            'p50': round(_median(scan_seconds) * 1e6, 1),
+            'max': round(scan_seconds[-1] * 1e6, 1) if patterns else 0.0,
+        },
+        'matches': {
+            'p50': sorted(matches)[len(matches) // 2] if matches else 0,
+            'max': max(matches, default=0),
+        },
+    }
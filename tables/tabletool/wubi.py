@@ -0,0 +1,142 @@
+#
+# Copyright (c) 2026 Mike FABIAN <mfabian@redhat.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+'''
+Derive the Wubi codes of phrases from the full codes of their
+characters.
+
+The code of a phrase always has 4 keys:
+
+    2 characters   first 2 keys of each character
+    3 characters   first key of the first two characters and the
+                   first 2 keys of the third
+    4 or more      first key of the first three characters and of
+                   the last character
+
+This is the same for Wubi 86 and Wubi 98, only the codes of the
+characters differ.
+
+The first one and the first two keys of the characters are kept in
+lists indexed by the code point, so deriving the code of a phrase
+needs no dictionary lookups and no slicing.
+'''
+
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import NamedTuple
+from typing import Sequence
+from typing import Tuple
+
+# Every phrase code has this many keys:
+PHRASE_CODE_LENGTH = 4
+
+class Mismatch(NamedTuple):
+    '''A phrase whose stored code differs from the derived one'''
+    phrase: str
+    stored: str
+    # Empty if a character of the phrase has no code:
+    derived: str
+
+class WubiCodes:
+    '''
+    The full codes of characters, to derive the codes of phrases.
+    '''
+    def __init__(self, char_codes: Iterable[Tuple[str, str]] = ()) -> None:
+        '''
+        :param char_codes: Pairs (character, full code), only the first
+                           code of each character is used
+        '''
+        # Indexed by code point, '' for characters without a code:
+        self._one: List[str] = []
+        self._two: List[str] = []
+        self.update(char_codes)
+
+    def update(self, char_codes: Iterable[Tuple[str, str]]) -> None:
+        '''
+        Add the full codes of characters which have no code yet.
+
+        :param char_codes: Pairs (character, full code)
+        '''
+        for (char, code) in char_codes:
+            if len(char) != 1 or not code:
+                continue
+            code_point = ord(char)
+            if code_point >= len(self._two):
+                grow = code_point + 1 - len(self._two)
+                self._one.extend([''] * grow)
+                self._two.extend([''] * grow)
+            if not self._two[code_point]:
+                self._one[code_point] = code[:1]
+                self._two[code_point] = code[:2]
+
+    def __len__(self) -> int:
+        return len(self._two) - self._two.count('')
+
+    def __contains__(self, char: str) -> bool:
+        code_point = ord(char)
+        return code_point < len(self._two) and bool(self._two[code_point])
+
+    def phrase_code(self, phrase: str) -> str:
+        '''
+        Return the code of a phrase, '' if the phrase is shorter than 2
+        characters or a character has no code.
+
+        :param phrase: The phrase
+        '''
+        return self.phrase_codes([phrase])[0]
+
+    def phrase_codes(self, phrases: Sequence[str]) -> List[str]:
+        '''
+        Return the codes of phrases, see phrase_code().
+
+        :param phrases: The phrases
+        '''
+        one = self._one
+        two = self._two
+        size = len(two)
+        codes: List[str] = []
+        append = codes.append
+        for phrase in phrases:
+            length = len(phrase)
+            if length < 2 or max(phrase) >= chr(size):
+                append('')
+                continue
+            if length == 2:
+                code = two[ord(phrase[0])] + two[ord(phrase[1])]
+            elif length == 3:
+                code = (one[ord(phrase[0])] + one[ord(phrase[1])]
+                        + two[ord(phrase[2])])
+            else:
+                code = (one[ord(phrase[0])] + one[ord(phrase[1])]
+                        + one[ord(phrase[2])] + one[ord(phrase[-1])])
+            # Full codes have at least 2 keys, a shorter code means a
+            # character without a code:
+            append(code if len(code) == PHRASE_CODE_LENGTH else '')
+        return codes
+
+    def verify(self,
+               phrases: Sequence[str],
+               stored_codes: Sequence[str]) -> Iterator[Mismatch]:
+        '''
+        Compare stored phrase codes with the derived ones.
+
+        :param phrases: The phrases
+        :param stored_codes: The stored code of each phrase
+        '''
+        for (phrase, stored, derived) in zip(
+                phrases, stored_codes, self.phrase_codes(phrases)):
+            if stored != derived:
+                yield Mismatch(phrase, stored, derived)
@@ -0,0 +1,286 @@
+#!/usr/bin/python3
+#
+# Copyright (c) 2026 Mike FABIAN <mfabian@redhat.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+'''
+Generates wubi-haifeng86.UTF-8 from the *.tab files of the Haifeng
+Wubi project.
+
+This is a port of convertTable.sh which produces the same output
+but runs in a single process. convertTable.sh forks awk three times
+for every row and takes a very long time, this takes a few seconds.
+
+The build uses the checked-in wubi-haifeng86.UTF-8, this script is
+only needed by maintainers when the *.tab files are updated:
+
+    ./build_wubi_haifeng.py -o wubi-haifeng86.UTF-8.tmp
+    ./remove_cjk_compatibility_ideographs.py \\
+        -i wubi-haifeng86.UTF-8.tmp -o wubi-haifeng86.UTF-8
+
+It needs the zh_CN.UTF-8 locale, the order of rows with the same
+frequency depends on the collation.
+'''
+
+from typing import Any
+from typing import Callable
+from typing import Iterator
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+from typing import Tuple
+import heapq
+import locale
+import logging
+import os
+import sys
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import tabletool # pylint: disable=wrong-import-position
+from tabletool import instrument # pylint: disable=wrong-import-position
+
+class Source(NamedTuple):
+    '''
+    Describes which columns of a *.tab file are used, like the
+    arguments of the parse() function in convertTable.sh.
+
+    All column numbers start at 1, like in awk.
+    '''
+    filename: str
+    base_freq: int
+    code_columns: Tuple[int, ...]
+    phrase_column: int
+    freq_column: Optional[int] = None
+
+SOURCES: Tuple[Source, ...] = (
+    Source('Word.tab', 10000, (3,), 1, 6),
+    Source('GBK.tab', 1000, (4, 6, 7, 8, 9), 3, 18),
+    Source('CJKa.tab', 100, (4, 5), 3),
+    Source('CJKb.tab', 100, (4, 5), 3),
+    Source('CJKs.tab', 100, (5, 6), 4),
+    Source('Symbol.tab', 100, (6, 7, 8), 5),
+)
+
+def parse_args() -> Any:
+    '''Parse the command line arguments'''
+    import argparse
+    parser = argparse.ArgumentParser(
+        description=(
+            'Generate wubi-haifeng86.UTF-8 from the *.tab files'))
+    parser.add_argument('-s', '--sourcedir',
+                        nargs='?',
+                        type=str,
+                        default='.',
+                        help=('directory containing the *.tab files, '
+                              'default is %(default)s'))
+    parser.add_argument('-o', '--outputfilename',
+                        nargs='?',
+                        type=str,
+                        default='wubi-haifeng86.UTF-8',
+                        help='output file, default is %(default)s')
+    parser.add_argument('-l', '--locale',
+                        nargs='?',
+                        type=str,
+                        default='zh_CN.UTF-8',
+                        help=('locale used to sort like convertTable.sh, '
+                              'default is %(default)s'))
+    instrument.add_arguments(parser)
+    parser.add_argument('-d', '--debug',
+                        action='store_true',
+                        help='print debugging output')
+    return parser.parse_args()
+
+def awk_number(field: str) -> int:
+    '''
+    Convert a field to a number like awk does, i.e. use the leading
+    digits and treat anything else as 0.
+
+    :param field: The field to convert
+    '''
+    field = field.strip()
+    end = 0
+    while end < len(field) and field[end].isdigit():
+        end += 1
+    if not end:
+        return 0
+    return int(field[:end])
+
+def read_columns(filename: str) -> List[List[str]]:
+    '''
+    Read a *.tab file into a list of columns, skipping the title line.
+
+    :param filename: The *.tab file to read
+    '''
+    with open(filename, 'r', encoding='utf-8') as tabfile:
+        next(tabfile)
+        rows = [line.rstrip('\n').split('\t') for line in tabfile]
+    width = max(len(row) for row in rows)
+    for row in rows:
+        if len(row) < width:
+            row.extend([''] * (width - len(row)))
+    return [list(column) for column in zip(*rows)]
+
+def parse(columns: List[List[str]],
+          source: Source,
+          code_column: int) -> List[Tuple[int, str, str]]:
+    '''
+    Extract (freq, code, phrase) for one code column of a *.tab file.
+
+    Same as the parse() function in convertTable.sh: rows where the
+    code is empty or “.” or where the phrase is empty are skipped,
+    the result is sorted stably by descending frequency.
+
+    :param columns: The columns of the *.tab file
+    :param source: Which columns to use
+    :param code_column: The code column to use, starting at 1
+    '''
+    codes = columns[code_column - 1]
+    phrases = columns[source.phrase_column - 1]
+    if source.freq_column:
+        freqs = [awk_number(field) + source.base_freq
+                 for field in columns[source.freq_column - 1]]
+    else:
+        freqs = [source.base_freq] * len(codes)
+    result = [(freq, code, phrase)
+              for (freq, code, phrase) in zip(freqs, codes, phrases)
+              if code and code != '.' and phrase]
+    result.sort(key=lambda x: -x[0])
+    return result
+
+class _Descending:
+    '''Wrapper to sort a key in descending order'''
+    __slots__ = ('key',)
+
+    def __init__(self, key: Any) -> None:
+        self.key = key
+
+    def __lt__(self, other: '_Descending') -> bool:
+        return bool(self.key > other.key)
+
+    def __eq__(self, other: Any) -> bool:
+        return bool(self.key == other.key)
+
+def collation_key_function(locale_name: str) -> Callable[[str], Any]:
+    '''
+    Return a function computing sort keys like “sort” does in the
+    given locale.
+
+    convertTable.sh sets LC_ALL=zh_CN.UTF-8, the output is only
+    identical to the checked-in wubi-haifeng86.UTF-8 if the same
+    locale is used.
+
+    :param locale_name: The locale to use for the collation
+    :raises locale.Error: if the locale is not available
+    '''
+    locale.setlocale(locale.LC_COLLATE, locale_name)
+    # GNU sort compares the bytes when strcoll() says the strings
+    # are equal.
+    return lambda text: (locale.strxfrm(text), text)
+
+def append_freq(
+        rows: List[Tuple[int, str, str]]) -> Iterator[tabletool.Row]:
+    '''
+    Assign the final weights, same as append_freq() in convertTable.sh.
+
+    The rows must be grouped by code and ordered by descending
+    frequency within each group. The first row of a group keeps its
+    frequency, the following rows get a strictly decreasing one.
+    A row is dropped if its phrase is the same as the phrase of the
+    previous row written.
+
+    :param rows: Tuples (freq, code, phrase)
+    '''
+    last_code = None
+    last_phrase = None
+    last_freq = 0
+    for (freq_orig, code, phrase) in rows:
+        if code == last_code:
+            if last_freq <= freq_orig:
+                freq = last_freq - 1
+            else:
+                freq = freq_orig
+        else:
+            freq = freq_orig
+            last_code = code
+        if phrase != last_phrase:
+            yield tabletool.Row(code, phrase, freq)
+            last_phrase = phrase
+            last_freq = freq
+
+def build_wubi_haifeng(sourcedir: str,
+                       outputfilename: str,
+                       locale_name: str = 'zh_CN.UTF-8',
+                       stats: Optional[instrument.Stats] = None) -> None:
+    '''
+    Read the *.tab files and write wubi-haifeng86.UTF-8
+
+    :param sourcedir: The directory containing the *.tab files
+    :param outputfilename: The file to write
+    :param locale_name: The locale to use for the collation
+    :param stats: Collects the time of the phases and the counters
+    '''
+    if stats is None:
+        stats = instrument.Stats()
+    collation_key = collation_key_function(locale_name)
+    parsed: List[List[Tuple[int, str, str]]] = []
+    for source in SOURCES:
+        logging.info('Converting %s', source.filename)
+        with stats.phase('read'):
+            columns = read_columns(os.path.join(sourcedir, source.filename))
+        with stats.phase('parse'):
+            for code_column in source.code_columns:
+                parsed.append(parse(columns, source, code_column))
+                stats.count('rows in', len(parsed[-1]))
+    logging.info('Merge tables')
+    with stats.phase('merge'):
+        # “sort -nr -k 1,1 -m”: descending frequency, and because -s is
+        # not given, the whole line in descending order as the last
+        # resort.
+        merged = list(heapq.merge(
+            *parsed,
+            key=lambda x: (
+                -x[0],
+                _Descending(collation_key(f'{x[0]}\t{x[1]}\t{x[2]}')))))
+    with stats.phase('sort'):
+        # “sort -s -k 2,2”: without -t the field includes the leading tab.
+        merged.sort(key=lambda x: collation_key(f'\t{x[1]}'))
+    with stats.phase('write'), \
+         tabletool.TableWriter(outputfilename) as writer:
+        count = writer.write_rows(append_freq(merged))
+    stats.count('rows out', count)
+    logging.info('Total %s elements processed, %s rows written',
+                 len(merged), count)
+
+def main() -> None:
+    '''Main program'''
+    args = parse_args()
+    log_level = logging.INFO
+    if args.debug:
+        log_level = logging.DEBUG
+    logging.basicConfig(format="%(levelname)s: %(message)s", level=log_level)
+    try:
+        with instrument.session_from_args(args) as stats:
+            build_wubi_haifeng(args.sourcedir, args.outputfilename,
+                               args.locale, stats)
+    except locale.Error:
+        # The order of rows with equal frequency depends on the
+        # collation, with another locale the table would differ from
+        # the checked-in one:
+        logging.error('Locale %s is not available, please install it',
+                      args.locale)
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -20,14 +20,39 @@ Improves the wubi-haifeng86 and the wubi-jidian86.txt tables to resolve:
 https://github.com/kaio/ibus-table/issues/76
 
 by removing all lines containing CJK COMPATIBILITY IDEOGRAPHs.
+
+With --replace the CJK COMPATIBILITY IDEOGRAPHs are replaced by their
+canonical decompositions instead. Lines containing one of the few
+CJK COMPATIBILITY IDEOGRAPHs without a decomposition are still removed.
+Both modes read and write the file line by line and check the whole
+line, comments included.
+
+A replaced row may then have the same code and phrase as another row.
+--merge-duplicates merges such rows afterwards like the “merge-dupes”
+pass of “python3 -m tabletool rewrite” does, this reads the whole
+output and writes it again through the table writer.
 '''
 
 from typing import Any
-from typing import List
-import re
-import unicodedata
+from typing import NamedTuple
+import os
+import sys
 import logging
 
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import tabletool # pylint: disable=wrong-import-position
+from tabletool import compatibility # pylint: disable=wrong-import-position
+from tabletool import instrument # pylint: disable=wrong-import-position
+
+class FilterResult(NamedTuple):
+    '''The number of lines changed by remove_cjk_compatibility_ideographs()'''
+    # Lines removed because they contain a CJK COMPATIBILITY IDEOGRAPH
+    # (without a canonical decomposition if replace is True):
+    removed: int = 0
+    # Lines where the CJK COMPATIBILITY IDEOGRAPHs were replaced:
+    replaced: int = 0
+
 def parse_args() -> Any:
     '''Parse the command line arguments'''
     import argparse
@@ -45,31 +70,79 @@ def parse_args() -> Any:
                         type=str,
                         default='wubi-haifeng86.UTF-8.new',
                         help='output file, default is %(default)s')
+    parser.add_argument('-r', '--replace',
+                        action='store_true',
+                        help=('replace CJK COMPATIBILITY IDEOGRAPHs by '
+                              'their canonical decompositions instead of '
+                              'removing the lines'))
+    parser.add_argument('-m', '--merge-duplicates',
+                        action='store_true',
+                        help=('afterwards merge rows of the output with '
+                              'the same code and phrase into the first '
+                              'one, which gets the highest weight'))
+    instrument.add_arguments(parser)
     parser.add_argument('-d', '--debug',
                         action='store_true',
                         help='print debugging output')
     return parser.parse_args()
 
-def remove_cjk_compatibility_ideographs(inputfilename: str, outputfilename: str) -> None:
+def remove_cjk_compatibility_ideographs(
+        inputfilename: str,
+        outputfilename: str,
+        replace: bool = False) -> FilterResult:
     '''
     Read the file and write a version without the lines
     containing CJK COMPATIBILITY IDEOGRAPHs
+
+    :param inputfilename: The file to read
+    :param outputfilename: The file to write
+    :param replace: If True, replace the CJK COMPATIBILITY IDEOGRAPHs
+                    by their canonical decompositions and remove only
+                    the lines where some are left
     '''
-    output_lines: List[str] = []
-    with open(inputfilename, 'r') as inputfile:
-        logging.info("input file=%s", inputfile)
+    search = compatibility.CJK_COMPATIBILITY_IDEOGRAPH_PATTERN.search
+    canonical_forms = compatibility.CANONICAL_FORMS
+    removed = 0
+    replaced = 0
+    with open(inputfilename, 'r', encoding='utf-8') as inputfile, \
+         open(outputfilename, 'w', encoding='utf-8') as outputfile:
+        logging.info('input file=%s', inputfilename)
+        logging.info('output file=%s', outputfilename)
         for line in inputfile:
-            skip_line = False
-            for char in line:
-                unicode_name = unicodedata.name(char, '')
-                if unicode_name.startswith('CJK COMPATIBILITY IDEOGRAPH'):
-                    skip_line = True
-            if not skip_line:
-                output_lines.append(line)
-    with open(outputfilename, 'w') as outputfile:
-        logging.info("output file=%s", outputfile)
-        for line in output_lines:
-            outputfile.write('%s' % line)
+            if search(line) is None:
+                outputfile.write(line)
+                continue
+            if replace:
+                line = line.translate(canonical_forms)
+                if search(line) is None:
+                    outputfile.write(line)
+                    replaced += 1
+                    continue
+            removed += 1
+    result = FilterResult(removed=removed, replaced=replaced)
+    logging.info('%s lines removed, %s lines replaced', *result)
+    return result
+
+def merge_duplicate_rows(filename: str) -> int:
+    '''
+    Merge the rows of a table with the same code and phrase into the
+    first one, which gets the highest weight, and write the table
+    again.
+
+    Returns the number of rows removed.
+
+    :param filename: The table source or headless table to change
+    '''
+    with open(filename, 'r', encoding='utf-8') as inputfile:
+        # Files without a head, like wubi-haifeng86.UTF-8, start with
+        # a row:
+        headless = '\t' in inputfile.readline()
+    table = tabletool.ColumnTable.read(filename, headless=headless)
+    merged = tabletool.merge_duplicates(table, keep_max_weight=True)
+    if merged:
+        table.write(filename)
+    logging.info('%s duplicate rows merged', merged)
+    return merged
 
 def main() -> None:
     '''Main program'''
@@ -78,7 +151,16 @@ def main() -> None:
     if args.debug:
         log_level = logging.DEBUG
     logging.basicConfig(format="%(levelname)s: %(message)s", level=log_level)
-    remove_cjk_compatibility_ideographs(args.inputfilename, args.outputfilename)
+    with instrument.session_from_args(args) as stats:
+        with stats.phase('filter'):
+            result = remove_cjk_compatibility_ideographs(
+                args.inputfilename, args.outputfilename, args.replace)
+        stats.count('lines removed', result.removed)
+        stats.count('lines replaced', result.replaced)
+        if args.merge_duplicates:
+            with stats.phase('merge-dupes'):
+                stats.count('rows merged',
+                            merge_duplicate_rows(args.outputfilename))
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,208 @@
+#!/usr/bin/python3
+#
+# Copyright (c) 2026 Mike FABIAN <mfabian@redhat.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+'''
+Derives the Wubi codes of phrases from the full codes of their
+characters in GBK.tab, CJKa.tab and CJKb.tab.
+
+Without --inputfilename, the codes stored in Word.tab are checked
+and the phrases with a different code are listed:
+
+    ./wubi_phrase_codes.py
+    ./wubi_phrase_codes.py --wubi-version 98
+
+With --inputfilename, the codes of a list of phrases, one per line,
+are written to --outputfilename as “code<TAB>phrase” lines.
+'''
+
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+import logging
+import os
+import sys
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from tabletool import instrument # pylint: disable=wrong-import-position
+from tabletool.wubi import WubiCodes # pylint: disable=wrong-import-position
+from build_wubi_haifeng import read_columns # pylint: disable=wrong-import-position
+
+# The *.tab files with the full codes of the characters, with the
+# columns (starting at 1) of the character and of the code. If a
+# character is in several files, the first code wins:
+CHAR_SOURCES: Dict[str, Tuple[Tuple[str, int, int], ...]] = {
+    '86': (('GBK.tab', 3, 4), ('CJKa.tab', 3, 4), ('CJKb.tab', 3, 4)),
+    '98': (('GBK.tab', 3, 10), ('CJKa.tab', 3, 6), ('CJKb.tab', 3, 6)),
+}
+
+# The columns of the phrase and of the code in Word.tab:
+WORD_PHRASE_COLUMN = 1
+WORD_CODE_COLUMNS = {'86': 3, '98': 2}
+
+def parse_args() -> Any:
+    '''Parse the command line arguments'''
+    import argparse
+    parser = argparse.ArgumentParser(
+        description=(
+            'Derive the Wubi codes of phrases from the codes of their '
+            'characters, or check the codes in Word.tab'))
+    parser.add_argument('-s', '--sourcedir',
+                        nargs='?',
+                        type=str,
+                        default=os.path.dirname(os.path.abspath(__file__)),
+                        help=('directory containing the *.tab files, '
+                              'default is %(default)s'))
+    parser.add_argument('-w', '--wubi-version',
+                        choices=sorted(CHAR_SOURCES),
+                        default='86',
+                        help='Wubi version, default is %(default)s')
+    parser.add_argument('-i', '--inputfilename',
+                        nargs='?',
+                        type=str,
+                        default='',
+                        help=('file with one phrase per line to derive '
+                              'the codes of, default is to check the '
+                              'codes in Word.tab'))
+    parser.add_argument('-o', '--outputfilename',
+                        nargs='?',
+                        type=str,
+                        default='phrase-codes.txt',
+                        help=('file to write the derived codes to, '
+                              'default is %(default)s'))
+    instrument.add_arguments(parser)
+    parser.add_argument('-d', '--debug',
+                        action='store_true',
+                        help='print debugging output')
+    return parser.parse_args()
+
+def read_char_codes(sourcedir: str, wubi_version: str) -> WubiCodes:
+    '''
+    Read the full codes of the characters from the *.tab files.
+
+    :param sourcedir: The directory containing the *.tab files
+    :param wubi_version: “86” or “98”
+    '''
+    codes = WubiCodes()
+    for (filename, char_column, code_column) in CHAR_SOURCES[wubi_version]:
+        columns = read_columns(os.path.join(sourcedir, filename))
+        # The characters in CJKb.tab are followed by a “.”:
+        codes.update(
+            (char.rstrip('.'), code.strip())
+            for (char, code) in zip(columns[char_column - 1],
+                                    columns[code_column - 1])
+            if code.strip() != '.')
+    logging.info('Codes of %s characters read', len(codes))
+    return codes
+
+def check_word_codes(sourcedir: str,
+                     wubi_version: str,
+                     stats: Optional[instrument.Stats] = None) -> int:
+    '''
+    Compare the codes stored in Word.tab with the derived codes and
+    log the differences.
+
+    Returns the number of phrases with a different code.
+
+    :param sourcedir: The directory containing the *.tab files
+    :param wubi_version: “86” or “98”
+    :param stats: Collects the time of the phases and the counters
+    '''
+    if stats is None:
+        stats = instrument.Stats()
+    with stats.phase('read'):
+        codes = read_char_codes(sourcedir, wubi_version)
+        columns = read_columns(os.path.join(sourcedir, 'Word.tab'))
+        phrases = columns[WORD_PHRASE_COLUMN - 1]
+        stored_codes = columns[WORD_CODE_COLUMNS[wubi_version] - 1]
+    stats.count('phrases', len(phrases))
+    count = 0
+    with stats.phase('verify'):
+        for mismatch in codes.verify(phrases, stored_codes):
+            count += 1
+            if mismatch.derived:
+                logging.warning('%s: stored %s, derived %s',
+                                mismatch.phrase, mismatch.stored,
+                                mismatch.derived)
+            else:
+                logging.warning('%s: stored %s, a character has no code',
+                                mismatch.phrase, mismatch.stored)
+    stats.count('mismatches', count)
+    logging.info('%s of %s codes in Word.tab differ from the derived codes',
+                 count, len(phrases))
+    return count
+
+def write_phrase_codes(sourcedir: str,
+                       wubi_version: str,
+                       inputfilename: str,
+                       outputfilename: str,
+                       stats: Optional[instrument.Stats] = None) -> int:
+    '''
+    Derive the codes of the phrases in a file and write them.
+
+    Returns the number of phrases which could not be coded.
+
+    :param sourcedir: The directory containing the *.tab files
+    :param wubi_version: “86” or “98”
+    :param inputfilename: File with one phrase per line
+    :param outputfilename: The file to write “code<TAB>phrase” lines to
+    :param stats: Collects the time of the phases and the counters
+    '''
+    if stats is None:
+        stats = instrument.Stats()
+    with stats.phase('read'):
+        codes = read_char_codes(sourcedir, wubi_version)
+        with open(inputfilename, 'r', encoding='utf-8') as inputfile:
+            phrases: List[str] = [line.strip() for line in inputfile
+                                  if line.strip()]
+    stats.count('phrases', len(phrases))
+    with stats.phase('derive'):
+        phrase_codes = codes.phrase_codes(phrases)
+    failed = 0
+    with stats.phase('write'), \
+         open(outputfilename, 'w', encoding='utf-8') as outputfile:
+        for (phrase, code) in zip(phrases, phrase_codes):
+            if not code:
+                logging.warning('No code for %s', phrase)
+                failed += 1
+                continue
+            outputfile.write(f'{code}\t{phrase}\n')
+    stats.count('phrases without code', failed)
+    logging.info('Codes of %s phrases written to %s',
+                 len(phrases) - failed, outputfilename)
+    return failed
+
+def main() -> None:
+    '''Main program'''
+    args = parse_args()
+    log_level = logging.INFO
+    if args.debug:
+        log_level = logging.DEBUG
+    logging.basicConfig(format="%(levelname)s: %(message)s", level=log_level)
+    with instrument.session_from_args(args) as stats:
+        if args.inputfilename:
+            count = write_phrase_codes(args.sourcedir, args.wubi_version,
+                                       args.inputfilename,
+                                       args.outputfilename, stats)
+        else:
+            count = check_word_codes(args.sourcedir, args.wubi_version,
+                                     stats)
+    sys.exit(1 if count else 0)
+
+if __name__ == '__main__':
+    main()
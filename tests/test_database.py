@@ -0,0 +1,112 @@
+#
+# Copyright (c) 2026 Mike FABIAN <mfabian@redhat.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+'''
+Tests for tabletool/database.py
+'''
+
+import os
+import sqlite3
+import subprocess
+import sys
+
+import pytest
+
+from tabletool.database import compare_databases
+from tabletool.database import patch_database
+from tabletool.database import read_phrases
+from tabletool.database import write_database
+from tabletool.tablefile import Row
+
+from conftest import TABLESDIR
+
+HEAD = ['BEGIN_DEFINITION\n', 'NAME = Test\n', 'END_DEFINITION\n',
+        'BEGIN_TABLE\n']
+
+def _sorted_phrases(dbfilename):
+    return sorted(read_phrases(dbfilename))
+
+def test_write_database_ignores_duplicates(tmp_path):
+    dbfilename = os.path.join(str(tmp_path), 'test.db')
+    rows = [Row('a', '日', 1000), Row('b', '月', 900),
+            Row('a', '日', 800), Row('a', '曰', 700)]
+    assert write_database(dbfilename, HEAD, rows) == 3
+    assert list(read_phrases(dbfilename)) == [
+        ('a', '日', 1000), ('b', '月', 900), ('a', '曰', 700)]
+    connection = sqlite3.connect(dbfilename)
+    with pytest.raises(sqlite3.IntegrityError):
+        connection.execute(
+            "INSERT INTO phrases (tabkeys, phrase, freq, user_freq) "
+            "VALUES ('a', '日', 1, 0)")
+    connection.close()
+
+@pytest.mark.parametrize(('old_rows', 'new_rows', 'expected'), [
+    ([Row('a', '日', 1000), Row('b', '月', 900)],
+     [Row('a', '日', 1000), Row('a', '日', 500), Row('c', '曰', 900)],
+     (1, 1, 0)),
+    # The first of the duplicates wins, whatever the other weights are:
+    ([Row('a', '日', 1000), Row('a', '日', 900)],
+     [Row('a', '日', 900), Row('a', '日', 800)],
+     (0, 0, 1)),
+    ([Row('a', '日', 900), Row('a', '日', 1000)],
+     [Row('a', '日', 1000), Row('a', '日', 900), Row('b', '月', 1)],
+     (1, 0, 1)),
+])
+@pytest.mark.parametrize('pass_old_rows', [True, False])
+def test_patch_database(tmp_path, old_rows, new_rows, expected,
+                        pass_old_rows):
+    dbfilename = os.path.join(str(tmp_path), 'test.db')
+    expected_dbfilename = os.path.join(str(tmp_path), 'expected.db')
+    write_database(dbfilename, HEAD, old_rows)
+    write_database(expected_dbfilename, HEAD, new_rows)
+    result = patch_database(dbfilename, HEAD, new_rows,
+                            old_rows=old_rows if pass_old_rows else None)
+    assert tuple(result) == expected
+    assert _sorted_phrases(dbfilename) == _sorted_phrases(expected_dbfilename)
+
+@pytest.mark.parametrize('value', ['TRUE', 'True', ' true'])
+def test_write_database_refuses_pinyin_mode(tmp_path, value):
+    dbfilename = os.path.join(str(tmp_path), 'test.db')
+    head = HEAD[:2] + [f'PINYIN_MODE = {value}\n'] + HEAD[2:]
+    with pytest.raises(ValueError):
+        write_database(dbfilename, head, [Row('a', '日', 1000)])
+    assert not os.path.exists(dbfilename)
+
+def test_build_db_refuses_pinyin_mode(tmp_path):
+    dbfilename = os.path.join(str(tmp_path), 'cangjie5.db')
+    process = subprocess.run(
+        [sys.executable, '-m', 'tabletool', 'build-db',
+         '-n', dbfilename, '-s', os.path.join('cangjie', 'cangjie5.txt')],
+        cwd=TABLESDIR, check=False, capture_output=True, text=True)
+    assert process.returncode == 1
+    assert 'PINYIN_MODE' in process.stderr
+    assert not os.path.exists(dbfilename)
+
+def test_compare_databases(tmp_path):
+    rows = [Row('a', '日', 1000), Row('b', '月', 900)]
+    dbfilename = os.path.join(str(tmp_path), 'test.db')
+    other_dbfilename = os.path.join(str(tmp_path), 'other.db')
+    write_database(dbfilename, HEAD, rows)
+    write_database(other_dbfilename, HEAD, rows)
+    assert not compare_databases(dbfilename, other_dbfilename)
+    connection = sqlite3.connect(other_dbfilename)
+    with connection:
+        connection.execute("UPDATE ime SET val = 'Other' WHERE attr = 'name'")
+        connection.execute(
+            "INSERT INTO pinyin (pinyin, zi, freq) VALUES ('ri4', '日', 1)")
+    connection.close()
+    assert compare_databases(dbfilename, other_dbfilename) == [
+        "ime row 1: ('name', 'Test') != ('name', 'Other')",
+        "pinyin row 1: ('', '', '') != ('ri4', '日', 1)"]
@@ -0,0 +1,83 @@
+#
+# Copyright (c) 2026 Mike FABIAN <mfabian@redhat.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+'''
+Tests for tabletool/frequency.py
+'''
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+from tabletool.frequency import read_corpus
+from tabletool.tablefile import TableFormatError
+
+from conftest import TABLESDIR
+
+def _write(tmp_path, text):
+    filename = os.path.join(str(tmp_path), 'corpus.txt')
+    with open(filename, 'w', encoding='utf-8') as outputfile:
+        outputfile.write(text)
+    return filename
+
+def test_read_corpus(tmp_path):
+    filename = _write(tmp_path,
+                      '# comment\n'
+                      '\n'
+                      '日\t10\n'
+                      '\u3000\t2\n'
+                      '【\xa0\xa0】\t3\r\n'
+                      '#\t4\n')
+    assert read_corpus(filename) == {
+        '日': 10, '\u3000': 2, '【\xa0\xa0】': 3, '#': 4}
+
+@pytest.mark.parametrize('line', ['日 10\n', '日\tx\n', '日\n'])
+def test_read_corpus_malformed(tmp_path, line):
+    filename = _write(tmp_path, '月\t1\n' + line)
+    with pytest.raises(TableFormatError) as info:
+        read_corpus(filename)
+    assert info.value.lineno == 2
+
+def test_corpus_freq_counts_round_trip(tmp_path):
+    # The counts written by “corpus-freq --counts” are read back by
+    # “freq --corpus”, also for phrases containing white space:
+    rows = ('a\t日\n'
+            'b\t\u3000\n'
+            'c\t【\xa0\xa0】\n'
+            'd\t月\n')
+    source = os.path.join(str(tmp_path), 'source.txt')
+    with open(source, 'w', encoding='utf-8') as outputfile:
+        outputfile.write(rows)
+    table = os.path.join(str(tmp_path), 'table.txt')
+    with open(table, 'w', encoding='utf-8') as outputfile:
+        outputfile.write('BEGIN_DEFINITION\nNAME = Test\nEND_DEFINITION\n'
+                         f'BEGIN_TABLE\n{rows}END_TABLE\n')
+    corpus = _write(tmp_path, '日日\u3000【\xa0\xa0】\n日\u3000\n')
+    counts = os.path.join(str(tmp_path), 'counts.txt')
+    outputfilename = os.path.join(str(tmp_path), 'out.txt')
+    for args in (['corpus-freq', '-c', corpus, '-i', table,
+                  '--counts', counts, '-j', '1'],
+                 ['freq', '--corpus', counts, '-o', outputfilename, source]):
+        subprocess.run([sys.executable, '-m', 'tabletool'] + args,
+                       cwd=TABLESDIR, check=True, capture_output=True)
+    assert read_corpus(counts) == {
+        '日': 3, '\u3000': 2, '【\xa0\xa0】': 1}
+    with open(outputfilename, 'r', encoding='utf-8') as inputfile:
+        assert inputfile.read() == ('a\t日\t3\n'
+                                    'b\t\u3000\t2\n'
+                                    'c\t【\xa0\xa0】\t1\n'
+                                    'd\t月\t0\n')
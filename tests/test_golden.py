@@ -0,0 +1,128 @@
+#
+# Copyright (c) 2026 Mike FABIAN <mfabian@redhat.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+'''
+Golden file checks: the scripts and commands which replaced older
+implementations must write exactly what the older ones wrote.
+
+The inputs in tests/data are small extracts of the shipped tables,
+the expected outputs were written by the old implementations.
+'''
+
+import importlib.util
+import itertools
+import os
+import subprocess
+import sys
+
+import pytest
+
+from conftest import TABLESDIR
+from conftest import TOPDIR
+
+DATADIR = os.path.join(TOPDIR, 'tests', 'data')
+
+def _load_script(name):
+    filename = os.path.join(TABLESDIR, name)
+    spec = importlib.util.spec_from_file_location(
+        os.path.splitext(os.path.basename(name))[0], filename)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def _tabletool(*args):
+    subprocess.run([sys.executable, '-m', 'tabletool'] + list(args),
+                   cwd=TABLESDIR, check=True, capture_output=True)
+
+def _read(filename):
+    with open(filename, 'r', encoding='utf-8') as inputfile:
+        return inputfile.read()
+
+@pytest.mark.parametrize(('script', 'function', 'name'), [
+    ('cangjie/improve_cangjie5.py', 'improve_cangjie5', 'cangjie5'),
+    ('quick/improve_quick5.py', 'improve_quick5', 'quick5'),
+])
+def test_improve_scripts(tmp_path, script, function, name):
+    # Written by improve_cangjie5.py and improve_quick5.py before
+    # they used tabletool.demote_redundant_codes():
+    outputfilename = os.path.join(str(tmp_path), f'{name}.txt')
+    getattr(_load_script(script), function)(
+        os.path.join(DATADIR, f'{name}.txt'), outputfilename)
+    assert _read(outputfilename) == _read(
+        os.path.join(DATADIR, f'{name}-improved.txt'))
+
+@pytest.mark.parametrize(('passes', 'name'), [
+    ('merge-dupes,demote-x', 'cangjie5'),
+    ('merge-dupes,demote-x-short', 'quick5'),
+])
+def test_rewrite(tmp_path, passes, name):
+    # The rewrite command with the passes of improve_cangjie5.py and
+    # improve_quick5.py writes what the old scripts wrote:
+    outputfilename = os.path.join(str(tmp_path), f'{name}.txt')
+    _tabletool('rewrite', '-i', os.path.join(DATADIR, f'{name}.txt'),
+               '-o', outputfilename, '-p', passes)
+    assert _read(outputfilename) == _read(
+        os.path.join(DATADIR, f'{name}-improved.txt'))
+
+@pytest.mark.parametrize(('sources', 'expected'), [
+    (['array30_27489.txt'], 'array30-expected.txt'),
+    (['array30_27489.txt', 'array30_ExtB.txt', 'array30_ExtCD_V2012A.txt'],
+     'array30-big-freq-expected.txt'),
+])
+def test_freq(tmp_path, sources, expected):
+    # The freq command writes what the GENERATE_FREQ awk macro and
+    # the cat commands of tables/array/CMakeLists.txt wrote:
+    arraydir = os.path.join(DATADIR, 'array')
+    outputfilename = os.path.join(str(tmp_path), 'array30.txt')
+    _tabletool('freq',
+               '--head', os.path.join(arraydir, 'array30.head'),
+               '--tail', os.path.join(arraydir, 'array30.tail'),
+               '-o', outputfilename,
+               *[os.path.join(arraydir, source) for source in sources])
+    assert _read(outputfilename) == _read(os.path.join(arraydir, expected))
+
+def _countdown_by_code(lines, head, tail):
+    # What compose writes with “WEIGHTS = countdown” for the rows of
+    # a GENERATE_FREQ output: the rows sorted by code, keeping their
+    # order within a code, without duplicates, counted down per code:
+    rows = [line.split('\t')[:2] for line in lines[len(head):-len(tail)]]
+    rows.sort(key=lambda row: row[0])
+    output = list(head)
+    for (code, group) in itertools.groupby(rows, key=lambda row: row[0]):
+        phrases = list(dict.fromkeys(row[1] for row in group))
+        output += [f'{code}\t{phrase}\t{1000 - number}\n'
+                   for (number, phrase) in enumerate(phrases)]
+    return ''.join(output + tail)
+
+@pytest.mark.parametrize('chunk_rows', ['200000', '50'])
+def test_compose(tmp_path, chunk_rows):
+    # array30-big composed from tables/array/array30-big.manifest has
+    # the rows of the GENERATE_FREQ output of the concatenated sources,
+    # sorted by code and counted down across the sources:
+    arraydir = os.path.join(DATADIR, 'array')
+    outputfilename = os.path.join(str(tmp_path), 'array30-big.txt')
+    _tabletool('compose',
+               '--head', os.path.join(arraydir, 'array30.head'),
+               '--chunk-rows', chunk_rows,
+               '-o', outputfilename,
+               os.path.join(arraydir, 'array30-big.manifest'))
+    expected = _read(
+        os.path.join(arraydir, 'array30-big-composed-expected.txt'))
+    assert _read(outputfilename) == expected
+    assert expected == _countdown_by_code(
+        _read(os.path.join(
+            arraydir, 'array30-big-freq-expected.txt')).splitlines(True),
+        _read(os.path.join(arraydir, 'array30.head')).splitlines(True),
+        _read(os.path.join(arraydir, 'array30.tail')).splitlines(True))
@@ -0,0 +1,116 @@
+#
+# Copyright (c) 2026 Mike FABIAN <mfabian@redhat.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+'''
+Tests for tabletool/jyutping.py
+'''
+
+import pytest
+
+from tabletool.jyutping import FINALS
+from tabletool.jyutping import INITIALS
+from tabletool.jyutping import SPECIAL_SYLLABLES
+from tabletool.jyutping import JyutpingConverter
+from tabletool.jyutping import SyllableError
+
+def _old_convert_jp_to_cantonese(jp):
+    # convert_jp_to_cantonese() of improve_jyutping.py before the
+    # converter was precomputed, returning None where it exited with
+    # “Impossible!”:
+    if not jp:
+        return ''
+    if jp in SPECIAL_SYLLABLES:
+        return SPECIAL_SYLLABLES[jp]
+    initial = ''
+    for key in INITIALS:
+        if not jp.startswith(key):
+            continue
+        if len(jp) == len(key):
+            return INITIALS[key]
+        if len(key) > len(initial):
+            initial = key
+    for final in FINALS:
+        if jp == initial + final:
+            if not initial:
+                return FINALS[final]
+            return INITIALS[initial] + FINALS[final]
+    return None
+
+@pytest.fixture(name='converter', scope='module')
+def fixture_converter():
+    return JyutpingConverter()
+
+@pytest.mark.parametrize(('jyutping', 'cantonese'), [
+    ('si', 'si'),
+    ('zi', 'ji'),
+    ('ceoi', 'chui'),
+    ('jyut', 'yuet'),
+    ('ngaa', 'nga'),
+    ('gwong', 'gwong'),
+    ('oi', 'oi'),
+    ('hm', 'ham'),
+    ('ng', 'ng'),
+    ('m', 'm'),
+    ('zou', 'jo'),
+    ('', ''),
+])
+def test_to_cantonese(converter, jyutping, cantonese):
+    assert converter.to_cantonese(jyutping) == cantonese
+    assert _old_convert_jp_to_cantonese(jyutping) == cantonese
+
+def test_same_as_old_rule(converter):
+    # Every combination of an initial and a final converts like
+    # before, and the combinations the old rule could not convert
+    # raise SyllableError:
+    syllables = set(SPECIAL_SYLLABLES) | set(INITIALS)
+    for initial in [''] + list(INITIALS):
+        syllables.update(initial + final for final in FINALS)
+    converted = 0
+    for syllable in sorted(syllables):
+        expected = _old_convert_jp_to_cantonese(syllable)
+        if expected is None:
+            with pytest.raises(SyllableError):
+                converter.to_cantonese(syllable)
+        else:
+            assert converter.to_cantonese(syllable) == expected, syllable
+            converted += 1
+    assert len(converter) == converted + 1 # and ''
+
+def test_to_cantonese_many(converter):
+    assert converter.to_cantonese_many(['si', 'zi', 'jyut']) == [
+        'si', 'ji', 'yuet']
+
+@pytest.mark.parametrize(('syllables', 'invalid'), [
+    (['si', 'xyz', 'zi'], 'xyz'),
+    # With the tone digit:
+    (['si1'], 'si1'),
+])
+def test_syllable_error(converter, syllables, invalid):
+    with pytest.raises(SyllableError) as info:
+        converter.to_cantonese_many(syllables)
+    assert info.value.syllable == invalid
+    with pytest.raises(SyllableError) as info:
+        converter.to_cantonese(invalid)
+    assert info.value.syllable == invalid
+
+def test_to_jyutping(converter):
+    # Several Jyutping finals have the Cantonese spelling “ut”:
+    assert converter.to_jyutping('ut') == ('eot', 'oet')
+    assert converter.to_jyutping_many(['ji', 'yuet']) == [('zi',), ('jyut',)]
+    for (syllable, cantonese) in (('si', 'si'), ('ceoi', 'chui')):
+        assert syllable in converter.to_jyutping(cantonese)
+    with pytest.raises(SyllableError) as info:
+        converter.to_jyutping('xyz')
+    assert info.value.syllable == 'xyz'
@@ -0,0 +1,106 @@
+#
+# Copyright (c) 2026 Mike FABIAN <mfabian@redhat.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+'''
+Tests for wubi-haifeng/remove_cjk_compatibility_ideographs.py
+'''
+
+import importlib.util
+import os
+
+import pytest
+
+from conftest import TABLESDIR
+
+# U+F900 CJK COMPATIBILITY IDEOGRAPH-F900 decomposes to U+8C48 豈,
+# U+FA0E CJK COMPATIBILITY IDEOGRAPH-FA0E has no decomposition:
+COMPAT = '\uf900'
+UNIFIED = '\u8c48'
+NO_DECOMPOSITION = '\ufa0e'
+
+ROWS = (f'a\t{COMPAT}\t900\n'
+        f'a\t{UNIFIED}\t1000\n'
+        f'b\t{COMPAT}\t800\n'
+        f'c\t{NO_DECOMPOSITION}\t700\n'
+        'd\t工\t600\n'
+        # In the comment column only:
+        f'e\t王\t500\tlike {COMPAT}\n'
+        '### a comment\n'
+        '\n')
+
+@pytest.fixture(name='script')
+def fixture_script():
+    filename = os.path.join(
+        TABLESDIR, 'wubi-haifeng', 'remove_cjk_compatibility_ideographs.py')
+    spec = importlib.util.spec_from_file_location(
+        'remove_cjk_compatibility_ideographs', filename)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def _run(script, tmp_path, text, replace):
+    inputfilename = os.path.join(str(tmp_path), 'in.txt')
+    outputfilename = os.path.join(str(tmp_path), 'out.txt')
+    with open(inputfilename, 'w', encoding='utf-8') as outputfile:
+        outputfile.write(text)
+    result = script.remove_cjk_compatibility_ideographs(
+        inputfilename, outputfilename, replace)
+    with open(outputfilename, 'r', encoding='utf-8') as inputfile:
+        return (result, inputfile.read())
+
+def test_remove(script, tmp_path):
+    (result, text) = _run(script, tmp_path, ROWS, False)
+    assert text == (f'a\t{UNIFIED}\t1000\n'
+                    'd\t工\t600\n'
+                    '### a comment\n'
+                    '\n')
+    assert result == script.FilterResult(removed=4, replaced=0)
+
+def test_replace(script, tmp_path):
+    # Like the default mode, the lines are kept as they are unless
+    # they contain a CJK COMPATIBILITY IDEOGRAPH anywhere, and
+    # duplicates are not merged:
+    (result, text) = _run(script, tmp_path, ROWS, True)
+    assert text == (f'a\t{UNIFIED}\t900\n'
+                    f'a\t{UNIFIED}\t1000\n'
+                    f'b\t{UNIFIED}\t800\n'
+                    'd\t工\t600\n'
+                    f'e\t王\t500\tlike {UNIFIED}\n'
+                    '### a comment\n'
+                    '\n')
+    assert result == script.FilterResult(removed=1, replaced=3)
+
+def test_replace_keeps_malformed_lines(script, tmp_path):
+    (result, text) = _run(script, tmp_path,
+                          f'broken {COMPAT}\nbroken\n', True)
+    assert text == f'broken {UNIFIED}\nbroken\n'
+    assert result == script.FilterResult(removed=0, replaced=1)
+
+def test_merge_duplicate_rows(script, tmp_path):
+    head = 'BEGIN_DEFINITION\nNAME = Test\nEND_DEFINITION\nBEGIN_TABLE\n'
+    tail = 'END_TABLE\n'
+    for (text, expected_head, expected_tail) in ((ROWS, '', ''),
+                                                 (head + ROWS + tail,
+                                                  head, tail)):
+        (_result, _text) = _run(script, tmp_path, text, True)
+        outputfilename = os.path.join(str(tmp_path), 'out.txt')
+        assert script.merge_duplicate_rows(outputfilename) == 1
+        with open(outputfilename, 'r', encoding='utf-8') as inputfile:
+            assert inputfile.read() == (expected_head
+                                        + f'a\t{UNIFIED}\t1000\n'
+                                        + f'b\t{UNIFIED}\t800\n'
+                                        + 'd\t工\t600\n'
+                                        + f'e\t王\t500\tlike {UNIFIED}\n'
+                                        + expected_tail)
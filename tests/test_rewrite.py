@@ -0,0 +1,47 @@
+#
+# Copyright (c) 2026 Mike FABIAN <mfabian@redhat.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+'''
+Tests for “python3 -m tabletool rewrite”
+'''
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from conftest import TABLESDIR
+
+def test_pass_run_twice(tmp_path):
+    # The times of a pass which runs several times are added up:
+    outputfilename = os.path.join(str(tmp_path), 'cangjie5.txt')
+    stats_json = os.path.join(str(tmp_path), 'stats.json')
+    process = subprocess.run(
+        [sys.executable, '-m', 'tabletool', '--stats-json', stats_json,
+         'rewrite',
+         '-i', os.path.join('cangjie', 'cangjie5.txt'),
+         '-o', outputfilename,
+         '-p', 'merge-dupes,demote-x,merge-dupes'],
+        cwd=TABLESDIR, check=True, capture_output=True, text=True)
+    seconds = [float(line.split()[1])
+               for line in process.stdout.splitlines()
+               if line.startswith('merge-dupes ')]
+    assert len(seconds) == 2
+    with open(stats_json, 'r', encoding='utf-8') as inputfile:
+        phases = json.load(inputfile)['phases']
+    # The printed times are rounded to milliseconds:
+    assert phases['merge-dupes'] == pytest.approx(sum(seconds), abs=0.002)
@@ -0,0 +1,177 @@
+#
+# Copyright (c) 2026 Mike FABIAN <mfabian@redhat.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+'''
+Tests for tabletool/tablefile.py
+'''
+
+import os
+
+import pytest
+
+from tabletool.tablefile import Row
+from tabletool.tablefile import TableFormatError
+from tabletool.tablefile import TableReader
+from tabletool.tablefile import TableWriter
+from tabletool.tablefile import parse_definitions
+from tabletool.tablefile import parse_row
+from tabletool.tablefile import read_table
+
+from conftest import TABLESDIR
+
+HEAD = '''\
+### A small table
+BEGIN_DEFINITION
+NAME = Test
+LANGUAGE_FILTER = cm1
+BEGIN_CHAR_PROMPTS_DEFINITION
+a\t日
+END_CHAR_PROMPTS_DEFINITION
+END_DEFINITION
+BEGIN_TABLE
+'''
+
+ROWS = '''\
+a\t日\t1000
+ab\t明\t900\tsome comment
+### a comment inside the table
+
+ab\t昍\t0
+'''
+
+TAIL = '''\
+END_TABLE
+BEGIN_GOUCI
+END_GOUCI
+'''
+
+def _write(tmp_path, text, name='table.txt'):
+    filename = os.path.join(str(tmp_path), name)
+    with open(filename, 'w', encoding='utf-8') as outputfile:
+        outputfile.write(text)
+    return filename
+
+def test_parse_row():
+    assert parse_row('a\t日\t1000\n') == Row('a', '日', 1000)
+    assert parse_row('a\t日\t1000\r\n') == Row('a', '日', 1000)
+    assert parse_row('a\t日') == Row('a', '日', 0)
+    assert parse_row('a\t日\t5\tx\ty\n') == Row('a', '日', 5, 'x\ty')
+
+def test_parse_row_keeps_spaces_in_phrases():
+    assert parse_row('a\t　\t1\n').phrase == '　'
+    assert parse_row('a\t【\xa0\xa0】\t1\n').phrase == '【\xa0\xa0】'
+
+@pytest.mark.parametrize('line', [
+    'a\n',
+    '\t日\t1\n',
+    'a\t\t1\n',
+    'a\t日\tx\n',
+])
+def test_parse_row_malformed(line):
+    with pytest.raises(TableFormatError):
+        parse_row(line)
+
+def test_row_format_round_trip():
+    for row in (Row('a', '日', 1000), Row('ab', '明', 0, 'c\td')):
+        assert parse_row(row.format()) == row
+
+def test_parse_definitions():
+    definitions = parse_definitions(HEAD.splitlines(keepends=True))
+    assert definitions == {'NAME': 'Test', 'LANGUAGE_FILTER': 'cm1'}
+
+def test_reader(tmp_path):
+    filename = _write(tmp_path, HEAD + ROWS + TAIL)
+    with TableReader(filename) as reader:
+        rows = list(reader)
+        assert reader.head == HEAD.splitlines(keepends=True)
+        assert reader.tail == TAIL.splitlines(keepends=True)
+        assert reader.definitions['NAME'] == 'Test'
+    assert rows == [Row('a', '日', 1000),
+                    Row('ab', '明', 900, 'some comment'),
+                    Row('ab', '昍', 0)]
+
+def test_reader_tail_skips_rows(tmp_path):
+    filename = _write(tmp_path, HEAD + ROWS + TAIL)
+    with TableReader(filename) as reader:
+        assert reader.tail == TAIL.splitlines(keepends=True)
+        assert not list(reader)
+
+def test_reader_end_table_any_case(tmp_path):
+    filename = _write(tmp_path, HEAD + 'a\t日\t1\nEND_TABlE\n')
+    (_head, rows, tail) = read_table(filename)
+    assert rows == [Row('a', '日', 1)]
+    assert tail == ['END_TABlE\n']
+
+def test_reader_headless(tmp_path):
+    filename = _write(tmp_path, 'a\t日\nb\t月\n')
+    (head, rows, tail) = read_table(filename, headless=True)
+    assert head == []
+    assert rows == [Row('a', '日'), Row('b', '月')]
+    assert tail == []
+
+def test_reader_all_sections(tmp_path):
+    text = HEAD + 'a\t日\t1\nEND_TABLE\nBEGIN_TABLE\nb\t月\t2\nEND_TABLE\n'
+    filename = _write(tmp_path, text)
+    (_head, rows, tail) = read_table(filename)
+    assert rows == [Row('a', '日', 1)]
+    assert tail == ['END_TABLE\n', 'BEGIN_TABLE\n', 'b\t月\t2\n',
+                    'END_TABLE\n']
+    (_head, rows, _tail) = read_table(filename, all_sections=True)
+    assert rows == [Row('a', '日', 1), Row('b', '月', 2)]
+
+def test_reader_strict(tmp_path):
+    filename = _write(tmp_path, HEAD + 'a\t日\t1\nbroken\nb\t月\t2\n' + TAIL)
+    with pytest.raises(TableFormatError) as info:
+        read_table(filename)
+    assert info.value.filename == filename
+    assert info.value.lineno == 11
+
+def test_reader_not_strict(tmp_path):
+    filename = _write(tmp_path, HEAD + 'a\t日\t1\nbroken\nb\t月\t2\n' + TAIL)
+    with TableReader(filename, strict=False) as reader:
+        rows = list(reader)
+        assert reader.malformed == [(11, 'broken\n')]
+    assert rows == [Row('a', '日', 1), Row('b', '月', 2)]
+
+def test_writer_round_trip(tmp_path):
+    text = HEAD + 'a\t日\t1000\nab\t明\t900\tsome comment\n' + TAIL
+    filename = _write(tmp_path, text)
+    (head, rows, tail) = read_table(filename)
+    outputfilename = os.path.join(str(tmp_path), 'out.txt')
+    with TableWriter(outputfilename) as writer:
+        writer.write_lines(head)
+        assert writer.write_rows(rows) == 2
+        writer.write_lines(tail)
+        assert writer.rows_written == 2
+    with open(outputfilename, 'r', encoding='utf-8') as inputfile:
+        assert inputfile.read() == text
+
+@pytest.mark.parametrize('name', [
+    'cangjie/cangjie5.txt',
+    'quick/quick5.txt',
+    'cantonese/jyutping.txt',
+])
+def test_writer_round_trip_shipped_tables(tmp_path, name):
+    inputfilename = os.path.join(TABLESDIR, name)
+    (head, rows, tail) = read_table(inputfilename)
+    outputfilename = os.path.join(str(tmp_path), 'out.txt')
+    with TableWriter(outputfilename) as writer:
+        writer.write_lines(head)
+        writer.write_rows(rows)
+        writer.write_lines(tail)
+    (head_out, rows_out, tail_out) = read_table(outputfilename)
+    assert head_out == head
+    assert rows_out == rows
+    assert tail_out == tail
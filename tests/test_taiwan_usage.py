@@ -0,0 +1,130 @@
+#
+# Copyright (c) 2026 Mike FABIAN <mfabian@redhat.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+'''
+Tests for tabletool/taiwan_usage.py, using a local stub server
+instead of the dictionary of the Ministry of Education.
+'''
+
+from typing import Any
+from typing import List
+import http.server
+import os
+import threading
+import urllib.parse
+
+import pytest
+
+from tabletool.taiwan_usage import MOE_DICT_NOT_FOUND
+from tabletool.taiwan_usage import MoeDictUsageOracle
+from tabletool.taiwan_usage import UsageOracle
+
+# The answers of the stub server by character:
+USED = '台'
+NOT_USED = '们'
+INVALID_UTF8 = '这'
+INCOMPLETE = '个'
+
+class _StubHandler(http.server.BaseHTTPRequestHandler):
+    requests: List[str] = []
+
+    def do_GET(self) -> None: # pylint: disable=invalid-name
+        query = urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query)
+        char = query['word'][0]
+        self.requests.append(char)
+        body = {
+            USED: f'<html>{USED}</html>'.encode('utf-8'),
+            NOT_USED: f'<html>{MOE_DICT_NOT_FOUND}</html>'.encode('utf-8'),
+            INVALID_UTF8: b'<html>\xff\xfe</html>',
+        }.get(char, b'<html>')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        if char == INCOMPLETE:
+            # Promise more than is sent, the client gets an
+            # http.client.IncompleteRead:
+            self.send_header('Content-Length', str(len(body) + 100))
+        else:
+            self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *_args: Any) -> None:
+        pass
+
+@pytest.fixture(name='stub_url')
+def fixture_stub_url():
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), _StubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    _StubHandler.requests = []
+    yield f'http://127.0.0.1:{server.server_address[1]}/search.jsp'
+    server.shutdown()
+    server.server_close()
+
+def test_usage_oracle_is_abstract():
+    with pytest.raises(TypeError):
+        UsageOracle() # pylint: disable=abstract-class-instantiated
+
+def test_lookup_many(stub_url):
+    oracle = MoeDictUsageOracle(cache_filename=':memory:', url=stub_url,
+                                retries=1, timeout=5)
+    result = oracle.lookup_many([USED, NOT_USED, USED])
+    assert result == {USED: True, NOT_USED: False}
+    assert sorted(_StubHandler.requests) == sorted([USED, NOT_USED])
+    # The second time the answers come from the cache:
+    assert oracle.lookup_many([NOT_USED, USED]) == {
+        NOT_USED: False, USED: True}
+    assert len(_StubHandler.requests) == 2
+    assert oracle.used_in_taiwan(USED)
+    oracle.close()
+
+def test_bad_answers_do_not_abort_the_batch(stub_url):
+    oracle = MoeDictUsageOracle(cache_filename=':memory:', url=stub_url,
+                                retries=1, timeout=5)
+    result = oracle.lookup_many([INVALID_UTF8, USED, INCOMPLETE, NOT_USED])
+    assert result == {INVALID_UTF8: None, USED: True,
+                      INCOMPLETE: None, NOT_USED: False}
+    # Failed lookups are not cached and are tried again:
+    oracle.lookup_many([INVALID_UTF8])
+    assert _StubHandler.requests.count(INVALID_UTF8) == 2
+    oracle.close()
+
+def test_unreachable_server(stub_url):
+    oracle = MoeDictUsageOracle(cache_filename=':memory:',
+                                url=stub_url.replace('http:', 'httpx:'),
+                                retries=1, timeout=5)
+    assert oracle.lookup_many([USED]) == {USED: None}
+    oracle.close()
+
+def test_snapshot_offline(tmp_path, stub_url):
+    snapshot = os.path.join(str(tmp_path), 'snapshot.txt')
+    with open(snapshot, 'w', encoding='utf-8') as outputfile:
+        outputfile.write(f'# comment\n{USED}\t1\n{NOT_USED}\t0\n')
+    cache = os.path.join(str(tmp_path), 'cache.sqlite')
+    oracle = MoeDictUsageOracle(cache_filename=cache,
+                                snapshot_filename=snapshot,
+                                url=stub_url, offline=True)
+    assert oracle.lookup_many([USED, NOT_USED, INCOMPLETE]) == {
+        USED: True, NOT_USED: False, INCOMPLETE: None}
+    oracle.close()
+    assert not _StubHandler.requests
+    # The cache is persistent:
+    oracle = MoeDictUsageOracle(cache_filename=cache, offline=True)
+    assert oracle.lookup_many([USED]) == {USED: True}
+    saved = os.path.join(str(tmp_path), 'saved.txt')
+    oracle.save_snapshot(saved)
+    oracle.close()
+    with open(saved, 'r', encoding='utf-8') as inputfile:
+        assert sorted(inputfile) == sorted([f'{USED}\t1\n', f'{NOT_USED}\t0\n'])
@@ -0,0 +1,114 @@
+#
+# Copyright (c) 2026 Mike FABIAN <mfabian@redhat.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+'''
+Tests for tabletool/unihan.py and the readings read by
+cantonese/improve_jyutping.py
+'''
+
+import importlib.util
+import os
+import zipfile
+
+import pytest
+
+from tabletool.jyutping import SyllableError
+from tabletool.unihan import iter_field
+from tabletool.unihan import iter_readings
+
+from conftest import TABLESDIR
+
+READINGS = '''\
+# Unihan_Readings.txt
+U+4E00\tkCantonese\tjat1
+U+4E00\tkMandarin\tyī
+U+4E0D\tkCantonese\tbat1 fau2
+U+4E0D\tkDefinition\tno; not; un-; negative prefix
+U+5B57\tkCantonese\tzi6
+'''
+
+VARIANTS = '''\
+# Unihan_Variants.txt
+U+4E7E\tkTraditionalVariant\tU+4E7E U+5E72
+'''
+
+@pytest.fixture(name='unihan_zip')
+def fixture_unihan_zip(tmp_path):
+    filename = os.path.join(str(tmp_path), 'Unihan.zip')
+    with zipfile.ZipFile(filename, 'w') as archive:
+        archive.writestr('Unihan_Readings.txt', READINGS)
+        archive.writestr('Unihan_Variants.txt', VARIANTS)
+    return filename
+
+def _write(tmp_path, text, name):
+    filename = os.path.join(str(tmp_path), name)
+    with open(filename, 'w', encoding='utf-8') as outputfile:
+        outputfile.write(text)
+    return filename
+
+def test_iter_field(tmp_path):
+    filename = _write(tmp_path, READINGS, 'Unihan_Readings.txt')
+    assert list(iter_field(filename, 'kCantonese')) == [
+        ('一', 'jat1'), ('不', 'bat1 fau2'), ('字', 'zi6')]
+    assert list(iter_field(filename, 'kMandarin')) == [('一', 'yī')]
+
+def test_iter_readings(tmp_path):
+    filename = _write(tmp_path, READINGS, 'Unihan_Readings.txt')
+    assert list(iter_readings(filename, 'kCantonese')) == [
+        ('一', 'jat1'), ('不', 'bat1'), ('不', 'fau2'), ('字', 'zi6')]
+
+def test_zip(unihan_zip):
+    assert list(iter_readings(unihan_zip, 'kCantonese')) == [
+        ('一', 'jat1'), ('不', 'bat1'), ('不', 'fau2'), ('字', 'zi6')]
+    # All members are read unless one is given:
+    assert list(iter_field(unihan_zip, 'kTraditionalVariant')) == [
+        ('乾', 'U+4E7E U+5E72')]
+    assert not list(iter_field(unihan_zip, 'kTraditionalVariant',
+                               member='Unihan_Readings.txt'))
+
+@pytest.fixture(name='script', scope='module')
+def fixture_script():
+    spec = importlib.util.spec_from_file_location(
+        'improve_jyutping',
+        os.path.join(TABLESDIR, 'cantonese', 'improve_jyutping.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def test_all_pinyin_table(script, unihan_zip):
+    # A character with two readings has an entry for each:
+    freq_table = {('bat', '不'): 500, ('yat', '一'): 800}
+    table = script.create_all_pinyin_table(unihan_zip, freq_table)
+    assert sorted(table) == [
+        ('bat1', '不'), ('fau2', '不'), ('jat1', '一'), ('zi6', '字')]
+    assert table[('bat1', '不')] == {
+        'pinyin_toneless': 'bat',
+        'pinyin_letters': 'batv',
+        'cantonese': 'bat',
+        'frequency': 500,
+    }
+    assert table[('fau2', '不')]['frequency'] == 0
+    assert table[('jat1', '一')]['cantonese'] == 'yat'
+    assert table[('jat1', '一')]['frequency'] == 800
+    assert table[('zi6', '字')]['pinyin_letters'] == 'ziqq'
+
+def test_all_pinyin_table_invalid_syllable(script, tmp_path):
+    filename = _write(tmp_path,
+                      'U+4E00\tkCantonese\txyz1\n'
+                      'U+4E0D\tkCantonese\tbat1 ?\n',
+                      'Unihan_Readings.txt')
+    with pytest.raises(SyllableError) as info:
+        script.create_all_pinyin_table(filename, {})
+    assert info.value.syllable == 'xyz'
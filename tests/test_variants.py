@@ -0,0 +1,105 @@
+#
+# Copyright (c) 2026 Mike FABIAN <mfabian@redhat.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+'''
+Tests for tabletool/variants.py and the shipped classification
+tabletool/data/variants.ibtv
+'''
+
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from tabletool.variants import BOTH
+from tabletool.variants import DEFAULT_VARIANTS
+from tabletool.variants import MIXED
+from tabletool.variants import SIMPLIFIED
+from tabletool.variants import TRADITIONAL
+from tabletool.variants import VariantClassifier
+from tabletool.variants import read_unihan_variants
+from tabletool.variants import write_variants
+
+from conftest import TABLESDIR
+
+SCRIPTS = ['cangjie/improve_cangjie5.py', 'quick/improve_quick5.py']
+
+def test_default_variants():
+    classifier = VariantClassifier.read(DEFAULT_VARIANTS)
+    phrases = ['电脑', '電腦', '台', '后', '後', '电腦', 'a']
+    assert classifier.categories(phrases) == [
+        SIMPLIFIED, TRADITIONAL, BOTH, BOTH, TRADITIONAL, MIXED, BOTH]
+
+def test_compiled_round_trip(tmp_path):
+    unihan = os.path.join(str(tmp_path), 'Unihan_Variants.txt')
+    with open(unihan, 'w', encoding='utf-8') as outputfile:
+        outputfile.write('# comment\n'
+                         'U+53F0\tkTraditionalVariant\tU+53F0 U+81FA\n'
+                         'U+7535\tkTraditionalVariant\tU+96FB\n'
+                         'U+81FA\tkSimplifiedVariant\tU+53F0\n'
+                         'U+96FB\tkSimplifiedVariant\tU+7535\n')
+    (simplified_only, traditional_only) = read_unihan_variants(unihan)
+    assert (simplified_only, traditional_only) == ({'电'}, {'臺', '電'})
+    filename = os.path.join(str(tmp_path), 'variants.ibtv')
+    write_variants(filename, simplified_only, traditional_only)
+    phrases = ['台', '电', '臺', '電', '电臺', 'a']
+    assert (VariantClassifier.read(filename).categories(phrases)
+            == VariantClassifier.read(unihan).categories(phrases)
+            == [BOTH, SIMPLIFIED, TRADITIONAL, TRADITIONAL, MIXED, BOTH])
+
+def _load_script(script):
+    spec = importlib.util.spec_from_file_location(
+        os.path.splitext(os.path.basename(script))[0],
+        os.path.join(TABLESDIR, script))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+@pytest.mark.parametrize('script', SCRIPTS)
+@pytest.mark.parametrize(('argv', 'expected'), [
+    ([], (DEFAULT_VARIANTS, False)),
+    (['--variants', 'Unihan.zip'], ('Unihan.zip', False)),
+    (['--no-variants'], ('', False)),
+    (['--check-taiwan-usage'], (DEFAULT_VARIANTS, True)),
+])
+def test_script_options(monkeypatch, script, argv, expected):
+    monkeypatch.setattr(sys, 'argv', [script] + argv)
+    args = _load_script(script).parse_args()
+    assert (args.variants, args.check_taiwan_usage) == expected
+
+@pytest.mark.parametrize('script', SCRIPTS)
+def test_script_without_usage_check(tmp_path, script):
+    # Without --check-taiwan-usage the characters are classified, but
+    # not looked up, so there is no cache and no network access:
+    inputfilename = os.path.join(str(tmp_path), 'table.txt')
+    with open(inputfilename, 'w', encoding='utf-8') as outputfile:
+        outputfile.write('BEGIN_DEFINITION\nNAME = Test\nEND_DEFINITION\n'
+                         'BEGIN_TABLE\na\t电\t1000\nb\t台\t1000\n'
+                         'END_TABLE\n')
+    stats_json = os.path.join(str(tmp_path), 'stats.json')
+    subprocess.run([sys.executable, os.path.join(TABLESDIR, script),
+                    '-i', inputfilename, '-o', 'out.txt',
+                    '--usage-url', 'http://127.0.0.1:1/',
+                    '--stats-json', stats_json],
+                   cwd=str(tmp_path), check=True, capture_output=True)
+    with open(stats_json, 'r', encoding='utf-8') as inputfile:
+        stats = json.load(inputfile)
+    assert stats['counters']['simplified only'] == 1
+    assert 'usage lookup' not in stats['phases']
+    assert sorted(os.listdir(str(tmp_path))) == [
+        'out.txt', 'stats.json', 'table.txt']